@@ -0,0 +1,53 @@
+"""
+Benchmarks for analysis of simulation files.
+"""
+import os
+import shutil
+import tempfile
+
+import openpathsampling as paths
+from openpathsampling.analysis.tis import StandardTISAnalysis, DictFlux
+
+import synthetic
+
+
+class StandardTIS(object):
+    repeat = 3
+    n_steps = 500
+
+    @classmethod
+    def setup_class(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.directory, 'tis.nc')
+        network, _ = synthetic.tis_network()
+        storage = paths.Storage(cls.filename, 'w')
+        storage.save(network)
+        for step in synthetic.tis_steps(network, cls.n_steps):
+            storage.save(step)
+        storage.close()
+
+    @classmethod
+    def teardown_class(cls):
+        shutil.rmtree(cls.directory)
+
+    def setup(self):
+        self.storage = paths.Storage(self.filename, 'r')
+        self.network = self.storage.networks[0]
+
+    def teardown(self):
+        self.storage.close()
+
+    def time_rate_matrix(self):
+        network = self.network
+        analysis = StandardTISAnalysis(
+            network=network,
+            flux_method=DictFlux({
+                (t.stateA, t.interfaces[0]): 0.1
+                for t in network.sampling_transitions
+            }),
+            max_lambda_calcs={
+                t: {'bin_width': 0.02, 'bin_range': (0.0, 1.02)}
+                for t in network.sampling_transitions
+            }
+        )
+        analysis.rate_matrix(self.storage.steps)
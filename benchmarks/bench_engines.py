@@ -0,0 +1,26 @@
+"""
+Benchmarks for frame generation by the dynamics engines.
+"""
+import numpy as np
+
+import openpathsampling as paths
+
+import synthetic
+
+
+class ToyEngineGeneration(object):
+    n_frames = 1000
+
+    def setup(self):
+        # the Langevin integrator draws from the global numpy generator
+        np.random.seed(1)
+        self.engine = synthetic.toy_engine()
+        self.snapshot = synthetic.toy_snapshot(self.engine)
+        self.engine.current_snapshot = self.snapshot
+
+    def time_generate_n_frames(self):
+        self.engine.generate_n_frames(self.n_frames)
+
+    def time_generate_length_ensemble(self):
+        ensemble = paths.LengthEnsemble(self.n_frames)
+        self.engine.generate(self.snapshot, [ensemble.can_append])
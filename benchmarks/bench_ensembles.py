@@ -0,0 +1,74 @@
+"""
+Benchmarks for ensemble checks during path generation and for splitting.
+
+New CVs are created in every setup, so their caches start empty like in a
+fresh simulation.
+"""
+import numpy as np
+
+import openpathsampling as paths
+
+import synthetic
+
+
+def grow(ensemble, trajectory):
+    """Check `can_append` frame by frame, like a running engine does"""
+    growing = paths.Trajectory([])
+    for snapshot in trajectory:
+        growing.append(snapshot)
+        if not ensemble.can_append(growing, trusted=True):
+            break
+
+    return growing
+
+
+class TISEnsembleCanAppend(object):
+    def setup(self):
+        self.engine = synthetic.data_engine()
+        network, _ = synthetic.tis_network()
+        transition = network.sampling_transitions[0]
+        self.ensemble = transition.ensembles[-1]
+        # a long excursion from A beyond the outermost interface and back
+        xs = synthetic.tis_path(transition.interfaces.lambdas[-1],
+                                np.random.RandomState(1), spacing=0.0005)
+        self.trajectory = synthetic.trajectory_from_x(xs, self.engine)
+
+    def time_can_append(self):
+        grow(self.ensemble, self.trajectory)
+
+
+class MinusInterfaceEnsembleCanAppend(object):
+    def setup(self):
+        self.engine = synthetic.data_engine()
+        network, _ = synthetic.tis_network()
+        transition = network.sampling_transitions[0]
+        self.ensemble = paths.MinusInterfaceEnsemble(
+            state_vol=transition.stateA,
+            innermost_vols=transition.interfaces[0]
+        )
+        # starts at the last frame in A, then leaves A and returns, slowly
+        t = np.arange(133, 2533)
+        xs = 0.1 - 0.15 * np.cos(2 * np.pi * t / 1000.0)
+        self.trajectory = synthetic.trajectory_from_x(xs, self.engine)
+
+    def time_can_append(self):
+        grow(self.ensemble, self.trajectory)
+
+
+class EnsembleSplit(object):
+    repeat = 3
+
+    def setup(self):
+        self.engine = synthetic.data_engine()
+        network, _ = synthetic.tis_network()
+        transition = network.sampling_transitions[0]
+        self.ensemble = transition.ensembles[0]
+        self.state_ensemble = paths.AllInXEnsemble(transition.stateA)
+        self.trajectory = synthetic.oscillating_trajectory(
+            5000, self.engine)
+
+    def time_split_tis_ensemble(self):
+        self.ensemble.split(self.trajectory)
+
+    def time_split_all_in_state(self):
+        self.state_ensemble.split(self.trajectory)
@@ -0,0 +1,75 @@
+"""
+Time `import openpathsampling` in fresh interpreters.
+
+Each repetition starts a new python process, so nothing is cached in
+`sys.modules`. Worker processes of parallel jobs pay this time on every
+start.
+
+Usage::
+
+    python benchmarks/bench_import.py [--repeat 5]
+
+"""
+from __future__ import print_function
+
+import argparse
+import subprocess
+import sys
+
+# modules that `import openpathsampling` should not load by itself. They are
+# imported by the functions that need them.
+deferred_modules = ['matplotlib', 'networkx', 'mdtraj', 'scipy.sparse',
+                    'svgwrite']
+
+timing_code = """
+import sys, time
+start = time.time()
+import openpathsampling
+print(time.time() - start)
+print(' '.join(m for m in %r if m in sys.modules) or '-')
+""" % (deferred_modules,)
+
+
+def time_import(repeat=5):
+    """
+    Import openpathsampling `repeat` times, each in a new process
+
+    Returns
+    -------
+    times : list of float
+        the import time in seconds of each repetition
+    loaded : list of str
+        the `deferred_modules` that were loaded by the import anyway
+    """
+    times = []
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, '-W', 'ignore', '-c', timing_code]
+        ).decode().strip().split('\n')
+        times.append(float(output[-2]))
+        loaded = [m for m in output[-1].split() if m != '-']
+
+    return times, loaded
+
+
+class Import(object):
+    repeat = 3
+
+    def time_import_openpathsampling(self):
+        # includes the start-up of the interpreter
+        time_import(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    times, loaded = time_import(args.repeat)
+    times = sorted(times)
+    print('import openpathsampling: best %.3f s, median %.3f s (%d runs)' % (
+        times[0], times[len(times) // 2], len(times)))
+    if loaded:
+        print('modules that should be deferred but were loaded: ' +
+              ', '.join(loaded))
@@ -0,0 +1,33 @@
+"""
+Benchmarks for the bookkeeping of sample sets in every MC step.
+"""
+import openpathsampling as paths
+
+import synthetic
+
+
+class SampleSetUpdates(object):
+    n_replicas = 500
+    n_steps = 2000
+
+    def setup(self):
+        engine = synthetic.data_engine()
+        trajectory = synthetic.trajectory_from_x([0.1, 0.2], engine)
+        ensembles = [paths.LengthEnsemble(2) for _ in range(self.n_replicas)]
+        self.sample_set = paths.SampleSet([
+            paths.Sample(replica=replica, trajectory=trajectory,
+                         ensemble=ensembles[replica])
+            for replica in range(self.n_replicas)
+        ])
+        self.samples = [
+            paths.Sample(replica=step % self.n_replicas,
+                         trajectory=trajectory,
+                         ensemble=ensembles[step % self.n_replicas])
+            for step in range(self.n_steps)
+        ]
+
+    def time_apply_samples(self):
+        # keep all sets alive, like the steps of a simulation do
+        sample_sets = [self.sample_set]
+        for sample in self.samples:
+            sample_sets.append(sample_sets[-1].apply_samples([sample]))
@@ -0,0 +1,116 @@
+"""
+Benchmarks for writing and reading storage files.
+"""
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import openpathsampling as paths
+
+import synthetic
+
+
+class _TemporaryFiles(object):
+    @classmethod
+    def setup_class(cls):
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def teardown_class(cls):
+        shutil.rmtree(cls.directory)
+
+    def filename(self, name):
+        return os.path.join(self.directory, name)
+
+    def teardown(self):
+        name = self.filename('write.nc')
+        if os.path.isfile(name):
+            os.remove(name)
+
+
+class Snapshots(_TemporaryFiles):
+    n_frames = 1000
+
+    @classmethod
+    def setup_class(cls):
+        super(Snapshots, cls).setup_class()
+        engine = synthetic.data_engine()
+        cls.trajectory = synthetic.oscillating_trajectory(cls.n_frames,
+                                                          engine)
+        storage = paths.Storage(os.path.join(cls.directory, 'read.nc'), 'w')
+        storage.save(cls.trajectory)
+        storage.close()
+
+    def time_save_trajectory(self):
+        storage = paths.Storage(self.filename('write.nc'), 'w')
+        storage.save(self.trajectory)
+        storage.close()
+
+    def time_load_trajectory(self):
+        storage = paths.Storage(self.filename('read.nc'), 'r')
+        trajectory = storage.trajectories[0]
+        np.array([snapshot.coordinates for snapshot in trajectory])
+        storage.close()
+
+
+class Steps(_TemporaryFiles):
+    n_steps = 50
+
+    @classmethod
+    def setup_class(cls):
+        super(Steps, cls).setup_class()
+        network, _ = synthetic.tis_network()
+        storage = paths.Storage(os.path.join(cls.directory, 'read.nc'), 'w')
+        storage.save(network)
+        for step in synthetic.tis_steps(network, cls.n_steps):
+            storage.save(step)
+        storage.close()
+
+    def setup(self):
+        # saved trajectories refer to their storage afterwards, so every
+        # repetition writes new objects
+        self.network, _ = synthetic.tis_network()
+        self.steps = synthetic.tis_steps(self.network, self.n_steps)
+
+    def time_save_steps(self):
+        storage = paths.Storage(self.filename('write.nc'), 'w')
+        storage.save(self.network)
+        for step in self.steps:
+            storage.save(step)
+        storage.close()
+
+    def time_load_steps(self):
+        storage = paths.Storage(self.filename('read.nc'), 'r')
+        for step in storage.steps:
+            for sample in step.active:
+                len(sample.trajectory)
+            step.change.details
+        storage.close()
+
+
+class CVDiskCache(_TemporaryFiles):
+    n_frames = 1000
+
+    @classmethod
+    def setup_class(cls):
+        super(CVDiskCache, cls).setup_class()
+        engine = synthetic.data_engine()
+        trajectory = synthetic.oscillating_trajectory(cls.n_frames, engine)
+        cv = paths.FunctionCV(
+            'x', lambda s: s.xyz[0][0]).with_diskcache()
+        storage = paths.Storage(os.path.join(cls.directory, 'read.nc'), 'w')
+        # the disk cache takes its shape from the stored snapshots
+        storage.save(trajectory)
+        storage.save(cv)
+        cv(trajectory)
+        storage.cvs.sync(cv)
+        storage.close()
+
+    def time_read_cv(self):
+        storage = paths.Storage(self.filename('read.nc'), 'r')
+        cv = storage.cvs['x']
+        trajectory = storage.trajectories[0]
+        cv(trajectory)
+        storage.close()
@@ -0,0 +1,260 @@
+"""
+Minimal benchmark runner for the OPS benchmark suite.
+
+Benchmarks are classes in the `bench_*.py` modules of this directory. Every
+method whose name starts with `time_` is a benchmark. As in nose, a class
+may define `setup_class` / `teardown_class` (run once) and `setup` /
+`teardown` (run before and after every repetition). Only the `time_` method
+itself is timed, so expensive preparation belongs in the setup methods.
+
+The attribute `repeat` of a class overrides the default number of
+repetitions for its benchmarks.
+"""
+from __future__ import print_function
+
+import datetime
+import fnmatch
+import gc
+import glob
+import importlib
+import inspect
+import json
+import os
+import platform
+import sys
+import timeit
+
+benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def find_benchmarks(pattern=None):
+    """
+    Collect all benchmarks of the suite
+
+    Parameters
+    ----------
+    pattern : str or None
+        only return benchmarks whose name matches this shell-style pattern,
+        e.g. `'storage.*'`
+
+    Returns
+    -------
+    list of (str, type, str)
+        the benchmark name `<module>.<class>.<method>`, the class and the
+        method name
+    """
+    if benchmark_dir not in sys.path:
+        sys.path.insert(0, benchmark_dir)
+
+    found = []
+    for filename in sorted(glob.glob(os.path.join(benchmark_dir,
+                                                  'bench_*.py'))):
+        module_name = os.path.splitext(os.path.basename(filename))[0]
+        module = importlib.import_module(module_name)
+        short_name = module_name[len('bench_'):]
+        classes = [
+            cls for _, cls in inspect.getmembers(module, inspect.isclass)
+            if cls.__module__ == module_name
+        ]
+        for cls in classes:
+            for method in sorted(dir(cls)):
+                if not method.startswith('time_'):
+                    continue
+
+                name = '.'.join([short_name, cls.__name__, method])
+                if pattern is None or fnmatch.fnmatch(name, pattern):
+                    found.append((name, cls, method))
+
+    return found
+
+
+def _call(obj, method):
+    fnc = getattr(obj, method, None)
+    if fnc is not None:
+        fnc()
+
+
+def run_class(cls, methods, repeat=None):
+    """
+    Run the benchmarks of one class
+
+    A benchmark that raises is reported with its error instead of timings,
+    and the remaining benchmarks still run.
+
+    Returns
+    -------
+    dict of str: list of float or str
+        the timings in seconds of each repetition for each method, or the
+        error message if the benchmark failed
+    """
+    if repeat is None:
+        repeat = getattr(cls, 'repeat', 5)
+
+    try:
+        _call(cls, 'setup_class')
+    except Exception as e:
+        return {method: _error_message(e) for method in methods}
+
+    results = {}
+    try:
+        for method in methods:
+            try:
+                results[method] = _time_method(cls, method, repeat)
+            except Exception as e:
+                results[method] = _error_message(e)
+    finally:
+        _call(cls, 'teardown_class')
+
+    return results
+
+
+def _time_method(cls, method, repeat):
+    times = []
+    for _ in range(repeat):
+        instance = cls()
+        _call(instance, 'setup')
+        gc_enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            start = timeit.default_timer()
+            getattr(instance, method)()
+            times.append(timeit.default_timer() - start)
+        finally:
+            if gc_enabled:
+                gc.enable()
+            _call(instance, 'teardown')
+
+    return times
+
+
+def _error_message(error):
+    return '%s: %s' % (error.__class__.__name__, error)
+
+
+def summarize(times):
+    ordered = sorted(times)
+    n = len(ordered)
+    if n % 2:
+        median = ordered[n // 2]
+    else:
+        median = 0.5 * (ordered[n // 2 - 1] + ordered[n // 2])
+
+    return {
+        'min': ordered[0],
+        'median': median,
+        'mean': sum(ordered) / n,
+        'max': ordered[-1],
+        'repeat': n,
+        'times': times
+    }
+
+
+def metadata():
+    """Information about the environment the benchmarks were run in"""
+    import numpy
+    import openpathsampling as paths
+
+    return {
+        'date': datetime.datetime.utcnow().isoformat() + 'Z',
+        'openpathsampling': paths.version.full_version,
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor()
+    }
+
+
+def run(pattern=None, repeat=None, verbose=True):
+    """
+    Run the benchmark suite
+
+    Parameters
+    ----------
+    pattern : str or None
+        only run benchmarks whose name matches this shell-style pattern
+    repeat : int or None
+        number of repetitions. If None each class uses its own `repeat`
+    verbose : bool
+        print each result as soon as it is available
+
+    Returns
+    -------
+    dict
+        the JSON-serializable results with keys `metadata` and
+        `benchmarks`. The latter maps the benchmark names to their summary
+        statistics in seconds, or to `{'error': message}` for benchmarks
+        that failed.
+    """
+    by_class = {}
+    names = {}
+    for name, cls, method in find_benchmarks(pattern):
+        by_class.setdefault(cls, []).append(method)
+        names[(cls, method)] = name
+
+    benchmarks = {}
+    for cls in sorted(by_class, key=lambda c: (c.__module__, c.__name__)):
+        results = run_class(cls, by_class[cls], repeat)
+        for method, times in sorted(results.items()):
+            name = names[(cls, method)]
+            if isinstance(times, list):
+                benchmarks[name] = summarize(times)
+                if verbose:
+                    print('%-60s %10.4f s (min of %d)' % (
+                        name, benchmarks[name]['min'], len(times)))
+            else:
+                benchmarks[name] = {'error': times}
+                if verbose:
+                    print('%-60s FAILED %s' % (name, times))
+
+    return {
+        'metadata': metadata(),
+        'benchmarks': benchmarks
+    }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compare results against a baseline
+
+    The minimum over the repetitions is compared, since it is the least
+    sensitive to other load on the machine.
+
+    Parameters
+    ----------
+    results : dict
+        the results of :func:`run`
+    baseline : dict
+        earlier results of :func:`run`, e.g. loaded from a JSON file
+    tolerance : float
+        relative slowdown that is still accepted
+
+    Returns
+    -------
+    list of (str, float, float)
+        name, baseline time and new time of every benchmark that got slower
+        than allowed
+    """
+    regressions = []
+    old_benchmarks = baseline['benchmarks']
+    for name, summary in sorted(results['benchmarks'].items()):
+        if 'min' not in summary or 'min' not in old_benchmarks.get(name, {}):
+            continue
+
+        old = old_benchmarks[name]['min']
+        new = summary['min']
+        if new > old * (1.0 + tolerance):
+            regressions.append((name, old, new))
+
+    return regressions
+
+
+def save(results, filename):
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(filename):
+    with open(filename) as f:
+        return json.load(f)
@@ -0,0 +1,80 @@
+"""
+Run the OPS benchmark suite and store the results as JSON.
+
+Examples::
+
+    # run everything and save the timings
+    python benchmarks/run_benchmarks.py -o results.json
+
+    # only the storage benchmarks, 3 repetitions each
+    python benchmarks/run_benchmarks.py -k 'storage.*' --repeat 3
+
+    # fail (exit code 1) if anything got more than 20% slower
+    python benchmarks/run_benchmarks.py --compare baseline.json
+
+"""
+from __future__ import print_function
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run the OPS benchmark suite.')
+    parser.add_argument(
+        '-o', '--output',
+        help='write the results to this JSON file')
+    parser.add_argument(
+        '-k', '--pattern', default=None,
+        help='only run benchmarks matching this pattern, e.g. "ensembles.*"')
+    parser.add_argument(
+        '--repeat', type=int, default=None,
+        help='number of repetitions (default depends on the benchmark)')
+    parser.add_argument(
+        '--compare', metavar='BASELINE',
+        help='JSON file of an earlier run to compare against')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help='relative slowdown accepted by --compare (default: 0.2)')
+    parser.add_argument(
+        '--list', action='store_true',
+        help='only list the benchmarks')
+    args = parser.parse_args(argv)
+
+    logging.getLogger('openpathsampling').setLevel(logging.ERROR)
+
+    if args.list:
+        for name, _, _ in harness.find_benchmarks(args.pattern):
+            print(name)
+        return 0
+
+    results = harness.run(args.pattern, args.repeat)
+
+    if args.output:
+        harness.save(results, args.output)
+
+    if args.compare:
+        baseline = harness.load(args.compare)
+        regressions = harness.compare(results, baseline, args.tolerance)
+        for name, old, new in regressions:
+            print('SLOWER %-53s %10.4f s -> %.4f s (%+.0f%%)' % (
+                name, old, new, 100.0 * (new / old - 1.0)))
+
+        if regressions:
+            return 1
+
+    if any('error' in summary for summary in results['benchmarks'].values()):
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Deterministic test systems shared by the benchmarks.
+
+Everything here runs offline with the toy engine. Random numbers come from
+seeded generators, so repeated runs time the same work.
+"""
+import numpy as np
+
+import openpathsampling as paths
+import openpathsampling.engines.toy as toys
+
+
+def toy_engine(n_frames_max=100000, n_steps_per_frame=10):
+    """Langevin dynamics on a 2D double well with a barrier along x"""
+    pes = (
+        toys.OuterWalls([1.0, 1.0], [0.0, 0.0]) +
+        toys.Gaussian(-0.7, [12.0, 12.0], [-0.5, 0.0]) +
+        toys.Gaussian(-0.7, [12.0, 12.0], [0.5, 0.0])
+    )
+    topology = toys.Topology(
+        n_spatial=2,
+        masses=[1.0, 1.0],
+        pes=pes
+    )
+    integ = toys.LangevinBAOABIntegrator(dt=0.02, temperature=0.1,
+                                         gamma=2.5)
+    return toys.Engine(
+        options={
+            'integ': integ,
+            'n_frames_max': n_frames_max,
+            'n_steps_per_frame': n_steps_per_frame
+        },
+        topology=topology
+    )
+
+
+def data_engine():
+    """
+    Toy engine without potential, for snapshots that are only stored
+
+    The snapshots of a trajectory store their engine, so this keeps the
+    stored objects small.
+    """
+    return toys.Engine(
+        options={},
+        topology=toys.Topology(n_spatial=2, masses=[1.0, 1.0], pes=None)
+    )
+
+
+def toy_snapshot(engine, x=-0.5, y=0.0):
+    return toys.Snapshot(
+        coordinates=np.array([[x, y]]),
+        velocities=np.array([[0.0, 0.0]]),
+        engine=engine
+    )
+
+
+def trajectory_from_x(xs, engine):
+    """Trajectory of toy snapshots moving along x"""
+    return paths.Trajectory([
+        toys.Snapshot(
+            coordinates=np.array([[x, 0.0]]),
+            velocities=np.array([[1.0, 0.0]]),
+            engine=engine
+        ) for x in xs
+    ])
+
+
+def oscillating_trajectory(n_frames, engine, seed=1):
+    """
+    Long trajectory moving back and forth between x = 0 and x = 1
+
+    It visits both states of :func:`tis_network` and crosses all interfaces
+    many times, like a long brute force MD run.
+    """
+    rng = np.random.RandomState(seed)
+    t = np.arange(n_frames)
+    xs = 0.5 - 0.6 * np.cos(2 * np.pi * t / 400.0) + \
+        0.05 * rng.standard_normal(n_frames)
+    return trajectory_from_x(xs, engine)
+
+
+def tis_network(interfaces=(0.05, 0.1, 0.2, 0.3, 0.4)):
+    """
+    MSTIS network with states A (x < 0) and B (x > 1)
+
+    Returns
+    -------
+    network : :class:`openpathsampling.MSTISNetwork`
+    cv_x : :class:`openpathsampling.CollectiveVariable`
+        the x coordinate
+    """
+    cv_x = paths.FunctionCV('x', lambda s: s.xyz[0][0])
+    cv_1mx = paths.FunctionCV('1-x', lambda s: 1.0 - s.xyz[0][0])
+    state_A = paths.CVDefinedVolume(cv_x, float('-inf'), 0.0).named('A')
+    state_B = paths.CVDefinedVolume(cv_1mx, float('-inf'), 0.0).named('B')
+    network = paths.MSTISNetwork([
+        (state_A, paths.VolumeInterfaceSet(cv_x, float('-inf'),
+                                           list(interfaces))),
+        (state_B, paths.VolumeInterfaceSet(cv_1mx, float('-inf'),
+                                           list(interfaces)))
+    ])
+    return network, cv_x
+
+
+def tis_path(lambda_min, rng, spacing=0.01):
+    """
+    Path leaving a state, reaching beyond `lambda_min` and ending in a state
+
+    The order parameter of the path starts at -0.05 (in the state) and rises
+    beyond `lambda_min`. Paths that reach 1 end in the other state, all
+    other paths return. The returned trajectory is in terms of the order
+    parameter, which is mapped to x by the caller.
+    """
+    peak = lambda_min + 0.02 + abs(0.15 * rng.standard_normal())
+    top = min(peak, 1.05)
+    rising = np.arange(spacing / 2, top, spacing)
+    if peak >= 1.0:
+        values = np.concatenate([[-0.05], rising[rising < 1.0], [1.05]])
+    else:
+        values = np.concatenate([[-0.05], rising, rising[::-1], [-0.05]])
+    noise = 0.2 * spacing * rng.standard_normal(len(values))
+    noise[0] = noise[-1] = 0.0
+    values = values + noise
+    values[1:-1] = np.clip(values[1:-1], 1e-3, 1.0 - 1e-3)
+    return values
+
+
+def tis_steps(network, n_steps, engine=None, seed=1):
+    """
+    MC steps of a fake MSTIS simulation
+
+    In every step one randomly chosen ensemble gets a new trajectory. The
+    trajectories are valid for their ensembles, so the steps can be
+    analyzed with the usual TIS analysis.
+
+    Returns
+    -------
+    list of :class:`openpathsampling.MCStep`
+    """
+    if engine is None:
+        engine = data_engine()
+
+    rng = np.random.RandomState(seed)
+    ensembles = []
+    for transition in network.sampling_transitions:
+        from_B = transition.stateA.name == 'B'
+        for ensemble, lambda_min in zip(transition.ensembles,
+                                        transition.interfaces.lambdas):
+            ensembles.append((ensemble, lambda_min, from_B))
+
+    def new_sample(replica):
+        ensemble, lambda_min, from_B = ensembles[replica]
+        values = tis_path(lambda_min, rng)
+        xs = 1.0 - values if from_B else values
+        return paths.Sample(
+            replica=replica,
+            trajectory=trajectory_from_x(xs, engine),
+            ensemble=ensemble
+        )
+
+    mover = paths.IdentityPathMover()
+    sample_set = paths.SampleSet([new_sample(replica)
+                                  for replica in range(len(ensembles))])
+
+    steps = []
+    for mccycle in range(n_steps):
+        sample = new_sample(rng.randint(len(ensembles)))
+        sample_set = sample_set.apply_samples([sample])
+        details = paths.Details(
+            metropolis_acceptance=1.0,
+            metropolis_random=rng.uniform(),
+            stopping_reason='state'
+        )
+        change = paths.AcceptedSampleMoveChange(
+            samples=[sample],
+            mover=mover,
+            details=details
+        )
+        steps.append(paths.MCStep(
+            mccycle=mccycle,
+            active=sample_set,
+            change=change
+        ))
+
+    return steps
@@ -72,7 +72,7 @@ from .collectivevariable import (
     FunctionCV, MDTrajFunctionCV, MSMBFeaturizerCV,
     InVolumeCV, CollectiveVariable, CoordinateGeneratorCV,
     CoordinateFunctionCV, CallableCV, PyEMMAFeaturizerCV,
-    GeneratorCV)
+    GeneratorCV, DerivedCV, TrajectoryCV)
 
 from .ensemble import (
     Ensemble, EnsembleCombination, EnsembleFactory, EntersXEnsemble,
@@ -157,6 +157,7 @@ import openpathsampling.numerics as numerics
 from openpathsampling.engines import Trajectory, BaseSnapshot
 import openpathsampling.engines.openmm as openmm
 import openpathsampling.engines.toy as toy
+import openpathsampling.engines.external as external
 
 
 def git_HEAD():  # pragma: no cover
@@ -1,8 +1,8 @@
 import openpathsampling as paths
 import pandas as pd
-import scipy.sparse
-from scipy.sparse.csgraph import reverse_cuthill_mckee
-import networkx as nx
+
+# scipy.sparse and networkx are only imported where they are needed, to keep
+# `import openpathsampling` fast.
 
 import logging
 logger = logging.getLogger(__name__)
@@ -164,6 +164,8 @@ class ReplicaNetwork(object):
         #attrib?"""
         if index_order == None:
             # reorder based on RCM from scipy.sparse.csgraph
+            import scipy.sparse
+            from scipy.sparse.csgraph import reverse_cuthill_mckee
             rcm_perm = reverse_cuthill_mckee(matrix.tocsr())
             rev_perm_dict = {k : rcm_perm.tolist().index(k) for k in rcm_perm}
             perm_i = [rev_perm_dict[ii] for ii in matrix.row]
@@ -203,6 +205,7 @@ class ReplicaNetwork(object):
         self.initial_order(index_order)
         i = [self.ensemble_to_number[e] for e in ens_i]
         j = [self.ensemble_to_number[e] for e in ens_j]
+        import scipy.sparse
         matrix = scipy.sparse.coo_matrix(
             (data, (i, j)), 
             shape=(self.n_ensembles, self.n_ensembles)
@@ -446,6 +449,7 @@ class ReplicaNetworkGraph(object):
         replica exchange network object
     """
     def __init__(self, repx_network):
+        import networkx as nx
         (n_try, n_acc) = repx_network.analyze_exchanges()
         self.graph = nx.Graph()
         n_accs_adj = {}
@@ -477,6 +481,7 @@ class ReplicaNetworkGraph(object):
             layout method. Default is "graphviz", which also requires
             installation of pygraphviz. 
         """
+        import networkx as nx
         if layout == "graphviz":
             pos = nx.graphviz_layout(self.graph)
         elif layout == "spring":
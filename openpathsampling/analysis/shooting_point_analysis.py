@@ -2,7 +2,6 @@ import openpathsampling as paths
 import collections
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 
 # based on http://stackoverflow.com/a/3387975
 class TransformedDict(collections.MutableMapping):
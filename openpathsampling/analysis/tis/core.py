@@ -234,6 +234,31 @@ class EnsembleHistogrammer(MultiEnsembleSamplingAnalyzer):
             self.hists[ens].histogram(data, weights)
         return self.hists
 
+    @staticmethod
+    def combine_results(result_1, result_2):
+        """Combine two sets of results from this analysis.
+
+        The histograms of each ensemble are summed, so the combined result
+        is the same as the result of analyzing both sets of steps together.
+
+        Parameters
+        ----------
+        result_1 : dict of {:class:`.Ensemble`: :class:`.numerics.Histogram`}
+            first set of results from a histogram calculation
+        result_2 : dict of {:class:`.Ensemble`: :class:`.numerics.Histogram`}
+            second set of results from a histogram calculation
+
+        Returns
+        -------
+        dict of {:class:`.Ensemble`: :class:`.numerics.Histogram`}
+            summed histogram for each ensemble
+        """
+        if set(result_1.keys()) != set(result_2.keys()):
+            raise RuntimeError("Combining results for different ensembles")
+        sum_histograms = paths.numerics.Histogram.sum_histograms
+        return {ens: sum_histograms([result_1[ens], result_2[ens]])
+                for ens in result_1}
+
 
 class TISAnalysis(StorableNamedObject):
     """
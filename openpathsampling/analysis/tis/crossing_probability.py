@@ -33,8 +33,8 @@ class FullHistogramMaxLambdas(EnsembleHistogrammer):
     def __init__(self, transition, hist_parameters, max_lambda_func=None):
         self.transition = transition
         if max_lambda_func is None:
-            max_lambda_func = lambda t: max(transition.interfaces.cv(t))
-            #max_lambda_func = transition.interfaces.max_cv  # TODO traj-cv
+            # cached per trajectory, so repeated analysis is cheap
+            max_lambda_func = transition.interfaces.max_cv
         self.lambdas = {e: l for (e, l) in zip(transition.ensembles,
                                                transition.interfaces.lambdas)}
         super(FullHistogramMaxLambdas, self).__init__(
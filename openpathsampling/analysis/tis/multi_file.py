@@ -0,0 +1,211 @@
+import collections
+import copy
+import functools
+import multiprocessing
+import os
+
+import openpathsampling as paths
+import numpy as np
+
+from .core import steps_to_weighted_trajectories
+from .flux import DictFlux
+
+# the task of the running analysis; worker processes inherit it when they
+# are forked, so neither the functions nor the analysis objects (which
+# often contain lambdas) need to be pickled
+_task = None
+
+
+def _run_task(file_idx):
+    function, filenames, storage_class = _task
+    storage = storage_class(filenames[file_idx])
+    try:
+        return function(storage)
+    finally:
+        storage.close()
+
+
+def _fork_context():
+    """Multiprocessing context that forks or `None` if there is none"""
+    try:
+        return multiprocessing.get_context('fork')
+    except AttributeError:
+        # python 2 forks wherever fork is available
+        return multiprocessing if hasattr(os, 'fork') else None
+    except ValueError:
+        return None
+
+
+class MultiFileAnalysis(object):
+    """
+    Analyze the steps in several storage files in parallel.
+
+    Each file, typically from an independent run, is opened and analyzed in
+    its own worker process. Only the partial results of each file (e.g.,
+    weighted trajectory counts, histograms or the times needed for the
+    flux) are sent back and reduced to the result for all files. This scales
+    with the number of files, while a :class:`.DistributedUUIDStorage`
+    loads all files into a single process.
+
+    Like in a :class:`.DistributedUUIDStorage`, trajectories are identified
+    by their UUID, so a trajectory that is stored in several files (such as
+    the initial conditions) is counted as the same trajectory.
+
+    Worker processes are forked; the analysis objects are inherited by the
+    workers and do not need to be picklable, but the partial results do. On
+    platforms without fork, the files are analyzed one after the other.
+
+    Parameters
+    ----------
+    filenames : list of str
+        the storage files to analyze
+    n_processes : int
+        the maximal number of worker processes; default is `None` which
+        uses one process per file up to the number of cores. Use `1` to
+        analyze all files in this process.
+    storage_class : callable
+        called with a filename to open the storage; default is `None`
+        which uses :class:`.AnalysisStorage`
+    """
+    def __init__(self, filenames, n_processes=None, storage_class=None):
+        self.filenames = list(filenames)
+        if n_processes is None:
+            n_processes = multiprocessing.cpu_count()
+        self.n_processes = max(1, min(n_processes, len(self.filenames)))
+        if storage_class is None:
+            storage_class = paths.AnalysisStorage
+        self.storage_class = storage_class
+
+    def map(self, function):
+        """Apply a function to the storage of each file.
+
+        Parameters
+        ----------
+        function : callable
+            called with an open storage; the storage is closed afterwards.
+            The return value must be picklable.
+
+        Returns
+        -------
+        list
+            the return value of `function` for each file (in the order of
+            :attr:`.filenames`)
+        """
+        global _task
+        context = _fork_context()
+        _task = (function, self.filenames, self.storage_class)
+        try:
+            if self.n_processes == 1 or context is None:
+                # copy, so results do not share state with the analysis
+                # objects, as if they were returned from a worker
+                return [copy.deepcopy(_run_task(idx))
+                        for idx in range(len(self.filenames))]
+
+            pool = context.Pool(self.n_processes)
+            try:
+                results = pool.map(_run_task, range(len(self.filenames)),
+                                   chunksize=1)
+            finally:
+                pool.terminate()
+                pool.join()
+            return results
+        finally:
+            _task = None
+
+    def weighted_trajectories(self, ensembles):
+        """Time spent by each trajectory in each ensemble, in all files.
+
+        Parameters
+        ----------
+        ensembles : list of :class:`.Ensemble`
+            ensembles to include
+
+        Returns
+        -------
+        dict of {:class:`.Ensemble`: collections.Counter}
+            the result, with the ensemble as key, and a counter mapping the
+            UUID of each trajectory associated with that ensemble to the
+            number of steps it spent in the ensemble
+        """
+        def partial(storage):
+            weighted_trajs = steps_to_weighted_trajectories(storage.steps,
+                                                            ensembles)
+            return [
+                collections.Counter({traj.__uuid__: weight
+                                     for traj, weight
+                                     in weighted_trajs[ens].items()})
+                for ens in ensembles
+            ]
+
+        results = {ens: collections.Counter() for ens in ensembles}
+        for counters in self.map(partial):
+            for ens, counter in zip(ensembles, counters):
+                results[ens] += counter
+        return results
+
+    def calculate(self, analyzer, keys=None):
+        """Run an analysis on each file and combine the results.
+
+        The analyzer must implement
+        :meth:`.MultiEnsembleSamplingAnalyzer.combine_results`, such as
+        the :class:`.EnsembleHistogrammer` subclasses.
+
+        Parameters
+        ----------
+        analyzer : :class:`.MultiEnsembleSamplingAnalyzer`
+            the analysis to run on the steps of each file
+        keys : list
+            the keys of the result dictionary of the analyzer; default is
+            `None` which uses the ensembles of the analyzer
+
+        Returns
+        -------
+        dict
+            the combined result; see the `calculate` method of the analyzer
+        """
+        if keys is None:
+            keys = analyzer.ensembles
+
+        def partial(storage):
+            result = analyzer.calculate(storage.steps)
+            # the keys are objects of this process, so only the values are
+            # returned
+            return [result[key] for key in keys]
+
+        results = [dict(zip(keys, values)) for values in self.map(partial)]
+        return functools.reduce(analyzer.combine_results, results)
+
+    def flux(self, flux_method):
+        """Calculate the flux from the steps of all files.
+
+        For a :class:`.MinusMoveFlux`, the flux is the same as if all minus
+        move steps were analyzed together.
+
+        Parameters
+        ----------
+        flux_method : :class:`.MinusMoveFlux` or :class:`.DictFlux`
+            the method to calculate the flux
+
+        Returns
+        -------
+        dict of {(:class:`.Volume`, :class:`.Volume`): float}
+            keys are (state, interface); values are the associated flux
+        """
+        if isinstance(flux_method, DictFlux):
+            return flux_method.flux_dict
+
+        flux_pairs = flux_method.flux_pairs
+
+        def partial(storage):
+            flux_dicts = flux_method.intermediates(storage.steps)[0]
+            return np.array([
+                [len(flux_dicts[pair][direction]),
+                 np.sum(flux_dicts[pair][direction].times)]
+                for pair in flux_pairs for direction in ['in', 'out']
+            ]).reshape(len(flux_pairs), 2, 2)
+
+        totals = sum(self.map(partial))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_times = totals[:, :, 1] / totals[:, :, 0]
+            fluxes = 1.0 / mean_times.sum(axis=1)
+        return {pair: float(flux) for pair, flux in zip(flux_pairs, fluxes)}
@@ -1,6 +1,49 @@
 import openpathsampling as paths
 import numpy as np
 
+
+def _runs(mask):
+    """Run-length encoding of the `True` frames in a boolean mask.
+
+    Returns
+    -------
+    starts, stops : numpy.ndarray
+        `mask[starts[i]:stops[i]]` is the i-th (maximal) run of `True`
+    """
+    padded = np.concatenate([[0], np.asarray(mask, dtype=np.int8), [0]])
+    changes = np.flatnonzero(np.diff(padded))
+    return changes[0::2], changes[1::2]
+
+
+def _lifetime_slices(from_mask, to_mask, forbidden_mask):
+    """Start and stop indices of the lifetime segments from boolean masks.
+
+    See :meth:`.TrajectoryTransitionAnalysis.get_lifetime_segments`. The
+    stop index includes the frame in `to_vol`, i.e., no padding is applied.
+    """
+    to_idx = np.flatnonzero(to_mask)
+    from_idx = np.flatnonzero(from_mask)
+    if len(to_idx) < 2 or len(from_idx) == 0:
+        return [], []
+
+    # each pair of consecutive frames in to_vol brackets a candidate
+    entries = to_idx[:-1]
+    exits = to_idx[1:]
+
+    # there must be a frame in from_vol between the two frames in to_vol
+    after = np.searchsorted(from_idx, entries, side='right')
+    first_after = from_idx[np.minimum(after, len(from_idx) - 1)]
+    valid = (after < len(from_idx)) & (first_after < exits)
+
+    # no frame from entry to exit may be forbidden
+    n_forbidden = np.concatenate(
+        [[0], np.cumsum(np.asarray(forbidden_mask, dtype=np.int64))])
+    valid &= n_forbidden[exits + 1] == n_forbidden[entries]
+
+    # the lifetime starts with the first frame in from_vol
+    starts = np.where(np.asarray(from_mask)[entries], entries, first_after)
+    return starts[valid], exits[valid] + 1
+
 class TrajectorySegmentContainer(object):
     """Container object to analyze lists of trajectories (or segments).
 
@@ -99,8 +142,46 @@ class TrajectoryTransitionAnalysis(object):
         self.dt = dt
         self.stateA = transition.stateA
         self.stateB = transition.stateB - transition.stateA
+        self._mask_trajectory = None
+        self._mask_length = 0
+        self._masks = {}
         self.reset_analysis()
 
+    def _volume_mask(self, trajectory, volume):
+        """Which frames of `trajectory` are in `volume`.
+
+        The volume is evaluated once for all frames, and the result is kept
+        until a different trajectory is analyzed.
+        """
+        if trajectory is not self._mask_trajectory or \
+                len(trajectory) != self._mask_length:
+            self._mask_trajectory = trajectory
+            self._mask_length = len(trajectory)
+            self._masks = {}
+
+        try:
+            return self._masks[volume]
+        except KeyError:
+            mask = volume.evaluate_batch(trajectory)
+            self._masks[volume] = mask
+            return mask
+
+    def _clear_masks(self):
+        self._mask_trajectory = None
+        self._masks = {}
+
+    @staticmethod
+    def _slice_segments(trajectory, starts, stops, padding=(None, None)):
+        """Cut `trajectory[start:stop][padding[0]:padding[1]]` for each pair
+        """
+        segments = []
+        for start, stop in zip(starts, stops):
+            first, last, _ = slice(*padding).indices(int(stop - start))
+            first += int(start)
+            last = max(last + int(start), first)
+            segments.append(trajectory[first:last])
+        return segments
+
     def reset_analysis(self):
         """Reset the analysis by emptying all saved segments."""
         stateA = self.stateA
@@ -166,8 +247,8 @@ class TrajectoryTransitionAnalysis(object):
             state volume to characterize. Must be one of the states in the
             transition
         """
-        ensemble = paths.AllInXEnsemble(state)
-        segments = ensemble.split(trajectory, overlap=0)
+        starts, stops = _runs(self._volume_mask(trajectory, state))
+        segments = self._slice_segments(trajectory, starts, stops)
         return TrajectorySegmentContainer(segments, self.dt)
 
     @staticmethod
@@ -216,19 +297,14 @@ class TrajectoryTransitionAnalysis(object):
         """
         if forbidden is None:
             forbidden = paths.EmptyVolume()
-        ensemble_BAB = paths.SequentialEnsemble([
-            paths.LengthEnsemble(1) & paths.AllInXEnsemble(to_vol),
-            paths.PartInXEnsemble(from_vol) & paths.AllOutXEnsemble(to_vol),
-            paths.LengthEnsemble(1) & paths.AllInXEnsemble(to_vol)
-        ]) & paths.AllOutXEnsemble(forbidden)
-        ensemble_AB = paths.SequentialEnsemble([
-            paths.LengthEnsemble(1) & paths.AllInXEnsemble(from_vol),
-            paths.OptionalEnsemble(paths.AllOutXEnsemble(to_vol)),
-            paths.LengthEnsemble(1) & paths.AllInXEnsemble(to_vol) 
-        ])
-        BAB_split = ensemble_BAB.split(trajectory)
-        AB_split = [ensemble_AB.split(part)[0] for part in BAB_split]
-        return [subtraj[padding[0]:padding[1]] for subtraj in AB_split]
+        starts, stops = _lifetime_slices(
+            from_mask=from_vol.evaluate_batch(trajectory),
+            to_mask=to_vol.evaluate_batch(trajectory),
+            forbidden_mask=forbidden.evaluate_batch(trajectory)
+        )
+        return TrajectoryTransitionAnalysis._slice_segments(
+            trajectory, starts, stops, padding
+        )
 
 
     def analyze_lifetime(self, trajectory, state):
@@ -249,11 +325,13 @@ class TrajectoryTransitionAnalysis(object):
             `stateB`
         """
         other_state = list(set([self.stateA, self.stateB]) - set([state]))[0]
-        segments = self.get_lifetime_segments(
-            trajectory=trajectory,
-            from_vol=state,
-            to_vol=other_state
+        starts, stops = _lifetime_slices(
+            from_mask=self._volume_mask(trajectory, state),
+            to_mask=self._volume_mask(trajectory, other_state),
+            forbidden_mask=np.zeros(len(trajectory), dtype=bool)
         )
+        segments = self._slice_segments(trajectory, starts, stops,
+                                        padding=(0, -1))
         return TrajectorySegmentContainer(segments, self.dt)
 
     def analyze_transition_duration(self, trajectory, stateA, stateB):
@@ -273,16 +351,18 @@ class TrajectoryTransitionAnalysis(object):
         :class:`.TrajectorySegmentContainer`
             transitions from `stateA` to `stateB` within `trajectory`
         """
-        # we define the transitions ensemble just in case the transition is,
-        # e.g., fixed path length TPS. We want flexible path length ensemble
-        transition_ensemble = paths.SequentialEnsemble([
-            paths.AllInXEnsemble(stateA) & paths.LengthEnsemble(1),
-            paths.OptionalEnsemble( # optional to allow instantaneous hops
-                paths.AllOutXEnsemble(stateA) & paths.AllOutXEnsemble(stateB)
-            ),
-            paths.AllInXEnsemble(stateB) & paths.LengthEnsemble(1)
-        ])
-        segments = [seg[1:-1] for seg in transition_ensemble.split(trajectory)]
+        # a transition are the frames between a frame in stateA and the next
+        # frame in either state, if that is in stateB; this can be empty for
+        # instantaneous hops
+        in_A = self._volume_mask(trajectory, stateA)
+        in_B = self._volume_mask(trajectory, stateB)
+        in_state = np.flatnonzero(in_A | in_B)
+        last_in_state = in_state[:-1]
+        next_in_state = in_state[1:]
+        valid = in_A[last_in_state] & in_B[next_in_state]
+        segments = self._slice_segments(trajectory,
+                                        last_in_state[valid] + 1,
+                                        next_in_state[valid])
         return TrajectorySegmentContainer(segments, self.dt)
 
     def analyze_flux(self, trajectories, state, interface=None):
@@ -317,6 +397,8 @@ class TrajectoryTransitionAnalysis(object):
             for traj in trajectories
         ]
 
+        self._clear_masks()
+
         empty = TrajectorySegmentContainer([], dt=self.dt)
         total_in = sum([flux['in'] for flux in all_flux_dicts], empty)
         total_out = sum([flux['out'] for flux in all_flux_dicts], empty)
@@ -325,21 +407,25 @@ class TrajectoryTransitionAnalysis(object):
 
     def _analyze_flux_single_traj(self, trajectory, state, interface):
         other = list(set([self.stateA, self.stateB]) - set([state]))[0]
-        out_segments = self.get_lifetime_segments(
-            trajectory=trajectory,
-            from_vol=~interface,
-            to_vol=state,
-            forbidden=other,
-            padding=[None, -1]
+        in_state = self._volume_mask(trajectory, state)
+        in_interface = self._volume_mask(trajectory, interface)
+        in_other = self._volume_mask(trajectory, other)
+
+        starts, stops = _lifetime_slices(
+            from_mask=~in_interface,
+            to_mask=in_state,
+            forbidden_mask=in_other
         )
+        out_segments = self._slice_segments(trajectory, starts, stops,
+                                            padding=(None, -1))
         out_container = TrajectorySegmentContainer(out_segments, self.dt)
-        in_segments = self.get_lifetime_segments(
-            trajectory=trajectory,
-            from_vol=state,
-            to_vol=~interface,
-            forbidden=other,
-            padding=[None, -1]
+        starts, stops = _lifetime_slices(
+            from_mask=in_state,
+            to_mask=~in_interface,
+            forbidden_mask=in_other
         )
+        in_segments = self._slice_segments(trajectory, starts, stops,
+                                           padding=(None, -1))
         in_container = TrajectorySegmentContainer(in_segments, self.dt)
         return {'in': in_container, 'out': out_container}
 
@@ -388,6 +474,8 @@ class TrajectoryTransitionAnalysis(object):
                                                              self.stateA)
             t_segs[(self.stateA, self.stateB)] += t_duration_AB
             t_segs[(self.stateB, self.stateA)] += t_duration_BA
+
+        self._clear_masks()
         # return self so we can init and analyze in one line
         return self
 
@@ -1,8 +1,16 @@
+import copy
+import multiprocessing
+import threading
+import weakref
+
+import numpy as np
+
 import openpathsampling.engines as peng
 import openpathsampling.netcdfplus.chaindict as cd
 from openpathsampling.engines.openmm.tools import trajectory_to_mdtraj
-from openpathsampling.netcdfplus import WeakKeyCache, \
+from openpathsampling.netcdfplus import WeakKeyCache, LRUCache, \
     ObjectJSON, create_to_dict, ObjectStore, PseudoAttribute
+from openpathsampling.timing import timed
 
 import sys
 if sys.version_info > (3, ):
@@ -11,6 +19,214 @@ else:
     get_code = lambda func: func.func_code
 
 
+# ==============================================================================
+#  SHARED MDTRAJ CONVERSIONS
+# ==============================================================================
+
+class MDTrajConversionCache(object):
+    """
+    Share the conversion of snapshots to `mdtraj.Trajectory` between CVs
+
+    All CVs that need an :class:`mdtraj.Trajectory` get it from here, so
+    several CVs evaluated on the same snapshots only convert them once.
+    Conversions are keyed by the UUIDs of the snapshots and the mdtraj
+    topology, so the snapshots themselves are not kept alive.
+
+    Only the conversion is shared, not the arrays: every call returns its
+    own `mdtraj.Trajectory` with copies of the coordinates, time and box.
+    Functions that change the trajectory in place (e.g. `superpose` or
+    `center_coordinates`) therefore do not change the values of other CVs.
+    Read-only views of one array are not an option, because the compiled
+    mdtraj functions (e.g. `compute_distances`) refuse read-only input.
+    Copying the arrays is still a lot cheaper than converting the snapshots
+    again.
+
+    Parameters
+    ----------
+    size_limit : int
+        the number of conversions to keep. Default is 8.
+
+    Attributes
+    ----------
+    enabled : bool
+        if `False` every call creates a new conversion
+    hits : int
+        number of conversions that were reused
+    misses : int
+        number of conversions that had to be created
+    """
+
+    def __init__(self, size_limit=8):
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._cache = LRUCache(size_limit)
+        self._lock = threading.Lock()
+
+    def __call__(self, items, md_topology):
+        """
+        Return the `mdtraj.Trajectory` for a list of snapshots
+
+        Parameters
+        ----------
+        items : list of :class:`openpathsampling.engines.BaseSnapshot`
+            the snapshots to be converted
+        md_topology : :class:`mdtraj.Topology`
+            the topology to be used
+
+        Returns
+        -------
+        :class:`mdtraj.Trajectory`
+        """
+        if not self.enabled:
+            return trajectory_to_mdtraj(peng.Trajectory(items), md_topology)
+
+        key = (id(md_topology), tuple(item.__uuid__ for item in items))
+        with self._lock:
+            cached = self._cache.get(key)
+
+        if cached is not None and cached[0] is md_topology:
+            self.hits += 1
+            return self._copy(cached[1])
+
+        self.misses += 1
+        md_trajectory = trajectory_to_mdtraj(
+            peng.Trajectory(items), md_topology)
+        with self._lock:
+            self._cache[key] = (md_topology, md_trajectory)
+
+        return self._copy(md_trajectory)
+
+    @staticmethod
+    def _copy(md_trajectory):
+        # the topology is shared, the arrays that can be changed in place
+        # are not
+        result = copy.copy(md_trajectory)
+        result.xyz = md_trajectory.xyz.copy()
+        result.time = md_trajectory.time.copy()
+        if md_trajectory.unitcell_vectors is not None:
+            result.unitcell_vectors = md_trajectory.unitcell_vectors.copy()
+
+        return result
+
+    def clear(self):
+        """Remove all conversions"""
+        self._cache.clear()
+
+
+mdtraj_conversion_cache = MDTrajConversionCache()
+
+
+def _dependency_order(cvs):
+    """
+    All CVs and their inputs, inputs before the CVs using them
+
+    CVs using the same mdtraj topology are put right after each other.
+    """
+    levels = {}
+    graph = []
+
+    def add_to_graph(cv):
+        # the level of a CV is the length of the longest path to an input
+        if id(cv) not in levels:
+            inputs = getattr(cv, 'inputs', [])
+            levels[id(cv)] = 1 + max(
+                [add_to_graph(inp) for inp in inputs] + [-1])
+            graph.append(cv)
+
+        return levels[id(cv)]
+
+    for cv in cvs:
+        add_to_graph(cv)
+
+    def order_key(cv):
+        topology = getattr(cv, 'topology', None)
+        return levels[id(cv)], topology is None, id(topology)
+
+    return sorted(graph, key=order_key)
+
+
+def evaluate_in_dependency_order(cvs, items):
+    """
+    Evaluate several CVs on the same snapshots, inputs first
+
+    This calls all CVs and the CVs they depend on (see :class:`DerivedCV`)
+    one after the other on all snapshots, inputs before the CVs using them.
+    Each CV is still evaluated on its own; the order only makes sure that
+    shared inputs are computed once and then found in the cache. CVs using
+    the same mdtraj topology are called right after each other, so they
+    reuse one conversion to `mdtraj.Trajectory` from
+    :data:`mdtraj_conversion_cache`.
+
+    Parameters
+    ----------
+    cvs : list of :class:`CollectiveVariable`
+        the CVs to be evaluated
+    items : :class:`openpathsampling.engines.BaseSnapshot` or list of them
+        the snapshots (or a trajectory) to evaluate the CVs on
+
+    Returns
+    -------
+    list
+        the results, one for each CV in the order of `cvs`
+    """
+    results = {}
+    for cv in _dependency_order(cvs):
+        results[id(cv)] = cv(items)
+
+    return [results[id(cv)] for cv in cvs]
+
+
+# ==============================================================================
+#  ASYNCHRONOUS EVALUATION
+# ==============================================================================
+
+_default_executor = None
+_async_cvs = weakref.WeakSet()
+
+
+def default_cv_executor():
+    """
+    Return the thread pool shared by all asynchronous CVs
+
+    The pool is created on first use with one thread less than there are
+    cores, so the engine keeps one core for itself.
+
+    Returns
+    -------
+    :class:`concurrent.futures.ThreadPoolExecutor`
+    """
+    global _default_executor
+    if _default_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _default_executor = ThreadPoolExecutor(
+            max_workers=max(1, multiprocessing.cpu_count() - 1))
+
+    return _default_executor
+
+
+def submit_async(items):
+    """
+    Start evaluating all asynchronous CVs for the given snapshots
+
+    Engines call this for frames they generate ahead of the stopping
+    conditions (see the `n_frames_speculative` engine option), so the CV
+    values are ready when the conditions ask for them. CVs that are not
+    asynchronous ignore this.
+
+    Parameters
+    ----------
+    items : list of :class:`openpathsampling.engines.BaseSnapshot`
+    """
+    async_cvs = list(_async_cvs)
+    async_ids = set(id(cv) for cv in async_cvs)
+    # inputs go first, so a derived CV evaluated by a worker finds the
+    # values of its inputs computed or being computed
+    for cv in _dependency_order(async_cvs):
+        if id(cv) in async_ids:
+            cv.submit(items)
+
+
 # ==============================================================================
 #  CLASS CollectiveVariable
 # ==============================================================================
@@ -61,13 +277,18 @@ class CollectiveVariable(PseudoAttribute):
         self.diskcache_chunksize = ObjectStore.default_store_chunk_size
         self._cache_dict = cd.ReversibleCacheChainDict(
             WeakKeyCache(),
-            reversible=cv_time_reversible
+            reversible=cv_time_reversible,
+            trace_name=name
         )
 
         self._single_dict._post = self._cache_dict
 
         # self._post = self._single_dict > self._cache_dict
 
+    def __call__(self, items):
+        with timed('cv'):
+            return self._post[items]
+
     to_dict = create_to_dict(['name', 'cv_time_reversible'])
 
 
@@ -210,6 +431,8 @@ class CallableCV(CollectiveVariable):
         self.cv_scalarize_numpy_singletons = cv_scalarize_numpy_singletons
 
         self.cv_callable = cv_callable
+        self.cv_executor = None
+        self._pending_dict = None
 
         if kwargs is None:
             kwargs = dict()
@@ -249,6 +472,85 @@ class CallableCV(CollectiveVariable):
 
         return obj
 
+    def with_async(self, executor=None):
+        """
+        Allow evaluating this CV in the background
+
+        Snapshots passed to :meth:`submit` are evaluated by the executor
+        while the caller continues. Asking for the value of a submitted
+        snapshot waits for the result, all other snapshots are evaluated
+        as usual. The function needs to be thread safe if used with a thread
+        pool and picklable if used with a process pool.
+
+        Parameters
+        ----------
+        executor : :class:`concurrent.futures.Executor` or None
+            the executor to be used. If `None` (default) a thread pool
+            shared by all CVs is used, see :func:`default_cv_executor`
+
+        Returns
+        -------
+        :class:`CallableCV`
+            the CV itself
+        """
+        if executor is None:
+            executor = default_cv_executor()
+
+        self.cv_executor = executor
+
+        if self._pending_dict is None:
+            self._pending_dict = cd.Pending()
+            self._pending_dict._post = self._eval_dict
+            self._eval_dict = self._pending_dict
+            self._update_store_dict()
+
+        _async_cvs.add(self)
+        return self
+
+    def disable_async(self):
+        """
+        Evaluate this CV only on request again
+
+        Returns
+        -------
+        :class:`CallableCV`
+            the CV itself
+        """
+        if self._pending_dict is not None:
+            self._eval_dict = self._pending_dict._post
+            self._pending_dict = None
+            self._update_store_dict()
+
+        self.cv_executor = None
+        _async_cvs.discard(self)
+        return self
+
+    def submit(self, items):
+        """
+        Start evaluating snapshots in the background
+
+        Does nothing if the CV is not asynchronous (see :meth:`with_async`)
+        or the values are already cached.
+
+        Parameters
+        ----------
+        items : :class:`openpathsampling.engines.BaseSnapshot` or list of
+            the snapshots to be evaluated
+
+        Returns
+        -------
+        :class:`concurrent.futures.Future` or None
+            the future of the results or None if nothing was submitted
+        """
+        if self._pending_dict is None:
+            return None
+
+        if isinstance(items, peng.BaseSnapshot):
+            items = [items]
+
+        items = [item for item in items if self._cache_dict._get(item) is None]
+        return self._pending_dict.submit(self.cv_executor, items)
+
     # def __eq__(self, other):
     #     """Override the default Equals behavior"""
     #     if isinstance(other, self.__class__):
@@ -336,6 +638,196 @@ class FunctionCV(CallableCV):
         return self.cv_callable(items, **self.kwargs)
 
 
+class DerivedCV(FunctionCV):
+    """Make a `CollectiveVariable` from the values of other CVs.
+
+    The function is called with the values of all input CVs,
+    `f(input_1_values, input_2_values, ..., **kwargs)`. Inputs are regular
+    CVs with their own caches, so an expensive quantity used by several
+    derived CVs is only computed once for each snapshot. Use
+    :func:`evaluate_in_dependency_order` to evaluate a set of CVs with all
+    their inputs in one pass.
+
+    Examples
+    --------
+    >>> distances = MDTrajFunctionCV('d', md.compute_distances, topology,
+    >>>                              atom_pairs=pairs)
+    >>> n_contacts = DerivedCV('n', lambda d: (d < 0.5).sum(axis=-1),
+    >>>                        inputs=[distances])
+    >>> min_distance = DerivedCV('min_d', lambda d: d.min(axis=-1),
+    >>>                          inputs=[distances])
+
+    Attributes
+    ----------
+    inputs : list of :class:`CollectiveVariable`
+        the CVs whose values are passed to the function
+    """
+
+    def __init__(
+            self,
+            name,
+            f,
+            inputs,
+            cv_time_reversible=None,
+            cv_requires_lists=True,
+            cv_wrap_numpy_array=True,
+            cv_scalarize_numpy_singletons=False,
+            **kwargs
+    ):
+        """
+        Parameters
+        ----------
+        name : str
+        f : (callable) function
+            The function to be used. If `cv_requires_lists` is `True` it is
+            called with the values of the inputs for a list of snapshots,
+            converted to numpy arrays.
+        inputs : list of :class:`CollectiveVariable`
+            the CVs whose values are the arguments of `f`
+        cv_time_reversible : bool or None
+            if `None` (default) the CV is time reversible if all inputs are
+        cv_requires_lists
+        cv_wrap_numpy_array
+        cv_scalarize_numpy_singletons
+        kwargs
+            a dictionary of named arguments which should be given to `f`
+
+        See also
+        --------
+        `openpathsampling.CallableCV`
+
+        """
+        self.inputs = list(inputs)
+
+        if cv_time_reversible is None:
+            cv_time_reversible = all(
+                inp.cv_time_reversible for inp in self.inputs)
+
+        super(DerivedCV, self).__init__(
+            name,
+            f,
+            cv_time_reversible=cv_time_reversible,
+            cv_requires_lists=cv_requires_lists,
+            cv_wrap_numpy_array=cv_wrap_numpy_array,
+            cv_scalarize_numpy_singletons=cv_scalarize_numpy_singletons,
+            **kwargs
+        )
+
+    def _eval(self, items):
+        values = [inp(items) for inp in self.inputs]
+        if self.cv_requires_lists:
+            values = [np.asarray(value) for value in values]
+
+        return self.cv_callable(*values, **self.kwargs)
+
+    def to_dict(self):
+        dct = super(DerivedCV, self).to_dict()
+        dct['inputs'] = self.inputs
+        return dct
+
+
+class TrajectoryCV(PseudoAttribute):
+    """Reduce the values of a `CollectiveVariable` over whole trajectories.
+
+    The value is computed once per trajectory from the (cached) snapshot
+    values and then kept in a cache keyed by the trajectory, so repeated
+    analysis passes cost O(number of trajectories) instead of O(number of
+    frames). With a disk cache the values are stored next to the
+    trajectories and computed when a trajectory is saved.
+
+    Use :meth:`of` to get the instance shared by everyone using the same
+    CV and reduction, so that its cache is shared, too.
+
+    Examples
+    --------
+    >>> max_lambda = TrajectoryCV.of(cv_x, 'max')
+    >>> max_lambda(trajectory)
+    >>> storage.save(max_lambda.with_diskcache())
+
+    Attributes
+    ----------
+    cv : :class:`CollectiveVariable`
+        the snapshot CV to be reduced
+    reduction : str
+        one of `max`, `min`, `first`, `last`, `argmax`, `argmin` or
+        `length`
+    """
+
+    reductions = {
+        'max': lambda values: np.max(values, axis=0),
+        'min': lambda values: np.min(values, axis=0),
+        'first': lambda values: values[0],
+        'last': lambda values: values[-1],
+        'argmax': lambda values: int(np.argmax(values)),
+        'argmin': lambda values: int(np.argmin(values)),
+        'length': len
+    }
+
+    # the shared instances for each CV: {cv: {reduction: TrajectoryCV}}
+    _shared = weakref.WeakKeyDictionary()
+
+    def __init__(self, name, cv, reduction):
+        """
+        Parameters
+        ----------
+        name : str
+        cv : :class:`CollectiveVariable`
+            the snapshot CV to be reduced
+        reduction : str
+            the name of the reduction, a key of `TrajectoryCV.reductions`
+        """
+        if reduction not in self.reductions:
+            raise ValueError(
+                'Unknown reduction "%s". Use one of %s' % (
+                    reduction, ', '.join(sorted(self.reductions))))
+
+        super(TrajectoryCV, self).__init__(name, peng.Trajectory)
+
+        self.cv = cv
+        self.reduction = reduction
+        self._reduce = self.reductions[reduction]
+
+        self._eval_dict = cd.Function(
+            self._eval,
+            requires_lists=False
+        )
+
+        self._post = self._post > self._eval_dict
+
+        self._shared.setdefault(cv, {}).setdefault(reduction, self)
+
+    @classmethod
+    def of(cls, cv, reduction):
+        """
+        Return the shared trajectory CV for a CV and a reduction
+
+        The first instance created for `cv` and `reduction` is shared. This
+        includes instances loaded from a storage.
+
+        Parameters
+        ----------
+        cv : :class:`CollectiveVariable`
+        reduction : str
+
+        Returns
+        -------
+        :class:`TrajectoryCV`
+        """
+        shared = cls._shared.get(cv, {})
+        if reduction in shared:
+            return shared[reduction]
+
+        return cls('%s(%s)' % (reduction, cv.name), cv, reduction)
+
+    def _eval(self, trajectory):
+        if self.reduction == 'length':
+            return len(trajectory)
+
+        return self._reduce(np.asarray(self.cv(trajectory)))
+
+    to_dict = create_to_dict(['name', 'cv', 'reduction'])
+
+
 class CoordinateFunctionCV(FunctionCV):
     """Turn any function into a `CollectiveVariable`.
 
@@ -558,9 +1050,7 @@ class MDTrajFunctionCV(CoordinateFunctionCV):
         self.topology = topology
 
     def _eval(self, items):
-        trajectory = peng.Trajectory(items)
-
-        t = trajectory_to_mdtraj(trajectory, self.topology.mdtraj)
+        t = mdtraj_conversion_cache(items, self.topology.mdtraj)
         return self.cv_callable(t, **self.kwargs)
 
     @property
@@ -649,10 +1139,8 @@ class MSMBFeaturizerCV(CoordinateGeneratorCV):
         return self.cv_callable
 
     def _eval(self, items):
-        trajectory = peng.Trajectory(items)
-
         # create an mdtraj trajectory out of it
-        ptraj = trajectory_to_mdtraj(trajectory, self.topology.mdtraj)
+        ptraj = mdtraj_conversion_cache(items, self.topology.mdtraj)
 
         # run the featurizer
         return self._instance.partial_transform(ptraj)
@@ -734,9 +1222,7 @@ class PyEMMAFeaturizerCV(MSMBFeaturizerCV):
         )
 
     def _eval(self, items):
-        trajectory = peng.Trajectory(items)
-
-        t = trajectory_to_mdtraj(trajectory, self.topology.mdtraj)
+        t = mdtraj_conversion_cache(items, self.topology.mdtraj)
         return self._instance.transform(t)
 
     def to_dict(self):
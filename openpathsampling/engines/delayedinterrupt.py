@@ -1,5 +1,14 @@
 import signal
 import logging
+import threading
+
+
+def _in_main_thread():
+    try:
+        return threading.current_thread() is threading.main_thread()
+    except AttributeError:
+        # python 2 has no `threading.main_thread`
+        return threading.current_thread().name == 'MainThread'
 
 
 # class based on: http://stackoverflow.com/a/21919644/487556
@@ -14,6 +23,11 @@ class DelayedInterrupt(object):
     def __enter__(self):
         self.signal_received = {}
         self.old_handlers = {}
+        if not _in_main_thread():
+            # handlers can only be set in the main thread, which is also the
+            # only one receiving signals
+            self.sigs = []
+
         for sig in self.sigs:
             self.signal_received[sig] = False
             self.old_handlers[sig] = signal.getsignal(sig)
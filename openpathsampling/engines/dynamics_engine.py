@@ -5,12 +5,15 @@ Created on 01.07.2014
 @author: JH Prinz
 """
 
+import collections
 import logging
 import sys
 
 import simtk.unit as u
+import six
 
-from openpathsampling.netcdfplus import StorableNamedObject
+from openpathsampling.netcdfplus import StorableNamedObject, tracing
+from openpathsampling.timing import timed
 
 from .snapshot import BaseSnapshot
 from .trajectory import Trajectory
@@ -91,6 +94,19 @@ class DynamicsEngine(StorableNamedObject):
         4.  a callable will be used as a function to generate the new from the
             old trajectories, e.g. `lambda t: t[:10]` would restart with the
             first 10 frames
+    n_frames_speculative : int, default: 0
+        the number of frames generated ahead of the stopping conditions.
+        Asynchronous CVs (see
+        :meth:`openpathsampling.CallableCV.with_async`) are evaluated on
+        these frames in the background while the engine continues. Frames
+        beyond the point where the simulation stops are discarded and the
+        engine continues from the last accepted frame. With deterministic
+        dynamics the trajectories are the same as without speculation.
+        Stochastic integrators (e.g. Langevin) have used random numbers for
+        the discarded frames, so later trajectories differ from a run
+        without speculation, although they are sampled correctly. Only
+        useful if the CV evaluation is expensive compared to generating a
+        frame.
 
     Notes
     -----
@@ -109,7 +125,8 @@ class DynamicsEngine(StorableNamedObject):
         'retries_when_error': 0,
         'retries_when_max_length': 0,
         'on_retry': 'full',
-        'on_error': 'fail'
+        'on_error': 'fail',
+        'n_frames_speculative': 0
     }
 
     units = {
@@ -508,13 +525,15 @@ class DynamicsEngine(StorableNamedObject):
 
             frame = 0
             # maybe we should stop before we even begin?
-            stop = self.stop_conditions(trajectory=trajectory,
-                                        continue_conditions=running,
-                                        trusted=False)
+            with timed('ensemble'):
+                stop = self.stop_conditions(trajectory=trajectory,
+                                            continue_conditions=running,
+                                            trusted=False)
 
             log_rate = 10
             has_nan = False
             has_error = False
+            ahead = collections.deque()
 
             while not stop:
                 if intervals > 0 and frame % intervals == 0:
@@ -530,8 +549,19 @@ class DynamicsEngine(StorableNamedObject):
                 snapshot = None
 
                 try:
-                    with DelayedInterrupt():
-                        snapshot = self.generate_next_frame()
+                    with DelayedInterrupt(), timed('engine'):
+                        tracer = tracing.active
+                        if tracer is None:
+                            snapshot = self._next_frame(ahead, direction)
+                        else:
+                            trace_name = '%s.next_frame' % (
+                                self.name or self.__class__.__name__)
+                            trace_start = tracer.begin(trace_name)
+                            try:
+                                snapshot = self._next_frame(ahead,
+                                                            direction)
+                            finally:
+                                tracer.end(trace_name, trace_start)
 
                         # if self.on_nan != 'ignore' and \
                         if not self.is_valid_snapshot(snapshot):
@@ -596,8 +626,20 @@ class DynamicsEngine(StorableNamedObject):
 
                 if stop is False:
                     # Check if we should stop. If not, continue simulation
-                    stop = self.stop_conditions(trajectory=trajectory,
-                                            continue_conditions=running)
+                    with timed('ensemble'):
+                        stop = self.stop_conditions(
+                            trajectory=trajectory,
+                            continue_conditions=running)
+
+            if ahead:
+                # roll back the frames generated beyond the stopping point
+                logger.info(
+                    "Discarding %d speculative frames", len(ahead))
+                ahead.clear()
+                if direction > 0:
+                    self.current_snapshot = trajectory[-1]
+                elif direction < 0:
+                    self.current_snapshot = trajectory[0].reversed
 
             if has_nan:
                 on = self.on_nan
@@ -646,6 +688,59 @@ class DynamicsEngine(StorableNamedObject):
     def generate_next_frame(self):
         raise NotImplementedError('Next frame generation must be implemented!')
 
+    def _next_frame(self, ahead, direction):
+        """
+        Return the next frame, keeping frames generated in advance
+
+        Up to `n_frames_speculative` frames are generated beyond the
+        returned one and submitted to the asynchronous CVs. An error while
+        generating in advance is raised once its frame is reached.
+
+        Parameters
+        ----------
+        ahead : collections.deque
+            the frames generated in advance, the oldest first. An entry
+            can also be the `sys.exc_info()` of a failed generation
+        direction : -1 or +1
+            the direction of the trajectory, used to submit the snapshots
+            as they will appear in the trajectory
+
+        Returns
+        -------
+        :class:`openpathsampling.engines.BaseSnapshot`
+        """
+        n_ahead = self.options.get('n_frames_speculative') or 0
+        if n_ahead <= 0 and not ahead:
+            return self.generate_next_frame()
+
+        from openpathsampling.collectivevariable import submit_async
+
+        while len(ahead) <= n_ahead:
+            if ahead and (type(ahead[-1]) is tuple or
+                          not self.is_valid_snapshot(ahead[-1])):
+                # do not continue from a failed frame
+                break
+
+            try:
+                snapshot = self.generate_next_frame()
+            except KeyboardInterrupt:
+                raise
+            except:
+                if not ahead:
+                    raise
+
+                ahead.append(sys.exc_info())
+                break
+
+            ahead.append(snapshot)
+            submit_async([snapshot if direction > 0 else snapshot.reversed])
+
+        snapshot = ahead.popleft()
+        if type(snapshot) is tuple:
+            six.reraise(*snapshot)
+
+        return snapshot
+
     def generate_n_frames(self, n_frames=1):
         """Generates n_frames, from but not including the current snapshot.
         
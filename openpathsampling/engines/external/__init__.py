@@ -0,0 +1,4 @@
+from .engine import ExternalEngine as Engine
+from .engine import ExternalEngine
+from .snapshot import ExternalSnapshot
+from .snapshot import ExternalSnapshot as Snapshot
@@ -0,0 +1,284 @@
+"""
+Engine running an MD code in a separate, long-lived process.
+
+The process is started once and keeps running between trajectories, so
+neither process start-up nor file round-trips are paid per trajectory.
+Frames are streamed through the pipes of the process, and the process
+works on the next frames while OPS checks the stopping conditions of the
+current one.
+
+Protocol
+--------
+The process reads commands from its stdin and writes replies to its
+stdout. Commands and reply headers are single lines of ASCII text. Arrays
+are sent as raw little-endian float64 directly after their header: the
+coordinates followed by the velocities, both of shape
+`(n_atoms, n_spatial)`.
+
+Commands
+
+    `state <nbytes>`
+        followed by `nbytes` of data: continue from these coordinates and
+        velocities
+    `frames <n>`
+        generate the next `n` frames and send each one as soon as it is
+        done
+    `quit`
+        exit. The process should also exit when its stdin is closed.
+
+Replies (exactly one for each requested frame)
+
+    `frame <nbytes>`
+        followed by `nbytes` of data: the coordinates and velocities of
+        the frame
+    `error <message>`
+        the frame could not be generated. If the message mentions `nan`
+        and `coordinates` the engine treats it like a `NaN` in a snapshot.
+"""
+
+import logging
+import subprocess
+
+import numpy as np
+
+from openpathsampling.engines import DynamicsEngine, SnapshotDescriptor
+from .snapshot import ExternalSnapshot as Snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class ExternalEngine(DynamicsEngine):
+    """Engine that streams frames from an external process.
+
+    See the module documentation for the protocol the process has to
+    speak. Any MD code that can be driven from a small wrapper script can be
+    used this way.
+
+    Parameters
+    ----------
+    command : list of str
+        the command starting the process, e.g.
+        `['python', 'my_md_wrapper.py', '--steps', '10']`
+    n_atoms : int
+        the number of atoms
+    n_spatial : int
+        the number of spatial dimensions, default is 3
+    options : dict
+        A dictionary providing additional settings. Keys can be
+
+            'n_frames_max' : int
+                the maximum number of frames allowed for a returned
+                trajectory, default is 5000
+            'n_frames_ahead' : int
+                the number of frames the process may generate beyond the
+                one OPS is currently checking, default is 2. These frames
+                are discarded when a trajectory stops, so this is the
+                amount of work that can be wasted per trajectory.
+
+    Attributes
+    ----------
+    process : :class:`subprocess.Popen`
+        the running process. It is (re)started on first use.
+    """
+
+    base_snapshot_type = Snapshot
+
+    _default_options = {
+        'n_frames_max': 5000,
+        'n_frames_ahead': 2
+    }
+
+    def __init__(self, command, n_atoms, n_spatial=3, options=None):
+        descriptor = SnapshotDescriptor.construct(
+            snapshot_class=Snapshot,
+            snapshot_dimensions={
+                'n_atoms': n_atoms,
+                'n_spatial': n_spatial
+            }
+        )
+
+        super(ExternalEngine, self).__init__(
+            options=options,
+            descriptor=descriptor
+        )
+
+        self.command = list(command)
+
+        self._process = None
+        self._current_snapshot = None
+        # True if the next frame of the process does not continue from the
+        # current snapshot
+        self._needs_state = True
+        self._n_requested = 0
+
+    def to_dict(self):
+        return {
+            'command': self.command,
+            'n_atoms': self.n_atoms,
+            'n_spatial': self.n_spatial,
+            'options': self.options
+        }
+
+    @property
+    def process(self):
+        if self._process is None or self._process.poll() is not None:
+            logger.info('Starting external engine `%s`' %
+                        ' '.join(self.command))
+            self._process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE
+            )
+            self._needs_state = True
+            self._n_requested = 0
+
+        return self._process
+
+    def close(self):
+        """
+        Ask the process to quit and wait for it
+
+        The process is started again the next time it is needed.
+        """
+        if self._process is not None:
+            if self._process.poll() is None:
+                try:
+                    self._send(b'quit\n')
+                    self._process.stdin.close()
+                except (IOError, OSError):
+                    self._process.kill()
+
+                self._process.wait()
+
+            self._process.stdout.close()
+            self._process = None
+
+    def kill(self):
+        """
+        Kill the process right away, e.g. if it does not respond
+
+        The process is started again the next time it is needed.
+        """
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+                self._process.wait()
+
+            self._process.stdin.close()
+            self._process.stdout.close()
+            self._process = None
+
+    def _send(self, data):
+        stdin = self.process.stdin
+        stdin.write(data)
+        stdin.flush()
+
+    def _request(self, n_frames):
+        self._send(('frames %d\n' % n_frames).encode('ascii'))
+        self._n_requested += n_frames
+
+    def _read_frame(self):
+        """
+        Read the next reply of the process
+
+        Returns
+        -------
+        numpy.ndarray, shape=(2, n_atoms, n_spatial)
+            the coordinates and velocities
+        """
+        if self._process is None:
+            raise RuntimeError('External engine process is not running')
+
+        stdout = self._process.stdout
+        header = stdout.readline()
+        if not header:
+            self.kill()
+            raise RuntimeError('External engine process terminated')
+
+        self._n_requested -= 1
+        kind, _, argument = header.decode('ascii').strip().partition(' ')
+
+        if kind == 'frame':
+            n_bytes = int(argument)
+            data = stdout.read(n_bytes)
+            if len(data) != n_bytes:
+                self.kill()
+                raise RuntimeError(
+                    'External engine process terminated during a frame')
+
+            return np.frombuffer(data, dtype='<f8').reshape(
+                2, self.n_atoms, self.n_spatial).copy()
+
+        elif kind == 'error':
+            raise RuntimeError(argument)
+
+        else:
+            self.kill()
+            raise RuntimeError(
+                'Unknown reply from external engine: %s' % header)
+
+    def _drain(self):
+        # read and drop the frames that are no longer needed
+        while self._n_requested > 0:
+            try:
+                self._read_frame()
+            except RuntimeError:
+                if self._process is None:
+                    break
+
+    @property
+    def current_snapshot(self):
+        return self._current_snapshot
+
+    @current_snapshot.setter
+    def current_snapshot(self, snapshot):
+        self.check_snapshot_type(snapshot)
+        self._current_snapshot = snapshot
+        self._needs_state = True
+
+    def start(self, snapshot=None):
+        super(ExternalEngine, self).start(snapshot)
+
+        # (re)starts the process if necessary
+        _ = self.process
+
+        if self._n_requested > 0:
+            # frames were generated beyond the last trajectory, so the
+            # process has to continue from the current snapshot again
+            self._drain()
+            self._needs_state = True
+
+        if self._needs_state:
+            snapshot = self._current_snapshot
+            if snapshot is None:
+                raise RuntimeError('External engine has no current snapshot')
+
+            data = np.concatenate([
+                np.asarray(snapshot.coordinates, dtype='<f8'),
+                np.asarray(snapshot.velocities, dtype='<f8')
+            ]).tobytes()
+
+            self._send(('state %d\n' % len(data)).encode('ascii') + data)
+            self._needs_state = False
+
+    def generate_next_frame(self):
+        if self._needs_state or self._process is None:
+            self.start()
+
+        n_frames = 1 + max(0, self.n_frames_ahead)
+        if self._n_requested < n_frames:
+            self._request(n_frames - self._n_requested)
+
+        data = self._read_frame()
+        snapshot = Snapshot(
+            coordinates=data[0],
+            velocities=data[1],
+            engine=self
+        )
+        self._current_snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def is_valid_snapshot(snapshot):
+        return bool(np.isfinite(snapshot.coordinates).all() and
+                    np.isfinite(snapshot.velocities).all())
@@ -0,0 +1,13 @@
+from openpathsampling.engines import BaseSnapshot
+import openpathsampling.engines.features as feats
+
+
+@feats.attach_features([
+    feats.velocities,
+    feats.coordinates,
+    feats.engine
+])
+class ExternalSnapshot(BaseSnapshot):
+    """
+    Snapshot of an external engine. Only coordinates and velocities
+    """
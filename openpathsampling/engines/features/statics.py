@@ -1,6 +1,5 @@
 import numpy as np
 from .shared import StaticContainerStore, StaticContainer
-import mdtraj
 from openpathsampling.netcdfplus import WeakLRUCache
 
 variables = ['statics']
@@ -98,6 +97,7 @@ def md(snapshot):
         output = np.zeros([1, n_atoms, 3], np.float32)
         output[0, :, :] = snapshot.coordinates
 
+        import mdtraj
         return mdtraj.Trajectory(output, snapshot.topology.mdtraj)
 
 
@@ -1,5 +1,8 @@
 import logging
 import copy
+import threading
+
+from six.moves import queue
 
 import simtk.openmm
 import simtk.openmm.app
@@ -324,7 +327,7 @@ class OpenMMEngine(DynamicsEngine):
 
         integrator = simtk.openmm.XmlSerializer.deserialize(integrator_xml)
         integrator = restore_custom_integrator_interface(integrator)
-        return OpenMMEngine(
+        return cls(
             topology=topology,
             system=simtk.openmm.XmlSerializer.deserialize(system_xml),
             integrator=integrator,
@@ -366,21 +369,26 @@ class OpenMMEngine(DynamicsEngine):
 
 
     def _build_current_snapshot(self):
-        # TODO: Add caching for this and mark if changed
-
+        # only ask for what a snapshot contains. Energies are not stored
+        # and computing them costs about as much as an integration step.
         state = self.simulation.context.getState(getPositions=True,
-                                                 getVelocities=True,
-                                                 getEnergy=True)
+                                                 getVelocities=True)
+
+        # the arrays returned by the state are new, so we set them directly
+        # instead of having the containers make deep copies
+        statics = Snapshot.StaticContainer(coordinates=None, box_vectors=None)
+        statics.coordinates = state.getPositions(asNumpy=True)
+        statics.box_vectors = state.getPeriodicBoxVectors(asNumpy=True)
+
+        kinetics = Snapshot.KineticContainer(velocities=None)
+        kinetics.velocities = state.getVelocities(asNumpy=True)
 
-        snapshot = Snapshot.construct(
-            coordinates=state.getPositions(asNumpy=True),
-            box_vectors=state.getPeriodicBoxVectors(asNumpy=True),
-            velocities=state.getVelocities(asNumpy=True),
+        return Snapshot.construct(
+            statics=statics,
+            kinetics=kinetics,
             engine=self
         )
 
-        return snapshot
-
     @staticmethod
     def is_valid_snapshot(snapshot):
         if np.isnan(np.min(snapshot.coordinates._value)):
@@ -475,3 +483,217 @@ class OpenMMEngine(DynamicsEngine):
         if old_snap is not None:
             self.current_snapshot = old_snap
         return result_snap
+
+
+class _PooledContext(OpenMMEngine):
+    """A single context of an :class:`OpenMMEnginePool`.
+
+    Snapshots generated here reference the pool as their engine, so only the
+    pool is stored.
+    """
+
+    def __init__(self, pool, integrator):
+        super(_PooledContext, self).__init__(
+            pool.topology,
+            pool.system,
+            integrator,
+            openmm_properties=pool.openmm_properties,
+            options=pool.options
+        )
+        self.pool = pool
+
+    def _build_current_snapshot(self):
+        snapshot = super(_PooledContext, self)._build_current_snapshot()
+        snapshot.engine = self.pool
+        return snapshot
+
+
+class OpenMMEnginePool(OpenMMEngine):
+    """OpenMM engine that can run several trajectories at the same time.
+
+    Every call to :meth:`generate` uses a context from a pool of up to
+    `n_contexts` contexts, so `generate` can be called from several threads
+    at once. OpenMM releases the GIL while integrating, which makes this an
+    easy way to use many CPU cores for moderately sized systems. The number
+    of threads per context is set with the platform properties, e.g.
+    `openmm_properties={'Threads': '4'}` for the CPU platform.
+
+    The engine itself behaves like a regular :class:`OpenMMEngine` for
+    everything else, e.g. `current_snapshot` or `generate_next_frame` use
+    the main context.
+
+    Examples
+    --------
+    >>> engine = OpenMMEnginePool(topology, system, integrator,
+    >>>                           openmm_properties={'Threads': '2'},
+    >>>                           n_contexts=4)
+    >>> engine.initialize('CPU')
+    >>> trajectories = engine.generate_concurrently([
+    >>>     (snapshot_1, [ensemble_1.can_append]),
+    >>>     (snapshot_2, [ensemble_2.can_append])
+    >>> ])
+    """
+
+    def __init__(
+            self,
+            topology,
+            system,
+            integrator,
+            openmm_properties=None,
+            options=None,
+            n_contexts=2):
+        """
+        Parameters
+        ----------
+        topology : openpathsampling.engines.openmm.MDTopology
+        system : simtk.openmm.app.System
+        integrator : simtk.openmm.Integrator
+            the integrator. Each context uses its own copy.
+        openmm_properties : dict
+        options : dict
+            see :class:`OpenMMEngine`
+        n_contexts : int
+            the maximal number of contexts, i.e. of trajectories generated
+            at the same time. Contexts are created when needed.
+        """
+        super(OpenMMEnginePool, self).__init__(
+            topology,
+            system,
+            integrator,
+            openmm_properties=openmm_properties,
+            options=options
+        )
+        self.n_contexts = n_contexts
+        self._idle = queue.Queue()
+        self._contexts = []
+        self._lock = threading.Lock()
+
+    def to_dict(self):
+        dct = super(OpenMMEnginePool, self).to_dict()
+        dct['n_contexts'] = self.n_contexts
+        return dct
+
+    @classmethod
+    def from_dict(cls, dct):
+        dct = dict(dct)
+        n_contexts = dct.pop('n_contexts')
+        engine = super(OpenMMEnginePool, cls).from_dict(dct)
+        engine.n_contexts = n_contexts
+        return engine
+
+    @property
+    def n_active_contexts(self):
+        """int : the number of contexts created so far"""
+        return len(self._contexts)
+
+    def _new_context(self, platform):
+        # a context cannot share the integrator, so we use a copy
+        integrator = simtk.openmm.XmlSerializer.deserialize(
+            simtk.openmm.XmlSerializer.serialize(self.integrator))
+
+        context = _PooledContext(self, integrator)
+        context.initialize(platform)
+        return context
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = len(self._contexts) < self.n_contexts
+            if create:
+                # pooled contexts use the platform of the main context,
+                # which is created here only once
+                platform = self.simulation.context.getPlatform()
+                # reserve the slot while the context is being created
+                self._contexts.append(None)
+
+        if not create:
+            return self._idle.get()
+
+        try:
+            context = self._new_context(platform)
+        except:
+            with self._lock:
+                self._contexts.remove(None)
+            raise
+
+        with self._lock:
+            self._contexts[self._contexts.index(None)] = context
+
+        return context
+
+    def generate(self, snapshot, running=None, direction=+1):
+        # the options are shared, so changes to the pool apply to all
+        # contexts
+        context = self._acquire()
+        try:
+            context.options = self.options
+            return context.generate(snapshot, running, direction)
+        finally:
+            self._idle.put(context)
+
+    generate.__doc__ = OpenMMEngine.generate.__doc__
+
+    def generate_concurrently(self, jobs):
+        """
+        Generate several trajectories at the same time
+
+        Parameters
+        ----------
+        jobs : list of tuple
+            the arguments to :meth:`generate` for each trajectory, i.e.
+            `(snapshot, running)` or `(snapshot, running, direction)`
+
+        Returns
+        -------
+        list of :class:`openpathsampling.Trajectory`
+            the trajectories in the order of `jobs`. If any generation
+            fails its exception is raised after all others have finished.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        # create the main context before the jobs need its platform
+        self.simulation
+
+        with ThreadPoolExecutor(max_workers=self.n_contexts) as executor:
+            futures = [executor.submit(self.generate, *job) for job in jobs]
+
+        return [future.result() for future in futures]
+
+    def unload_context(self):
+        """
+        Unload the main context and all contexts of the pool
+
+        Raises
+        ------
+        RuntimeError
+            if a context of the pool is still generating a trajectory. The
+            contexts are not changed then.
+        """
+        with self._lock:
+            # take all idle contexts so nobody else can use them
+            idle = []
+            while True:
+                try:
+                    idle.append(self._idle.get_nowait())
+                except queue.Empty:
+                    break
+
+            n_busy = len(self._contexts) - len(idle)
+            if n_busy > 0:
+                for context in idle:
+                    self._idle.put(context)
+
+                raise RuntimeError(
+                    'Cannot unload the contexts while %d of them are '
+                    'generating trajectories' % n_busy)
+
+            for context in idle:
+                context.unload_context()
+
+            self._contexts = []
+
+        super(OpenMMEnginePool, self).unload_context()
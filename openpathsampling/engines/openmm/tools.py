@@ -1,4 +1,3 @@
-import mdtraj as md
 import numpy as np
 import simtk.unit as u
 
@@ -89,6 +88,7 @@ def snapshot_from_pdb(pdb_file, simple_topology=False):
         the constructed Snapshot
 
     """
+    import mdtraj as md
     pdb = md.load(pdb_file)
     velocities = np.zeros(pdb.xyz[0].shape)
 
@@ -125,6 +125,7 @@ def topology_from_pdb(pdb_file, simple_topology=False):
         the constructed Snapshot
 
     """
+    import mdtraj as md
     pdb = md.load(pdb_file)
 
     if simple_topology:
@@ -160,6 +161,7 @@ def snapshot_from_testsystem(testsystem, simple_topology=False):
     if simple_topology:
         topology = Topology(*testsystem.positions.shape)
     else:
+        import mdtraj as md
         topology = MDTrajTopology(md.Topology.from_openmm(testsystem.topology))
 
     box_vectors = \
@@ -256,6 +258,7 @@ def empty_snapshot_from_openmm_topology(topology, simple_topology=False):
     if simple_topology:
         topology = Topology(n_atoms, 3)
     else:
+        import mdtraj as md
         topology = MDTrajTopology(md.Topology.from_openmm(topology))
 
     snapshot = Snapshot.construct(
@@ -328,4 +331,5 @@ def trajectory_to_mdtraj(trajectory, md_topology=None):
     return trajectory.to_mdtraj(md_topology)
 
 def ops_load_trajectory(filename, **kwargs):
+    import mdtraj as md
     return trajectory_from_mdtraj(md.load(filename, **kwargs))
@@ -1,4 +1,3 @@
-import mdtraj as md
 import numpy as np
 import pandas as pd
 from simtk.openmm import XmlSerializer
@@ -44,6 +43,8 @@ class MDTrajTopology(Topology):
 
     @classmethod
     def from_dict(cls, dct):
+        import mdtraj as md
+
         top_dict = dct['mdtraj']
 
         atoms = pd.DataFrame(
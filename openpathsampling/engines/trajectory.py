@@ -4,7 +4,6 @@
 """
 
 import numpy as np
-import mdtraj as md
 import simtk.unit as u
 
 from openpathsampling.netcdfplus import StorableObject, LoaderProxy
@@ -547,6 +546,7 @@ class Trajectory(list, StorableObject):
 
         output = self.xyz
 
+        import mdtraj as md
         traj = md.Trajectory(output, topology)
         traj.unitcell_vectors = self.box_vectors
         return traj
@@ -7,8 +7,10 @@ Created on 03.09.2014
 import abc
 import logging
 import itertools
+import threading
 
-from openpathsampling.netcdfplus import StorableNamedObject
+from openpathsampling.netcdfplus import StorableNamedObject, LRUCache, tracing
+from openpathsampling.timing import timed
 import openpathsampling as paths
 
 from future.utils import with_metaclass
@@ -111,11 +113,12 @@ class EnsembleCache(object):
         bool :
             the value of reset
         """
-        logger.debug("Checking cache....")
-        # logger.debug("traj " + str([id(s) for s in trajectory]))
-        logger.debug("start_frame " + str(id(self.start_frame)))
-        logger.debug("prev_last " + str(id(self.prev_last_frame)))
-        logger.debug("prev_last_idx " + str(self.prev_last_index))
+        if self.debug_enabled:
+            logger.debug("Checking cache....")
+            # logger.debug("traj " + str([id(s) for s in trajectory]))
+            logger.debug("start_frame %d", id(self.start_frame))
+            logger.debug("prev_last %d", id(self.prev_last_frame))
+            logger.debug("prev_last_idx %s", self.prev_last_index)
 
         if trajectory is not None:
             # if the first frame has changed, we should reset
@@ -155,11 +158,15 @@ class EnsembleCache(object):
         else:
             reset = True
 
+        if tracing.active is not None:
+            tracing.active.cache('EnsembleCache', not reset)
+
         self.trusted = not reset
         self.last_length = len(trajectory)
         if reset:
             self.debug_enabled = logger.isEnabledFor(logging.DEBUG)
-            logger.debug("Resetting cache " + str(self))
+            if self.debug_enabled:
+                logger.debug("Resetting cache %s", self)
             if self.direction > 0:
                 self.start_frame = trajectory.get_as_proxy(0)
                 self.prev_last_frame = trajectory.get_as_proxy(-1)
@@ -188,6 +195,103 @@ class EnsembleCache(object):
         return reset
 
 
+class EnsembleVerdictCache(object):
+    """
+    Remember which trajectories are in which ensembles
+
+    Trajectories in samples are not changed anymore, so whether such a
+    trajectory is in an ensemble only has to be decided once. Verdicts are
+    keyed by the UUIDs of the ensemble and the trajectory (and the length
+    of the trajectory, to be safe against trajectories that are still
+    growing), so neither is kept alive. All calls of :meth:`Ensemble.check`
+    share the module-level instance `ensemble_verdict_cache`.
+
+    Parameters
+    ----------
+    size_limit : int
+        the number of verdicts to keep. Default is 100000.
+
+    Attributes
+    ----------
+    enabled : bool
+        if `False` every check evaluates the ensemble
+    hits : int
+        number of verdicts that were reused
+    misses : int
+        number of verdicts that had to be computed
+    """
+
+    def __init__(self, size_limit=100000):
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._cache = LRUCache(size_limit)
+        self._lock = threading.Lock()
+
+    @property
+    def size_limit(self):
+        return self._cache.size_limit
+
+    @size_limit.setter
+    def size_limit(self, value):
+        with self._lock:
+            self._cache.size_limit = value
+
+    @staticmethod
+    def _key(ensemble, trajectory, candidate):
+        return (ensemble.__uuid__, trajectory.__uuid__, len(trajectory),
+                candidate)
+
+    def __call__(self, ensemble, trajectory, candidate=False):
+        """
+        Return whether `trajectory` is in `ensemble`, using cached verdicts
+
+        Parameters
+        ----------
+        ensemble : :class:`Ensemble`
+        trajectory : :class:`openpathsampling.Trajectory`
+        candidate : bool
+            passed on to the ensemble. Verdicts for candidates are kept
+            separately, but a trajectory known to be in the ensemble is
+            also accepted as candidate.
+
+        Returns
+        -------
+        bool
+        """
+        if not self.enabled:
+            return ensemble(trajectory, trusted=False, candidate=candidate)
+
+        candidate = bool(candidate)
+        key = self._key(ensemble, trajectory, candidate)
+        with self._lock:
+            verdict = self._cache.get(key)
+            if verdict is None and candidate:
+                if self._cache.get(self._key(ensemble, trajectory, False)):
+                    verdict = True
+
+        if verdict is not None:
+            self.hits += 1
+            return verdict
+
+        self.misses += 1
+        with timed('ensemble'):
+            verdict = bool(
+                ensemble(trajectory, trusted=False, candidate=candidate))
+        with self._lock:
+            self._cache[key] = verdict
+
+        return verdict
+
+    def clear(self):
+        """Remove all verdicts"""
+        with self._lock:
+            self._cache.clear()
+
+
+ensemble_verdict_cache = EnsembleVerdictCache()
+
+
 class Ensemble(with_metaclass(abc.ABCMeta, StorableNamedObject)):
     """
     Path ensemble object.
@@ -252,8 +356,24 @@ class Ensemble(with_metaclass(abc.ABCMeta, StorableNamedObject)):
     def check_reverse(self, trajectory, trusted=False):
         return self(trajectory, trusted=False)
 
-    def check(self, trajectory):
-        return self(trajectory, trusted=False)
+    def check(self, trajectory, candidate=False):
+        """
+        Return `True` if a finished trajectory is part of the path ensemble.
+
+        Unlike calling the ensemble, the verdict is remembered in
+        `ensemble_verdict_cache`, so checking the same trajectory again
+        (e.g. in every replica exchange attempt) costs nothing. Only use
+        this for trajectories that will not change anymore, like the
+        trajectories of samples.
+
+        Parameters
+        ----------
+        trajectory : :class:`.Trajectory`
+            The trajectory to be checked
+        candidate : bool
+            see :meth:`__call__`
+        """
+        return ensemble_verdict_cache(self, trajectory, candidate)
 
     def trajectory_summary(self, trajectory):
         """
@@ -2838,11 +2958,19 @@ class TISEnsemble(SequentialEnsemble):
         self.interface = interface
         #        self.name = interface.name
         self.orderparameter = orderparameter
-        # TODO: add max_orderparameter as a traj CV
         self.lambda_i = lambda_i
         self._initial_volumes = volume_a
         self._final_volumes = volume_b | volume_a
 
+    @property
+    def max_orderparameter(self):
+        """:class:`.TrajectoryCV` of the maximum of the order parameter
+
+        The value is cached for each trajectory, so it is computed only when
+        a trajectory is checked the first time.
+        """
+        return paths.TrajectoryCV.of(self.orderparameter, 'max')
+
     def __call__(self, trajectory, trusted=None, candidate=False):
         use_candidate = (candidate and self.lambda_i is not None
                          and self.orderparameter is not None)
@@ -2858,7 +2986,7 @@ class TISEnsemble(SequentialEnsemble):
             return (
                 self._initial_volumes(trajectory[0])
                 & self._final_volumes(trajectory[-1])
-                & (max(self.orderparameter(trajectory)) > self.lambda_i)
+                & (self.max_orderparameter(trajectory) > self.lambda_i)
             )
         else:
             # it still works fine if we use the slower algorithm
@@ -2878,9 +3006,9 @@ class TISEnsemble(SequentialEnsemble):
                 break
 
         if self.orderparameter is not None:
-            lambda_traj = self.orderparameter(trajectory)
-            min_lambda = min(lambda_traj)
-            max_lambda = max(lambda_traj)
+            min_lambda = paths.TrajectoryCV.of(
+                self.orderparameter, 'min')(trajectory)
+            max_lambda = self.max_orderparameter(trajectory)
         else:
             min_lambda = None
             max_lambda = None
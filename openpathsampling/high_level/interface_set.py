@@ -48,6 +48,16 @@ class InterfaceSet(netcdfplus.StorableNamedObject):
         self._lambda_dict = {vol: lmbda
                              for (vol, lmbda) in zip(self.volumes, vlambdas)}
 
+    @property
+    def max_cv(self):
+        """:class:`.TrajectoryCV` of the maximum of `cv` along trajectories"""
+        return paths.TrajectoryCV.of(self.cv, 'max')
+
+    @property
+    def min_cv(self):
+        """:class:`.TrajectoryCV` of the minimum of `cv` along trajectories"""
+        return paths.TrajectoryCV.of(self.cv, 'min')
+
     def get_lambda(self, volume):
         """Lambda (value of the CV) associated with a given interface volume
 
@@ -1,6 +1,7 @@
 from .base import StorableNamedObject, StorableObject, create_to_dict
 from .cache import WeakKeyCache, WeakLRUCache, WeakValueCache, MaxCache, \
-    NoCache, Cache, LRUCache, LRUChunkLoadingCache
+    NoCache, Cache, LRUCache, LRUChunkLoadingCache, CacheManager, \
+    ManagedCache, estimate_nbytes
 from .dictify import ObjectJSON, StorableObjectJSON, UUIDObjectJSON
 from .netcdfplus import NetCDFPlus
 
@@ -14,5 +15,6 @@ from .stores import PseudoAttributeStore
 
 from .proxy import DelayedLoader, lazy_loading_attributes, LoaderProxy
 from .util import with_timing_logging
+from .tracing import Tracer
 from .attribute import PseudoAttribute, CallablePseudoAttribute, FunctionPseudoAttribute, \
     GeneratorPseudoAttribute
@@ -68,7 +68,8 @@ class PseudoAttribute(cd.Wrap, StorableNamedObject):
         self.diskcache_chunksize = ObjectStore.default_store_chunk_size
         self._single_dict = cd.ExpandSingle(self.key_class)
         self._cache_dict = cd.CacheChainDict(
-            WeakKeyCache()
+            WeakKeyCache(),
+            trace_name=name
         )
         self._store_dict = None
         self._eval_dict = None
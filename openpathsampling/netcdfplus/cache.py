@@ -1,13 +1,276 @@
 from collections import OrderedDict
+import heapq
+import itertools
+import numbers
+import sys
 import weakref
 
+import numpy as np
+
+from . import tracing
+
 __author__ = 'Jan-Hendrik Prinz'
 
 
+def _value_nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 96
+    elif isinstance(value, (list, tuple)):
+        # references to other objects are counted by their own caches
+        return sys.getsizeof(value) + sum(
+            _value_nbytes(item) for item in value
+            if isinstance(item, (np.ndarray, numbers.Number)) or
+            hasattr(item, '_value'))
+    elif hasattr(value, '_value'):
+        # a simtk.unit.Quantity
+        return _value_nbytes(value._value)
+    else:
+        return sys.getsizeof(value)
+
+
+def estimate_nbytes(obj):
+    """
+    Estimate the memory held by an object in a cache
+
+    Counts the object itself, the numpy arrays (also inside of units) and
+    lists it holds as attributes. Other objects referenced by the object are
+    only counted as references since they are usually cached in their own
+    store.
+
+    Parameters
+    ----------
+    obj : object
+        the object to be measured
+
+    Returns
+    -------
+    int
+        the approximate size in bytes
+    """
+    nbytes = _value_nbytes(obj)
+    attributes = getattr(obj, '__dict__', None)
+    if attributes:
+        nbytes += sys.getsizeof(attributes) + sum(
+            _value_nbytes(value) for value in attributes.values())
+
+    return nbytes
+
+
+class CacheManager(object):
+    """
+    Keeps the memory used by a group of caches below a common budget
+
+    Each cache reports the approximate size of the entries it holds. If the
+    sum over all caches exceeds `max_bytes` entries are evicted using the
+    GreedyDual-Size strategy: every entry gets a priority of `L + cost /
+    nbytes` when used, where `L` is the priority of the last evicted entry.
+    The entry with the lowest priority is evicted first so large, rarely
+    used and cheap to reload objects go before small or expensive ones.
+
+    Parameters
+    ----------
+    max_bytes : int
+        the memory budget in bytes
+
+    Attributes
+    ----------
+    nbytes : int
+        the number of bytes currently held by all managed caches
+    evictions : int
+        the total number of evicted entries
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.evictions = 0
+
+        self._entries = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._inflation = 0.0
+        self._caches = {}
+
+    def register(self, cache):
+        """
+        Add a cache to the manager
+
+        The manager only keeps a weak reference. Once the cache is garbage
+        collected all its entries are removed from the budget.
+
+        Parameters
+        ----------
+        cache : :class:`Cache`
+            the cache to be managed. It needs to implement `_evict(key)`
+
+        """
+        cache_id = id(cache)
+
+        def remove(ref, manager=weakref.ref(self)):
+            manager = manager()
+            if manager is not None:
+                manager._discard_cache(cache_id)
+
+        self._caches[cache_id] = weakref.ref(cache, remove)
+
+    @property
+    def caches(self):
+        """
+        list of :class:`Cache` : all caches that are currently managed
+        """
+        return [c for c in (ref() for ref in self._caches.values())
+                if c is not None]
+
+    def _push(self, entry_key, cost, nbytes):
+        priority = self._inflation + float(cost) / max(nbytes, 1)
+        token = next(self._counter)
+        heapq.heappush(self._heap, (priority, token, entry_key))
+        return priority, token
+
+    def add(self, cache, key, nbytes, cost=1.0):
+        """
+        Register a new or changed entry and enforce the budget
+
+        Parameters
+        ----------
+        cache : :class:`Cache`
+            the cache that holds the entry
+        key : object
+            the key of the entry in `cache`
+        nbytes : int
+            the approximate size of the entry
+        cost : float
+            relative cost to reload the entry if it gets evicted
+
+        """
+        entry_key = (id(cache), key)
+        old = self._entries.get(entry_key)
+        if old is not None:
+            self._change_nbytes(cache, -old[2])
+
+        priority, token = self._push(entry_key, cost, nbytes)
+        self._entries[entry_key] = [priority, token, nbytes, cost]
+        self._change_nbytes(cache, nbytes)
+
+        self._enforce_budget(entry_key)
+
+    def touch(self, cache, key):
+        """
+        Update the priority of an entry that has been used
+
+        Parameters
+        ----------
+        cache : :class:`Cache`
+            the cache that holds the entry
+        key : object
+            the key of the entry in `cache`
+
+        """
+        entry_key = (id(cache), key)
+        entry = self._entries.get(entry_key)
+        if entry is not None:
+            entry[0], entry[1] = self._push(entry_key, entry[3], entry[2])
+            self._compact()
+
+    def discard(self, cache, key):
+        """
+        Remove an entry that has been removed by the cache itself
+
+        Parameters
+        ----------
+        cache : :class:`Cache`
+            the cache that held the entry
+        key : object
+            the key of the entry in `cache`
+
+        """
+        entry = self._entries.pop((id(cache), key), None)
+        if entry is not None:
+            self._change_nbytes(cache, -entry[2])
+
+    def _discard_cache(self, cache_id):
+        self._caches.pop(cache_id, None)
+        for entry_key in [k for k in self._entries if k[0] == cache_id]:
+            self.nbytes -= self._entries.pop(entry_key)[2]
+
+    def _change_nbytes(self, cache, nbytes):
+        self.nbytes += nbytes
+        cache.nbytes += nbytes
+
+    def _enforce_budget(self, keep=None):
+        kept = None
+        while self.nbytes > self.max_bytes and self._heap:
+            priority, token, entry_key = heapq.heappop(self._heap)
+            entry = self._entries.get(entry_key)
+            if entry is None or entry[1] != token:
+                # outdated heap entry
+                continue
+
+            if entry_key == keep:
+                # never evict the entry that is just being added
+                kept = (priority, token, entry_key)
+                continue
+
+            del self._entries[entry_key]
+            self.nbytes -= entry[2]
+            self._inflation = priority
+            self.evictions += 1
+
+            cache = self._caches[entry_key[0]]()
+            if cache is not None:
+                cache.nbytes -= entry[2]
+                cache._evict(entry_key[1])
+
+        if kept is not None:
+            heapq.heappush(self._heap, kept)
+
+        self._compact()
+
+    def _compact(self):
+        # drop outdated heap entries once they dominate the heap
+        if len(self._heap) > 4 * len(self._entries) + 1024:
+            self._heap = [
+                (entry[0], entry[1], entry_key)
+                for entry_key, entry in self._entries.items()
+            ]
+            heapq.heapify(self._heap)
+
+    @property
+    def stats(self):
+        """
+        dict : budget, used bytes and hit, miss and eviction counts summed
+        over all managed caches
+        """
+        caches = self.caches
+        return {
+            'max_bytes': self.max_bytes,
+            'nbytes': self.nbytes,
+            'count': len(self._entries),
+            'caches': len(caches),
+            'hits': sum(c.hits for c in caches),
+            'misses': sum(c.misses for c in caches),
+            'evictions': self.evictions
+        }
+
+
 class Cache(object):
     """
     A cache like dict
+
+    Attributes
+    ----------
+    trace_name : str or None
+        the name hits and misses are reported under to an active
+        :class:`openpathsampling.netcdfplus.tracing.Tracer`. If `None` the
+        class name is used.
     """
+
+    trace_name = None
+
+    def _trace(self, hit):
+        tracing.active.cache(
+            self.trace_name or self.__class__.__name__, hit)
+
     @property
     def count(self):
         """
@@ -185,8 +448,16 @@ class LRUCache(Cache):
         return reversed(self._cache)
 
     def __getitem__(self, item):
-        obj = self._cache.pop(item)
+        try:
+            obj = self._cache.pop(item)
+        except KeyError:
+            if tracing.active is not None:
+                self._trace(False)
+            raise
+
         self._cache[item] = obj
+        if tracing.active is not None:
+            self._trace(True)
         return obj
 
     def __setitem__(self, key, value, **kwargs):
@@ -258,13 +529,21 @@ class WeakLRUCache(Cache):
         try:
             obj = self._cache.pop(item)
             self._cache[item] = obj
-            return obj
         except KeyError:
-            obj = self._weak_cache[item]
+            try:
+                obj = self._weak_cache[item]
+            except KeyError:
+                if tracing.active is not None:
+                    self._trace(False)
+                raise
+
             del self._weak_cache[item]
             self._cache[item] = obj
             self._check_size_limit()
-            return obj
+
+        if tracing.active is not None:
+            self._trace(True)
+        return obj
 
     @size_limit.setter
     def size_limit(self, new_size):
@@ -338,6 +617,162 @@ class WeakLRUCache(Cache):
             yield key
 
 
+class ManagedCache(Cache):
+    """
+    A cache whose size is limited in bytes by a :class:`CacheManager`
+
+    Entries evicted by the manager are kept as weak references, like in
+    :class:`WeakLRUCache`, so objects still in use elsewhere will not be
+    loaded twice.
+
+    Parameters
+    ----------
+    manager : :class:`CacheManager`
+        the manager that enforces the common memory budget
+    cost : float
+        relative cost to reload an object of this cache. Objects with a
+        higher cost stay longer in the cache. Default is 1.0
+    nbytes_function : callable
+        a function returning the size of a cached object in bytes. Default
+        is :func:`estimate_nbytes`
+
+    Attributes
+    ----------
+    hits : int
+        number of successful lookups
+    misses : int
+        number of lookups of objects not in the cache
+    evictions : int
+        number of objects evicted by the manager
+    nbytes : int
+        the approximate size of all strongly referenced objects
+    """
+
+    def __init__(self, manager, cost=1.0, nbytes_function=None):
+        super(ManagedCache, self).__init__()
+        self.manager = manager
+        self.cost = cost
+        if nbytes_function is None:
+            nbytes_function = estimate_nbytes
+
+        self.nbytes_function = nbytes_function
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+
+        self._cache = {}
+        self._weak_cache = weakref.WeakValueDictionary()
+        manager.register(self)
+
+    @property
+    def count(self):
+        return len(self._cache), len(self._weak_cache)
+
+    @property
+    def size(self):
+        return -1, -1
+
+    @property
+    def stats(self):
+        """
+        dict : hit, miss and eviction counts and the size in bytes
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'nbytes': self.nbytes
+        }
+
+    def clear(self):
+        for key in list(self._cache):
+            self.manager.discard(self, key)
+
+        self._cache.clear()
+        self._weak_cache.clear()
+
+    def __getitem__(self, item):
+        try:
+            obj = self._cache[item]
+        except KeyError:
+            try:
+                obj = self._weak_cache.pop(item)
+            except KeyError:
+                self.misses += 1
+                if tracing.active is not None:
+                    self._trace(False)
+                raise KeyError(item)
+
+            self.hits += 1
+            if tracing.active is not None:
+                self._trace(True)
+            self[item] = obj
+            return obj
+
+        self.hits += 1
+        if tracing.active is not None:
+            self._trace(True)
+        self.manager.touch(self, item)
+        return obj
+
+    def __setitem__(self, key, value, **kwargs):
+        self._weak_cache.pop(key, None)
+        self._cache[key] = value
+        self.manager.add(self, key, self.nbytes_function(value), self.cost)
+
+    def _evict(self, key):
+        obj = self._cache.pop(key)
+        self.evictions += 1
+        try:
+            self._weak_cache[key] = obj
+        except TypeError:
+            # not all objects can be weak referenced
+            pass
+
+    def get_silent(self, item):
+        """
+        Return item from the cache without updating its priority
+
+        Parameters
+        ----------
+        item : object
+            the item index to be retrieved from the cache
+
+        Returns
+        -------
+        `object` or `None`
+            the requested object if it exists else `None`
+        """
+        try:
+            return self._cache[item]
+        except KeyError:
+            return self._weak_cache.get(item)
+
+    def __contains__(self, item):
+        return item in self._cache or item in self._weak_cache
+
+    def keys(self):
+        return list(self._cache.keys()) + list(self._weak_cache.keys())
+
+    def values(self):
+        return list(self._cache.values()) + list(self._weak_cache.values())
+
+    def __len__(self):
+        return len(self._cache) + len(self._weak_cache)
+
+    def __iter__(self):
+        for key in list(self._cache.keys()):
+            yield key
+        for key in list(self._weak_cache.keys()):
+            yield key
+
+    def __reversed__(self):
+        for key in reversed(list(self)):
+            yield key
+
+
 class WeakValueCache(weakref.WeakValueDictionary, Cache):
     """
     Implements a cache that keeps weak references to all elements
@@ -376,12 +811,23 @@ class LRUChunkLoadingCache(Cache):
 
     """
 
-    def __init__(self, chunksize=256, max_chunks=4*8192, variable=None):
+    def __init__(self, chunksize=256, max_chunks=4*8192, variable=None,
+                 manager=None, cost=1.0):
         super(LRUChunkLoadingCache, self).__init__()
         self.max_chunks = max_chunks
         self.chunksize = chunksize
         self.variable = variable
 
+        self.manager = manager
+        self.cost = cost
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._chunk_nbytes = {}
+        if manager is not None:
+            manager.register(self)
+
         self._chunkdict = OrderedDict()
         self._firstchunk = 0
         self._lastchunk = []
@@ -400,11 +846,41 @@ class LRUChunkLoadingCache(Cache):
     def size(self):
         return self.max_chunks * self.chunksize, 0
 
+    @property
+    def stats(self):
+        """
+        dict : hit, miss and eviction counts and the size in bytes
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'nbytes': self.nbytes
+        }
+
     def clear(self):
+        if self.manager is not None:
+            for chunk_idx in self._chunkdict:
+                self.manager.discard(self, chunk_idx)
+
+        self._chunk_nbytes.clear()
         self._chunkdict.clear()
         self._firstchunk = 0
         self._lastchunk = []
 
+    def _add_chunk_nbytes(self, chunk_idx, values):
+        # keep the manager informed about the (growing) size of a chunk
+        if self.manager is not None:
+            nbytes = self._chunk_nbytes.get(chunk_idx, 0) + \
+                sum(_value_nbytes(value) for value in values)
+            self._chunk_nbytes[chunk_idx] = nbytes
+            self.manager.add(self, chunk_idx, nbytes, self.cost)
+
+    def _evict(self, chunk_idx):
+        del self._chunkdict[chunk_idx]
+        del self._chunk_nbytes[chunk_idx]
+        self.evictions += 1
+
     def update_size(self, size=None):
         """
         Update the knowledge of the size of the attached store
@@ -445,6 +921,8 @@ class LRUChunkLoadingCache(Cache):
                 right = min(self._size, left + self.chunksize)
                 self._chunkdict[chunk_idx] = []
                 self._chunkdict[chunk_idx].extend(self.variable[left:right])
+                self._add_chunk_nbytes(
+                    chunk_idx, self._chunkdict[chunk_idx])
 
                 self._check_size_limit()
 
@@ -456,13 +934,17 @@ class LRUChunkLoadingCache(Cache):
                 right = min(self._size, (chunk_idx + 1) * self.chunksize)
 
                 if right > left:
-                    chunk.extend(self.variable[left:right])
+                    values = self.variable[left:right]
+                    chunk.extend(values)
+                    self._add_chunk_nbytes(chunk_idx, values)
 
     def _update_chunk_order(self, chunk_idx):
         chunk = self._chunkdict[chunk_idx]
         del self._chunkdict[chunk_idx]
         self._chunkdict[chunk_idx] = chunk
         self._firstchunk = chunk_idx
+        if self.manager is not None:
+            self.manager.touch(self, chunk_idx)
 
     def __getitem__(self, item):
         chunksize = self.chunksize
@@ -472,15 +954,21 @@ class LRUChunkLoadingCache(Cache):
                 obj = self._chunkdict[chunk_idx][item % chunksize]
                 if chunk_idx != self._firstchunk:
                     self._update_chunk_order(chunk_idx)
+                self.hits += 1
+                if tracing.active is not None:
+                    self._trace(True)
                 return obj
             except IndexError:
                 pass
 
+        self.misses += 1
+        if tracing.active is not None:
+            self._trace(False)
         self.load_chunk(chunk_idx)
 
         try:
             return self._chunkdict[chunk_idx][item % chunksize]
-        except IndexError:
+        except (IndexError, KeyError):
             raise KeyError(item)
 
     def load_max(self):
@@ -507,9 +995,12 @@ class LRUChunkLoadingCache(Cache):
         right = key
 
         if right > left:
-            chunk.extend(self.variable[left:right])
+            values = self.variable[left:right]
+            chunk.extend(values)
+            self._add_chunk_nbytes(chunk_idx, values)
 
         chunk.append(value)
+        self._add_chunk_nbytes(chunk_idx, [value])
 
         if chunk_idx != self._firstchunk:
             self._update_chunk_order(chunk_idx)
@@ -521,7 +1012,10 @@ class LRUChunkLoadingCache(Cache):
 
     def _check_size_limit(self):
         if len(self._chunkdict) > self.max_chunks:
-            self._chunkdict.popitem(last=False)
+            chunk_idx, _ = self._chunkdict.popitem(last=False)
+            self._chunk_nbytes.pop(chunk_idx, None)
+            if self.manager is not None:
+                self.manager.discard(self, chunk_idx)
 
     def __contains__(self, item):
         return any(item in chunk for chunk in self._chunkdict)
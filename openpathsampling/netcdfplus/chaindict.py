@@ -1,6 +1,9 @@
 import collections
+import threading
+import weakref
 import numpy as np
 
+from . import tracing
 from .proxy import LoaderProxy
 
 __author__ = 'Jan-Hendrik Prinz'
@@ -379,19 +382,91 @@ class Function(ChainDict):
         pass
 
 
+class Pending(ChainDict):
+    """
+    Return values that are computed in the background
+
+    Keys are submitted to an executor (e.g. a
+    :class:`concurrent.futures.ThreadPoolExecutor`) that evaluates them
+    with the next ChainDict. Asking for a submitted key waits for its
+    result if the evaluation is already running. If it has not started
+    yet, it is cancelled and the key is evaluated by the caller instead, so
+    a worker asking for a key that is queued behind it does not wait
+    forever. All other keys are passed on as usual.
+    """
+    def __init__(self):
+        super(Pending, self).__init__()
+        self.futures = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def submit(self, executor, items):
+        """
+        Start the evaluation of keys in the background
+
+        Parameters
+        ----------
+        executor : :class:`concurrent.futures.Executor`
+            the executor running the evaluation
+        items : list
+            the keys to be evaluated. Keys that are already pending are
+            skipped.
+
+        Returns
+        -------
+        :class:`concurrent.futures.Future` or None
+            the future of the results or None if nothing was submitted
+        """
+        with self._lock:
+            items = [item for item in items if item not in self.futures]
+            if len(items) == 0:
+                return None
+
+            future = executor.submit(self._post.__getitem__, items)
+            for pos, item in enumerate(items):
+                self.futures[item] = (future, pos)
+
+        return future
+
+    def _get(self, item):
+        with self._lock:
+            try:
+                future, pos = self.futures.pop(item)
+            except KeyError:
+                return None
+
+            if future.cancel():
+                # not started; all its keys are evaluated on request
+                for key, (other, _) in list(self.futures.items()):
+                    if other is future:
+                        del self.futures[key]
+
+                return None
+
+        return future.result()[pos]
+
+
 class CacheChainDict(ChainDict):
     """
     Return Values from a cache filled from underlying CDs
+
+    Attributes
+    ----------
+    trace_name : str
+        the name hits and misses are reported under to an active
+        :class:`openpathsampling.netcdfplus.tracing.Tracer`
     """
-    def __init__(self, cache):
+    def __init__(self, cache, trace_name=None):
         """
         Parameters
         ----------
         cache : :obj:`openpathsampling.netcdfplus.cache.Cache` or dict
             the cache to be used to store the data
+        trace_name : str or None
+            the name used for tracing. If `None` the class name is used.
         """
         super(CacheChainDict, self).__init__()
         self.cache = cache
+        self.trace_name = trace_name or self.__class__.__name__
 
     def _contains(self, item):
         return item in self.cache
@@ -401,10 +476,16 @@ class CacheChainDict(ChainDict):
             return None
 
         try:
-            return self.cache[item]
+            value = self.cache[item]
         except KeyError:
+            if tracing.active is not None:
+                tracing.active.cache(self.trace_name, False)
             return None
 
+        if tracing.active is not None:
+            tracing.active.cache(self.trace_name, True)
+        return value
+
     def _set(self, item, value):
         self.cache[item] = value
 
@@ -413,14 +494,19 @@ class ReversibleCacheChainDict(CacheChainDict):
     """
     Return Values from a cache filled from the underlying CD
     """
-    def __init__(self, cache, reversible=False):
+    def __init__(self, cache, reversible=False, trace_name=None):
         """
         Parameters
         ----------
         cache : :class:`openpathsampling.netcdfplus.cache.Cache` or dict
             the cache to be used to store the data
+        reversible : bool
+            if `True` the value of the reversed item is returned if the
+            item itself is not in the cache
+        trace_name : str or None
+            the name used for tracing. If `None` the class name is used.
         """
-        super(ReversibleCacheChainDict, self).__init__(cache)
+        super(ReversibleCacheChainDict, self).__init__(cache, trace_name)
         self.reversible = reversible
 
     def _get(self, item):
@@ -428,16 +514,19 @@ class ReversibleCacheChainDict(CacheChainDict):
             return None
 
         try:
-            return self.cache[item]
+            value = self.cache[item]
         except KeyError:
+            value = None
             if type(item) is not LoaderProxy:
                 if self.reversible and item._reversed is not None:
                     try:
-                        return self.cache[item._reversed]
+                        value = self.cache[item._reversed]
                     except KeyError:
-                        return None
+                        pass
 
-            return None
+        if tracing.active is not None:
+            tracing.active.cache(self.trace_name, value is not None)
+        return value
 
 
 class StoredDict(ChainDict):
@@ -3,6 +3,7 @@ author
 """
 
 import abc
+import fnmatch
 import logging
 import os.path
 from collections import OrderedDict
@@ -10,8 +11,10 @@ from uuid import UUID
 
 import netCDF4
 import numpy as np
+from .cache import CacheManager, ManagedCache, LRUCache, WeakLRUCache
 from .dictify import UUIDObjectJSON
-from .stores import NamedObjectStore, ObjectStore, PseudoAttributeStore
+from .stores import NamedObjectStore, ObjectStore, PseudoAttributeStore, \
+    ValueStore
 from .proxy import LoaderProxy
 
 import sys
@@ -64,6 +67,32 @@ class NetCDFPlus(netCDF4.Dataset):
         'uuid': str
     }
 
+    # presets for `store_options`. Chunks along the object dimension hold
+    # about `chunk_bytes` and `cache_size` is the chunk cache (the write
+    # buffer) of each variable in bytes
+    store_option_presets = {
+        'append': {
+            'chunk_bytes': 2 ** 16,
+            'zlib': False,
+            'cache_size': 2 ** 20
+        },
+        'analysis': {
+            'chunk_bytes': 2 ** 22,
+            'zlib': True,
+            'complevel': 4,
+            'shuffle': True,
+            'cache_size': 2 ** 24
+        }
+    }
+
+    _store_option_keys = [
+        'chunksize', 'chunk_bytes', 'zlib', 'complevel', 'shuffle',
+        'cache_size']
+
+    # bytes per element of variable length types in a chunk. The data
+    # itself is stored outside of the chunk
+    _vlen_item_bytes = 16
+
     class ValueDelegate(object):
         """
         Value delegate for objects that implement __getitem__ and __setitem__
@@ -177,7 +206,8 @@ class NetCDFPlus(netCDF4.Dataset):
         # todo: add CVStore, rename to attribute
         pass
 
-    def __init__(self, filename, mode=None, fallback=None):
+    def __init__(self, filename, mode=None, fallback=None,
+                 store_options=None):
         """
         Create a storage for complex objects in a netCDF file
 
@@ -194,6 +224,22 @@ class NetCDFPlus(netCDF4.Dataset):
             in this storage. By default you will not try to resave objects
             that could be found in the fallback. Note that the fall back does
             only work if `use_uuid` is enabled
+        store_options : str or dict or None
+            the chunking and compression of the variables of the stores.
+            Either a preset name (`'append'` or `'analysis'`, see
+            :attr:`store_option_presets`) or options used for all stores,
+            or a dict that maps store names, variable names or patterns
+            like `'snapshot*'` to a preset name or options. Options are a
+            dict with the keys `chunksize` (number of objects per chunk),
+            `chunk_bytes` (approximate size of a chunk, used if
+            `chunksize` is not set), `zlib`, `complevel`, `shuffle` and
+            `cache_size` (chunk cache per variable in bytes). More
+            specific keys override less specific ones. Chunking and
+            compression are only used when variables are created and kept
+            in the file, cache sizes are used whenever the file is opened.
+            Default is `None` which uses the default chunk sizes and no
+            compression. Use `'append'` for files that are written object
+            by object and `'analysis'` for files that are mostly read.
 
         Notes
         -----
@@ -236,6 +282,7 @@ class NetCDFPlus(netCDF4.Dataset):
 
         self.filename = filename
         self.fallback = fallback
+        self.store_options = self._check_store_options(store_options)
 
         # this can be set to false to re-store objects present in the fallback
         self.exclude_from_fallback = True
@@ -243,6 +290,9 @@ class NetCDFPlus(netCDF4.Dataset):
         # this can be set to false to re-store proxies from other stores
         self.exclude_proxy_from_other = False
 
+        # shared memory budget for caches, see `set_memory_budget`
+        self.cache_manager = None
+
         # call netCDF4-python to create or open .nc file
         super(NetCDFPlus, self).__init__(filename, mode)
 
@@ -334,6 +384,7 @@ class NetCDFPlus(netCDF4.Dataset):
 
             self.update_delegates()
             self._restore_storages()
+            self._set_chunk_caches()
 
             # only if we have a new style file
             if hasattr(self, 'attributes'):
@@ -713,6 +764,176 @@ class NetCDFPlus(netCDF4.Dataset):
         if dim_name not in self.dimensions:
             self.createDimension(dim_name, size)
 
+    @classmethod
+    def _check_store_options(cls, store_options):
+        """
+        Check the store options and use options for all stores if not a dict
+        """
+        if store_options is None:
+            return {}
+
+        if not isinstance(store_options, dict) or any(
+                key in cls._store_option_keys for key in store_options):
+            store_options = {'*': store_options}
+
+        for key, options in store_options.items():
+            if isinstance(options, dict):
+                unknown = set(options) - set(cls._store_option_keys)
+                if unknown:
+                    raise ValueError(
+                        'Unknown store options %s for "%s"' % (
+                            ', '.join(sorted(unknown)), key))
+            elif options not in cls.store_option_presets:
+                raise ValueError(
+                    'Unknown store option preset "%s" for "%s". Use one '
+                    'of %s' % (
+                        options, key,
+                        ', '.join(sorted(cls.store_option_presets))))
+
+        return dict(store_options)
+
+    @classmethod
+    def resolve_store_options(cls, store_options, var_name):
+        """
+        The chunking and compression options for a variable
+
+        Parameters
+        ----------
+        store_options : str or dict or None
+            the store options, see :meth:`__init__`
+        var_name : str
+            the name of the variable, e.g. `'snapshot0_coordinates'`
+
+        Returns
+        -------
+        dict
+            the options of all keys that match the variable, where options
+            of more specific (longer) keys override the others
+        """
+        store_options = cls._check_store_options(store_options)
+
+        matches = []
+        for key, options in store_options.items():
+            pattern = any(char in key for char in '*?[')
+            if pattern:
+                match = fnmatch.fnmatchcase(var_name, key)
+            else:
+                # store names match all variables of the store
+                match = var_name == key or var_name.startswith(key + '_')
+
+            if match:
+                matches.append(((len(key), not pattern), options))
+
+        resolved = {}
+        for _, options in sorted(matches, key=lambda match: match[0]):
+            if not isinstance(options, dict):
+                options = cls.store_option_presets[options]
+
+            resolved.update(options)
+
+        return resolved
+
+    def variable_options(self, var_name):
+        """
+        The chunking and compression options used for a variable
+
+        Parameters
+        ----------
+        var_name : str
+            the name of the variable
+
+        Returns
+        -------
+        dict
+            the options from the `store_options` of this storage
+        """
+        return self.resolve_store_options(self.store_options, var_name)
+
+    @classmethod
+    def record_chunksizes(cls, options, shape, chunksizes, itemsize):
+        """
+        The chunk sizes with the number of objects per chunk from options
+
+        Parameters
+        ----------
+        options : dict
+            the options of the variable, see :meth:`variable_options`
+        shape : tuple of int
+            the length of the dimensions of the variable. The first one is
+            the dimension that objects are appended to
+        chunksizes : tuple of int or None
+            the default chunk sizes, `None` uses the full length of all but
+            the first dimension
+        itemsize : int
+            the number of bytes of one element
+
+        Returns
+        -------
+        tuple of int or None
+            the chunk sizes to be used
+        """
+        if 'chunksize' in options:
+            n_objects = options['chunksize']
+        elif 'chunk_bytes' in options:
+            n_objects = None
+        else:
+            return chunksizes
+
+        if chunksizes is None:
+            inner = [max(1, size) for size in shape[1:]]
+        else:
+            inner = list(chunksizes[1:])
+
+        if n_objects is None:
+            object_bytes = itemsize * int(np.prod(inner))
+            n_objects = options['chunk_bytes'] // max(1, object_bytes)
+
+        return tuple([max(1, int(n_objects))] + inner)
+
+    def _set_chunk_caches(self):
+        for var_name, variable in self.variables.items():
+            options = self.variable_options(var_name)
+            if 'cache_size' in options:
+                variable.set_var_chunk_cache(size=options['cache_size'])
+
+    def set_memory_budget(self, max_bytes, costs=None):
+        """
+        Limit the memory used by all size-limited caches to a common budget
+
+        Replaces the LRU caches of all object stores and the chunk caches of
+        all value stores (e.g. stored CVs) with caches that share one
+        :class:`openpathsampling.netcdfplus.cache.CacheManager`. Stores that
+        cache everything (usually small named objects) or nothing are not
+        changed. Calling `set_caching` on a store afterwards takes it out of
+        the budget again.
+
+        Parameters
+        ----------
+        max_bytes : int
+            the approximate number of bytes all managed caches may use
+        costs : dict of str, float
+            relative cost to reload an object by store name. Objects with a
+            higher cost are kept longer. The default cost is 1.0
+
+        Returns
+        -------
+        :class:`openpathsampling.netcdfplus.cache.CacheManager`
+            the manager that enforces the budget
+        """
+        if costs is None:
+            costs = {}
+
+        self.cache_manager = CacheManager(max_bytes)
+
+        for name, store in self.objects.items():
+            cost = costs.get(name, 1.0)
+            if isinstance(store, ValueStore):
+                store.initialize_cache(cost)
+            elif isinstance(store.cache, (LRUCache, WeakLRUCache)):
+                store.set_caching(ManagedCache(self.cache_manager, cost))
+
+        return self.cache_manager
+
     def cache_image(self):
         """
         Return an dict containing information about all caches
@@ -758,6 +979,10 @@ class NetCDFPlus(netCDF4.Dataset):
             image['file'][name] = len(store)
             #            if hasattr(store, 'index'):
             image['index'][name] = len(store.index)
+
+            stats = getattr(store.cache, 'stats', None)
+            if stats is not None:
+                profile.update(stats)
         # else:
         #                image['index'][name] = 0
 
@@ -767,6 +992,9 @@ class NetCDFPlus(netCDF4.Dataset):
         image['file'] = total_file
         image['index'] = total_index
 
+        if self.cache_manager is not None:
+            image['manager'] = self.cache_manager.stats
+
         return image
 
     def get_var_types(self):
@@ -1023,7 +1251,8 @@ class NetCDFPlus(netCDF4.Dataset):
                         description=None,
                         chunksizes=None,
                         simtk_unit=None,
-                        maskable=False):
+                        maskable=False,
+                        least_significant_digit=None):
         """
         Create a new variable in the netCDF storage.
 
@@ -1067,6 +1296,17 @@ class NetCDFPlus(netCDF4.Dataset):
             exist and if they have not yet been written they are filled with
             a fill_value which is treated as a non-set variable. The created
             variable will interpret this values as `None` when returned
+        least_significant_digit : int or None
+            if not `None` values are quantized to keep (at least) this number
+            of decimal digits and the variable is compressed using zlib.
+            This is lossy, but quantized values compress a lot better. Only
+            use this for float variables.
+
+        Notes
+        -----
+        The `store_options` of the storage that match `var_name` can change
+        the chunk size along the first dimension, if that is unlimited,
+        and the compression, see :meth:`variable_options`.
         """
 
         ncfile = self
@@ -1115,6 +1355,20 @@ class NetCDFPlus(netCDF4.Dataset):
 
             chunksizes = tuple(chunksizes)
 
+        options = self.variable_options(var_name)
+        if dimensions and ncfile.dimensions[dimensions[0]].isunlimited():
+            if variable_length or nc_type is str:
+                itemsize = self._vlen_item_bytes
+            else:
+                itemsize = np.dtype(nc_type).itemsize
+
+            chunksizes = self.record_chunksizes(
+                options,
+                [len(ncfile.dimensions[dim]) for dim in dimensions],
+                chunksizes,
+                itemsize
+            )
+
         if variable_length:
             vlen_t = ncfile.createVLType(nc_type, var_name + '_vlen')
             ncvar = ncfile.createVariable(
@@ -1123,10 +1377,21 @@ class NetCDFPlus(netCDF4.Dataset):
 
             setattr(ncvar, 'var_vlen', 'True')
         else:
+            # variable length data like strings is stored outside of the
+            # chunks, so only fixed size types are compressed
+            zlib = least_significant_digit is not None or (
+                nc_type is not str and options.get('zlib', False))
             ncvar = ncfile.createVariable(
                 var_name, nc_type, dimensions, chunksizes=chunksizes,
+                zlib=zlib,
+                complevel=options.get('complevel', 4),
+                shuffle=options.get('shuffle', True),
+                least_significant_digit=least_significant_digit
             )
 
+        if 'cache_size' in options:
+            ncvar.set_var_chunk_cache(size=options['cache_size'])
+
         setattr(ncvar, 'var_type', var_type)
 
         if self.support_simtk_unit and simtk_unit is not None:
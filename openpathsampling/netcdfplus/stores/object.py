@@ -6,6 +6,7 @@ from openpathsampling.netcdfplus.base import StorableNamedObject, StorableObject
 from openpathsampling.netcdfplus.cache import MaxCache, Cache, NoCache, \
     WeakLRUCache
 from openpathsampling.netcdfplus.proxy import LoaderProxy
+from openpathsampling.netcdfplus import tracing
 
 from future.utils import iteritems
 
@@ -310,6 +311,7 @@ class ObjectStore(StorableNamedObject):
 
         if isinstance(caching, Cache):
             self.cache = caching.transfer(self.cache)
+            self.cache.trace_name = self.prefix
 
     def idx(self, obj):
         """
@@ -573,7 +575,8 @@ class ObjectStore(StorableNamedObject):
             chunksizes=None,
             description=None,
             simtk_unit=None,
-            maskable=False
+            maskable=False,
+            least_significant_digit=None
     ):
         """
         Create a new variable in the netCDF storage. This is just a helper
@@ -616,6 +619,10 @@ class ObjectStore(StorableNamedObject):
             exist and if they have not yet been written they are filled with
             a fill_value which is treated as a non-set variable. The created
             variable will interpret this values as `None` when returned
+        least_significant_digit : int or None
+            if not `None` values are quantized to keep this number of decimal
+            digits and compressed. See
+            :meth:`openpathsampling.netcdfplus.NetCDFPlus.create_variable`
         """
 
         # add the main dimension to the var_type
@@ -668,7 +675,8 @@ class ObjectStore(StorableNamedObject):
             chunksizes=chunksizes,
             description=description,
             simtk_unit=simtk_unit,
-            maskable=maskable
+            maskable=maskable,
+            least_significant_digit=least_significant_digit
         )
 
     @property
@@ -700,6 +708,7 @@ class ObjectStore(StorableNamedObject):
     # LOAD/SAVE DECORATORS FOR CACHE HANDLING
     # ==========================================================================
 
+    @tracing.traced
     def load(self, idx):
         """
         Returns an object from the storage.
@@ -824,6 +833,7 @@ class ObjectStore(StorableNamedObject):
 
         self.index.unmark(obj.__uuid__)
 
+    @tracing.traced
     def save(self, obj, idx=None):
         """
         Saves an object to the storage.
@@ -888,7 +898,8 @@ class ObjectStore(StorableNamedObject):
         # make sure in nested saving that an IDX is not used twice!
         # self.reserve_idx(n_idx)
 
-        logger.debug('Saving ' + str(type(obj)) + ' using IDX #' + str(n_idx))
+        if self._log_debug:
+            logger.debug('Saving %s using IDX #%d' % (type(obj), n_idx))
 
         try:
             self._save(obj, n_idx)
@@ -129,11 +129,14 @@ class ValueStore(ObjectStore):
     def initialize(self):
         self.initialize_cache()
 
-    def initialize_cache(self):
+    def initialize_cache(self, cost=1.0):
         self.cache = LRUChunkLoadingCache(
             chunksize=self.chunksize,
-            variable=self.vars['value']
+            variable=self.vars['value'],
+            manager=self.storage.cache_manager,
+            cost=cost
         )
+        self.cache.trace_name = self.prefix
         self.cache.update_size()
 
     def __getitem__(self, item):
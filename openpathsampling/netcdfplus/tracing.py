@@ -0,0 +1,302 @@
+"""
+Low overhead tracing of hot paths
+
+Loading and saving objects, the caches of stores and collective variables
+and the ensemble caches report what they do to the active :class:`Tracer`.
+When no tracer is active (the default) each hot path only checks that
+`tracing.active` is `None`; no strings are formatted and nothing is logged.
+
+While a tracer is active it counts calls and cache hits and misses. The
+duration of every `sample_interval`-th call of a traced function is
+measured, so the overhead of timing can be kept small during production
+runs.
+
+Examples
+--------
+>>> from openpathsampling.netcdfplus import tracing
+>>> with tracing.Tracer(sample_interval=100) as tracer:
+...     sim.run(100)
+>>> print(tracer)
+>>> tracer.export('trace.json')
+"""
+import functools
+import json
+import threading
+import timeit
+
+default_timer = timeit.default_timer
+
+active = None
+"""Tracer or None : the tracer hot paths report to"""
+
+
+class Tracer(object):
+    """
+    Collect call counts, cache hit rates and sampled durations
+
+    The tracer is active inside `with tracer:` blocks or between
+    :meth:`start` and :meth:`stop`. Only one tracer can be active.
+
+    Parameters
+    ----------
+    sample_interval : int
+        measure the duration of every n-th call of each traced function.
+        Use `0` to only count calls.
+    max_events : int
+        the maximal number of single sampled calls to keep for
+        :meth:`export`. Aggregated durations are not affected.
+
+    Attributes
+    ----------
+    counts : dict of str: int
+        the number of calls or events per name
+    caches : dict of str: list of int
+        the number of hits and misses per cache name
+    durations : dict of str: list of float
+        the number of sampled calls and their total, minimal and maximal
+        duration in seconds per name
+    events : list of tuple
+        name, start time and duration of single sampled calls
+    """
+
+    def __init__(self, sample_interval=1, max_events=100000):
+        self.sample_interval = sample_interval
+        self.max_events = max_events
+        self.counts = {}
+        self.caches = {}
+        self.durations = {}
+        self.events = []
+        self._lock = threading.Lock()
+        self._origin = default_timer()
+        self._previous = None
+
+    def start(self):
+        """Make this tracer the active one"""
+        global active
+        self._previous = active
+        active = self
+        return self
+
+    def stop(self):
+        """Deactivate this tracer and reactivate the previous one"""
+        global active
+        active = self._previous
+        self._previous = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def clear(self):
+        """Forget everything collected so far"""
+        with self._lock:
+            self.counts.clear()
+            self.caches.clear()
+            self.durations.clear()
+            del self.events[:]
+            self._origin = default_timer()
+
+    def count(self, name, n=1):
+        """
+        Count calls or events
+
+        Parameters
+        ----------
+        name : str
+        n : int
+            the number to add to the count
+        """
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def cache(self, name, hit):
+        """
+        Count a lookup in a cache
+
+        Parameters
+        ----------
+        name : str
+            the name of the cache
+        hit : bool
+            whether the requested item was in the cache
+        """
+        with self._lock:
+            counts = self.caches.get(name)
+            if counts is None:
+                counts = self.caches[name] = [0, 0]
+
+            counts[0 if hit else 1] += 1
+
+    def begin(self, name):
+        """
+        Count a call and start measuring it if it is sampled
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        float or None
+            the start time to be passed to :meth:`end` or `None` if the
+            call is not sampled
+        """
+        with self._lock:
+            n_calls = self.counts.get(name, 0)
+            self.counts[name] = n_calls + 1
+
+        if self.sample_interval and n_calls % self.sample_interval == 0:
+            return default_timer()
+
+        return None
+
+    def end(self, name, start):
+        """
+        Finish measuring a call started with :meth:`begin`
+
+        Parameters
+        ----------
+        name : str
+        start : float or None
+            the value returned by :meth:`begin`
+        """
+        if start is None:
+            return
+
+        duration = default_timer() - start
+        with self._lock:
+            stats = self.durations.get(name)
+            if stats is None:
+                self.durations[name] = [1, duration, duration, duration]
+            else:
+                stats[0] += 1
+                stats[1] += duration
+                stats[2] = min(stats[2], duration)
+                stats[3] = max(stats[3], duration)
+
+            if len(self.events) < self.max_events:
+                self.events.append((
+                    name, start - self._origin, duration,
+                    threading.current_thread().ident))
+
+    def hit_rate(self, name):
+        """
+        Parameters
+        ----------
+        name : str
+            the name of the cache
+
+        Returns
+        -------
+        float
+            the fraction of lookups that were hits, `nan` without lookups
+        """
+        hits, misses = self.caches.get(name, (0, 0))
+        if hits + misses == 0:
+            return float('nan')
+
+        return float(hits) / (hits + misses)
+
+    def to_dict(self):
+        """
+        Returns
+        -------
+        dict
+            all collected data. `traceEvents` contains the sampled calls in
+            the Chrome trace event format (times in microseconds)
+        """
+        with self._lock:
+            return {
+                'sample_interval': self.sample_interval,
+                'counts': dict(self.counts),
+                'caches': {
+                    name: {
+                        'hits': hits,
+                        'misses': misses,
+                        'hit_rate': self.hit_rate(name)
+                    } for name, (hits, misses) in self.caches.items()
+                },
+                'durations': {
+                    name: {
+                        'sampled': n,
+                        'total': total,
+                        'mean': total / n,
+                        'min': t_min,
+                        'max': t_max
+                    } for name, (n, total, t_min, t_max)
+                    in self.durations.items()
+                },
+                'traceEvents': [
+                    {
+                        'name': name,
+                        'ph': 'X',
+                        'ts': 1e6 * since,
+                        'dur': 1e6 * duration,
+                        'pid': 0,
+                        'tid': thread
+                    } for name, since, duration, thread in self.events
+                ]
+            }
+
+    def export(self, filename):
+        """
+        Write the collected data to a JSON trace file
+
+        The file can also be opened in trace viewers that read the Chrome
+        trace event format, e.g. `chrome://tracing`.
+
+        Parameters
+        ----------
+        filename : str
+        """
+        with open(filename, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1, sort_keys=True)
+
+    def __str__(self):
+        lines = ['%-40s %10s %10s %10s' % ('name', 'calls', 'sampled',
+                                            'mean [ms]')]
+        for name, n_calls in sorted(self.counts.items()):
+            stats = self.durations.get(name)
+            if stats is None:
+                lines.append('%-40s %10d' % (name[:40], n_calls))
+            else:
+                lines.append('%-40s %10d %10d %10.3f' % (
+                    name[:40], n_calls, stats[0], 1e3 * stats[1] / stats[0]))
+
+        lines.append('')
+        lines.append('%-40s %10s %10s %10s' % ('cache', 'hits', 'misses',
+                                                'hit rate'))
+        for name, (hits, misses) in sorted(self.caches.items()):
+            lines.append('%-40s %10d %10d %10.3f' % (
+                name[:40], hits, misses, self.hit_rate(name)))
+
+        return '\n'.join(lines)
+
+
+def traced(func):
+    """
+    Decorator to trace calls of a method
+
+    Calls are reported as `<name>.<method>` where `name` is the `name` of
+    the object or its class name. Without an active tracer only the check
+    for it is added to a call.
+    """
+    method = func.__name__
+
+    @functools.wraps(func)
+    def _traced(self, *args, **kwargs):
+        tracer = active
+        if tracer is None:
+            return func(self, *args, **kwargs)
+
+        name = '%s.%s' % (
+            getattr(self, 'name', None) or self.__class__.__name__, method)
+        start = tracer.begin(name)
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            tracer.end(name, start)
+
+    return _traced
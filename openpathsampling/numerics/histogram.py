@@ -1,7 +1,5 @@
 import numpy as np
 import pandas as pd
-import scipy
-import matplotlib.pyplot as plt
 import math
 from .lookup_function import LookupFunction, VoxelLookupFunction
 import collections
@@ -52,6 +50,7 @@ class SparseHistogram(object):
             raise RuntimeError("histogram() called without data!")
         elif data is not None:
             self._histogram = collections.Counter({})
+            self.count = 0
             return self.add_data_to_histogram(data, weights)
         else:
             return self._histogram.copy()
@@ -264,7 +263,9 @@ class Histogram(SparseHistogram):
                                         left_bin_edges=left_bin_edges)
 
     def empty_copy(self):
-        return type(self)(bin_width=self.bin_width, bin_range=self.bin_range)
+        (n_bins, bin_width, bin_range) = self._inputs
+        return type(self)(n_bins=n_bins, bin_width=bin_width,
+                          bin_range=bin_range)
 
     def histogram(self, data=None, weights=None):
         """Build the histogram based on `data`.
@@ -711,6 +712,7 @@ class HistogramPlotter2D(object):
         df = hist_fcn.df_2d(x_range=self.xrange_, y_range=self.yrange_)
         self.df = df
 
+        import matplotlib.pyplot as plt
         mesh = plt.pcolormesh(df.fillna(0.0).transpose(), **kwargs)
 
         (xticks, xlabels) = self.ticks_and_labels(xticks_, mesh.axes, dof=0)
@@ -739,4 +741,5 @@ class HistogramPlotter2D(object):
         x, y = list(zip(*self.histogram.map_to_float_bins(trajectory)))
         px = np.asarray(x) - self.xrange_[0]
         py = np.asarray(y) - self.yrange_[0]
+        import matplotlib.pyplot as plt
         plt.plot(px, py, *args, **kwargs)
@@ -14,6 +14,7 @@ import openpathsampling as paths
 from openpathsampling.netcdfplus import StorableNamedObject, StorableObject
 from openpathsampling.pathmover_inout import InOutSet, InOut
 from .ops_logging import initialization_logging
+from .timing import timed
 from .treelogic import TreeMixin
 
 from future.utils import with_metaclass
@@ -534,7 +535,8 @@ class SampleMover(PathMover):
         # TODO: This isn't right. `bias` should be associated with the
         # change; not with each individual sample. ~~~DWHS
         for ens, sample in trial_dict.items():
-            valid = ens(sample.trajectory, candidate=self._trust_candidate)
+            valid = ens.check(sample.trajectory,
+                              candidate=self._trust_candidate)
             if not valid:
                 # one sample not valid reject
                 accepted = False
@@ -614,7 +616,8 @@ class SampleMover(PathMover):
             )
 
         # 4. accept/reject
-        accepted, acceptance_details = self._accept(trials)
+        with timed('acceptance'):
+            accepted, acceptance_details = self._accept(trials)
 
         # update details
         kwargs = {}
@@ -989,11 +992,13 @@ class ReplicaExchangeMover(SampleMover):
         replica1 = sample1.replica
         replica2 = sample2.replica
 
-        from1to2 = ensemble2(trajectory1, candidate=self._trust_candidate)
+        from1to2 = ensemble2.check(trajectory1,
+                                   candidate=self._trust_candidate)
         logger.debug("trajectory " + repr(trajectory1) +
                      " into ensemble " + repr(ensemble2) +
                      " : " + str(from1to2))
-        from2to1 = ensemble1(trajectory2, candidate=self._trust_candidate)
+        from2to1 = ensemble1.check(trajectory2,
+                                   candidate=self._trust_candidate)
         logger.debug("trajectory " + repr(trajectory2) +
                      " into ensemble " + repr(ensemble1) +
                      " : " + str(from2to1))
@@ -1075,11 +1080,11 @@ class StateSwapMover(SampleMover):
         replica1 = sample1.replica
         replica2 = sample2.replica
 
-        from1to2 = ensemble2(trajectory1)
+        from1to2 = ensemble2.check(trajectory1)
         logger.debug("trajectory " + repr(trajectory1) +
                      " into ensemble " + repr(ensemble2) +
                      " : " + str(from1to2))
-        from2to1 = ensemble1(trajectory2)
+        from2to1 = ensemble1.check(trajectory2)
         logger.debug("trajectory " + repr(trajectory2) +
                      " into ensemble " + repr(ensemble1) +
                      " : " + str(from2to1))
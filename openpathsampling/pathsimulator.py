@@ -1,6 +1,7 @@
 import time
 import sys
 import logging
+import threading
 import numpy as np
 import pandas as pd
 
@@ -13,6 +14,7 @@ import collections
 
 from openpathsampling.pathmover import SubPathMover
 from .ops_logging import initialization_logging
+from .timing import StepTimer, StepTiming, TimingSummary, timed
 import abc
 
 from future.utils import with_metaclass
@@ -47,13 +49,17 @@ class MCStep(StorableObject):
         the final (post) sampleset
     change : MoveChange
         the movechange describing the transition from pre to post
+    timing : :class:`openpathsampling.timing.StepTiming`
+        the time spent in the engine, ensembles, CVs, acceptance and
+        storage during the step. All `nan` if the step was not timed.
     """
     def __init__(self,
                  simulation=None,
                  mccycle=-1,
                  previous=None,
                  active=None,
-                 change=None
+                 change=None,
+                 timing=None
                  ):
 
         super(MCStep, self).__init__()
@@ -62,6 +68,11 @@ class MCStep(StorableObject):
         self.active = active
         self.change = change
         self.mccycle = mccycle
+        if timing is None:
+            timing = StepTiming()
+        elif not isinstance(timing, StepTiming):
+            timing = StepTiming.from_array(timing)
+        self.timing = timing
 
 
 class PathSimulator(with_metaclass(abc.ABCMeta, StorableNamedObject)):
@@ -511,6 +522,24 @@ class PathSampling(PathSimulator):
     
     Takes a single move_scheme and generates samples from that, keeping one
     per replica after each move. 
+
+    Every ``save_frequency`` steps the samples are checked to be in their
+    ensembles. Only samples that changed since the last check are checked;
+    use :meth:`sanity_check` with ``full=True`` to check all of them.
+
+    Attributes
+    ----------
+    timing_summary : :class:`openpathsampling.timing.TimingSummary`
+        the accumulated timing of all steps run by this object, per mover.
+        It is written to ``output_stream`` with the progress output and at
+        the end of :meth:`run`. The timing of each step is stored in
+        :attr:`MCStep.timing`.
+    sanity_check_in_background : bool
+        if `True` the periodic sanity checks run in a separate thread while
+        the simulation continues. Errors are raised at the next check or at
+        the end of :meth:`run`. Only use this if evaluating the ensembles
+        (i.e. your CVs and loading snapshots from storage) is thread-safe.
+        Default is `False`.
     """
 
     calc_name = "PathSampling"
@@ -549,6 +578,11 @@ class PathSampling(PathSimulator):
                                ['move_scheme', 'sample_set'])
         self.live_visualizer = None
         self.status_update_frequency = 1
+        self.sanity_check_in_background = False
+        self.timing_summary = TimingSummary()
+        self._checked_sample_set = None
+        self._sanity_check_thread = None
+        self._sanity_check_error = None
 
         if initialize:
             samples = []
@@ -678,6 +712,57 @@ class PathSampling(PathSimulator):
 
         self._current_step = step
 
+    def sanity_check(self, full=False, background=False):
+        """
+        Check that the samples of the current sample set are in their ensembles
+
+        Parameters
+        ----------
+        full : bool
+            if `True` all samples are checked. Otherwise (default) only the
+            samples that changed since the last successful check.
+        background : bool
+            if `True` the check runs in a separate thread; its errors are
+            raised by :meth:`finish_sanity_check`.
+
+        Raises
+        ------
+        AssertionError
+            if a sample is not in its ensemble
+        """
+        self.finish_sanity_check()
+
+        sample_set = self.sample_set
+        checked = None if full else self._checked_sample_set
+
+        def check():
+            try:
+                sample_set.sanity_check(checked)
+            except Exception as e:
+                self._sanity_check_error = e
+            else:
+                self._checked_sample_set = sample_set
+
+        if background:
+            self._sanity_check_thread = threading.Thread(target=check)
+            self._sanity_check_thread.daemon = True
+            self._sanity_check_thread.start()
+        else:
+            check()
+            self.finish_sanity_check()
+
+    def finish_sanity_check(self):
+        """
+        Wait for a running sanity check and raise its error, if any
+        """
+        if self._sanity_check_thread is not None:
+            self._sanity_check_thread.join()
+            self._sanity_check_thread = None
+
+        error, self._sanity_check_error = self._sanity_check_error, None
+        if error is not None:
+            raise error
+
     def run_until(self, n_steps):
         # if self.storage is not None:
         #     if len(self.storage.steps) > 0:
@@ -718,31 +803,38 @@ class PathSampling(PathSimulator):
                 paths.tools.refresh_output(
                     "Working on Monte Carlo cycle number " + str(self.step)
                     + "\n" + paths.tools.progress_string(nn, n_steps,
-                                                         elapsed),
+                                                         elapsed)
+                    + self._timing_output(),
                     refresh=refresh,
                     output_stream=self.output_stream
                 )
 
-            time_start = time.time()
-            movepath = self._mover.move(self.sample_set, step=self.step)
-            samples = movepath.results
-            new_sampleset = self.sample_set.apply_samples(samples)
-            time_elapsed = time.time() - time_start
-
-            # TODO: we can save this with the MC steps for timing? The bit
-            # below works, but is only a temporary hack
-            setattr(movepath.details, "timing", time_elapsed)
+            timer = StepTimer()
+            with timer:
+                movepath = self._mover.move(self.sample_set, step=self.step)
+                samples = movepath.results
+                new_sampleset = self.sample_set.apply_samples(samples)
 
             mcstep = MCStep(
                 simulation=self,
                 mccycle=self.step,
                 previous=self.sample_set,
                 active=new_sampleset,
-                change=movepath
+                change=movepath,
+                timing=timer.timing()
             )
 
             self._current_step = mcstep
-            self.save_current_step()
+            with timer, timed('storage'):
+                self.save_current_step()
+
+            # the step was saved with its timing so far; add storage time
+            mcstep.timing = timer.timing()
+            if self.storage is not None:
+                self.storage.steps.update_timing(mcstep)
+
+            self.timing_summary.add(
+                mcstep.timing, getattr(movepath.canonical.mover, 'name', None))
 
             # if self.storage is not None:
             #     # I think this is done automatically when saving snapshots
@@ -754,21 +846,31 @@ class PathSampling(PathSimulator):
             #     self.storage.steps.save(mcstep)
 
             if self.step % self.save_frequency == 0:
-                self.sample_set.sanity_check()
+                self.sanity_check(
+                    background=self.sanity_check_in_background)
                 self.sync_storage()
 
             self.sample_set = new_sampleset
 
         self.sync_storage()
+        self.finish_sanity_check()
 
         if self.live_visualizer is not None and mcstep is not None:
             self.live_visualizer.draw_ipynb(mcstep)
         paths.tools.refresh_output(
-            "DONE! Completed " + str(self.step) + " Monte Carlo cycles.\n",
+            "DONE! Completed " + str(self.step) + " Monte Carlo cycles.\n"
+            + self._timing_output(),
             refresh=False,
             output_stream=self.output_stream
         )
 
+    def _timing_output(self):
+        """The timing summary as part of the progress output"""
+        if not self.timing_summary.n_steps:
+            return ""
+
+        return "\nTiming (in seconds):\n" + str(self.timing_summary) + "\n"
+
 
 class ShootFromSnapshotsSimulation(PathSimulator):
     """
@@ -1013,6 +1115,17 @@ class DirectSimulation(PathSimulator):
         `interface` for each pair in this list
     initial_snapshot : paths.engines.Snapshot
         initial snapshot for the MD
+    chunk_size : int
+        number of frames that are generated before the states and
+        interfaces are evaluated for all of them at once. In streaming
+        mode, this is also the number of frames saved at a time.
+        Default is 1000.
+    streaming : bool
+        if `True` and a storage is given, each chunk is saved as a separate
+        trajectory as soon as it is done, so memory use does not grow with
+        the length of the run. Every saved chunk starts with the last
+        frame of the previous one. If `False` (default), one trajectory
+        with all frames is saved at the end of the run.
 
     Attributes
     ----------
@@ -1031,7 +1144,8 @@ class DirectSimulation(PathSimulator):
         number of flux events for each (state, interface) pair
     """
     def __init__(self, storage=None, engine=None, states=None,
-                 flux_pairs=None, initial_snapshot=None):
+                 flux_pairs=None, initial_snapshot=None, chunk_size=1000,
+                 streaming=False):
         super(DirectSimulation, self).__init__(storage)
         self.engine = engine
         self.states = states
@@ -1040,6 +1154,8 @@ class DirectSimulation(PathSimulator):
             self.flux_pairs = []
         self.initial_snapshot = initial_snapshot
         self.save_every = 1
+        self.chunk_size = chunk_size
+        self.streaming = streaming
 
         # TODO: might set these elsewhere for reloading purposes?
         self.transition_count = []
@@ -1059,51 +1175,73 @@ class DirectSimulation(PathSimulator):
         last_interface_exit = {p: -1 for p in self.flux_pairs}
         last_state_visit = {s: -1 for s in self.states}
         was_in_interface = {p: None for p in self.flux_pairs}
-        local_traj = paths.Trajectory([self.initial_snapshot])
-        self.engine.current_snapshot = self.initial_snapshot
-        for step in xrange(n_steps):
-            frame = self.engine.generate_next_frame()
+        state_flux_pairs = {s: [p for p in self.flux_pairs if p[0] == s]
+                            for s in self.states}
+        interfaces = list(set(p[1] for p in self.flux_pairs))
 
-            # update the most recent state if we're in a state
-            state = None  # no state at all
+        frames = []
+        last_saved = self.initial_snapshot
+        self.engine.current_snapshot = self.initial_snapshot
+        for chunk_start in xrange(0, n_steps, self.chunk_size):
+            chunk_len = min(self.chunk_size, n_steps - chunk_start)
+            chunk = [self.engine.generate_next_frame()
+                     for _ in xrange(chunk_len)]
+
+            # evaluate the volumes on the whole chunk at once; for each
+            # frame the last state in the list that contains it wins
+            chunk_state = [None] * chunk_len
             for s in self.states:
-                if s(frame):
-                    state = s
-            if state:
-                last_state_visit[state] = step
-                if state is not most_recent_state:
-                    # we've made a transition: on the first entrance into
-                    # this state, we reset the last_interface_exit
-                    state_flux_pairs = [p for p in self.flux_pairs
-                                        if p[0] == state]
-                    for p in state_flux_pairs:
-                        last_interface_exit[p] = -1
-                    # if this isn't the first change of state, we add the
-                    # transition
-                    if most_recent_state:
-                        self.transition_count.append((state, step))
-                    most_recent_state = state
-
-            # update whether we've left any interface
-            for p in self.flux_pairs:
-                state = p[0]
-                interface = p[1]
-                is_in_interface = interface(frame)
-                if not is_in_interface and was_in_interface[p]:
-                    if state is most_recent_state:
-                        last_exit = last_interface_exit[p]
-                        # successful exit
-                        if 0 < last_exit < last_state_visit[state]:
-                            flux_time_range = (step, last_exit)
-                            self.flux_events[p].append(flux_time_range)
-                        last_interface_exit[p] = step
-                was_in_interface[p] = is_in_interface
+                for idx in np.flatnonzero(s.evaluate_batch(chunk)):
+                    chunk_state[idx] = s
+
+            in_interface = {i: i.evaluate_batch(chunk) for i in interfaces}
+
+            for idx in xrange(chunk_len):
+                step = chunk_start + idx
+
+                # update the most recent state if we're in a state
+                state = chunk_state[idx]
+                if state:
+                    last_state_visit[state] = step
+                    if state is not most_recent_state:
+                        # we've made a transition: on the first entrance
+                        # into this state, we reset the last_interface_exit
+                        for p in state_flux_pairs[state]:
+                            last_interface_exit[p] = -1
+                        # if this isn't the first change of state, we add
+                        # the transition
+                        if most_recent_state:
+                            self.transition_count.append((state, step))
+                        most_recent_state = state
+
+                # update whether we've left any interface
+                for p in self.flux_pairs:
+                    state = p[0]
+                    is_in_interface = in_interface[p[1]][idx]
+                    if not is_in_interface and was_in_interface[p]:
+                        if state is most_recent_state:
+                            last_exit = last_interface_exit[p]
+                            # successful exit
+                            if 0 < last_exit < last_state_visit[state]:
+                                flux_time_range = (step, last_exit)
+                                self.flux_events[p].append(flux_time_range)
+                            last_interface_exit[p] = step
+                    was_in_interface[p] = is_in_interface
 
             if self.storage is not None:
-                local_traj += [frame]
+                if self.streaming:
+                    # each chunk starts with the last frame of the one
+                    # before, so the chunks can be joined again
+                    self.storage.save(
+                        paths.Trajectory([last_saved] + chunk))
+                    self.storage.sync()
+                    last_saved = chunk[-1]
+                else:
+                    frames.extend(chunk)
 
-        if self.storage is not None:
-            self.storage.save(local_traj)
+        if self.storage is not None and not self.streaming:
+            self.storage.save(
+                paths.Trajectory([self.initial_snapshot] + frames))
 
     @property
     def transitions(self):
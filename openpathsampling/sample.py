@@ -21,6 +21,164 @@ class SampleKeyError(Exception):
                     + " from " + str(self.sample))
 
 
+class PersistentDict(object):
+    """
+    Ordered mapping whose copies share their content
+
+    The entries are kept in small chunks and the keys in small hash
+    buckets. :meth:`copy` only copies the tables of chunks and buckets;
+    a chunk or bucket is copied the first time a copy changes it
+    (copy-on-write). Changing `k` entries of a copy of a mapping with `n`
+    entries therefore costs O(n / chunk_size + k * chunk_size) instead of
+    O(n), and all unchanged chunks are shared in memory.
+
+    Like a `dict`, iteration follows the order of insertion and replacing
+    the value of an existing key keeps its position.
+    """
+
+    chunk_size = 32
+
+    def __init__(self, items=None):
+        self._clear()
+        if items is not None:
+            for key, value in items:
+                self[key] = value
+
+    def _clear(self):
+        self._n_buckets = 1
+        self._index = {}  # bucket id -> {key: serial number}
+        self._chunks = {}  # chunk id -> {serial number: (key, value)}
+        # ids of the buckets and chunks not shared with any copy
+        self._owned_buckets = set()
+        self._owned_chunks = set()
+        self._next = 0
+        self._len = 0
+
+    def copy(self):
+        """Return a copy that shares all chunks with this mapping"""
+        new = self.__class__.__new__(self.__class__)
+        new._n_buckets = self._n_buckets
+        new._index = dict(self._index)
+        new._chunks = dict(self._chunks)
+        new._owned_buckets = set()
+        new._owned_chunks = set()
+        new._next = self._next
+        new._len = self._len
+
+        # the chunks are shared now, so we have to copy them, too
+        self._owned_buckets = set()
+        self._owned_chunks = set()
+        return new
+
+    def _bucket(self, key):
+        return hash(key) % self._n_buckets
+
+    def _serial(self, key):
+        return self._index.get(self._bucket(key), {}).get(key)
+
+    def _own_bucket(self, bucket_id):
+        if bucket_id not in self._owned_buckets:
+            self._index[bucket_id] = dict(self._index.get(bucket_id, {}))
+            self._owned_buckets.add(bucket_id)
+        return self._index[bucket_id]
+
+    def _own_chunk(self, chunk_id):
+        if chunk_id not in self._owned_chunks:
+            self._chunks[chunk_id] = dict(self._chunks.get(chunk_id, {}))
+            self._owned_chunks.add(chunk_id)
+        return self._chunks[chunk_id]
+
+    def __getitem__(self, key):
+        serial = self._serial(key)
+        if serial is None:
+            raise KeyError(key)
+
+        return self._chunks[serial // self.chunk_size][serial][1]
+
+    def get(self, key, default=None):
+        serial = self._serial(key)
+        if serial is None:
+            return default
+
+        return self._chunks[serial // self.chunk_size][serial][1]
+
+    def __contains__(self, key):
+        return self._serial(key) is not None
+
+    def __setitem__(self, key, value):
+        serial = self._serial(key)
+        if serial is None:
+            serial = self._next
+            self._next += 1
+            self._own_bucket(self._bucket(key))[key] = serial
+            self._len += 1
+
+        self._own_chunk(serial // self.chunk_size)[serial] = (key, value)
+        self._check_layout()
+
+    def __delitem__(self, key):
+        serial = self._serial(key)
+        if serial is None:
+            raise KeyError(key)
+
+        bucket_id = self._bucket(key)
+        bucket = self._own_bucket(bucket_id)
+        del bucket[key]
+        if not bucket:
+            del self._index[bucket_id]
+            self._owned_buckets.discard(bucket_id)
+
+        chunk_id = serial // self.chunk_size
+        chunk = self._own_chunk(chunk_id)
+        del chunk[serial]
+        if not chunk:
+            del self._chunks[chunk_id]
+            self._owned_chunks.discard(chunk_id)
+
+        self._len -= 1
+        self._check_layout()
+
+    def _check_layout(self):
+        # rebuild if the buckets got too large or the chunks too sparse
+        n_chunks = self._len // self.chunk_size + 1
+        if self._len > 2 * self.chunk_size * self._n_buckets or \
+                len(self._chunks) > 2 * n_chunks:
+            self._rebuild()
+
+    def _rebuild(self):
+        items = list(self.items())
+        self._clear()
+        while self._n_buckets * self.chunk_size < len(items):
+            self._n_buckets *= 2
+
+        for key, value in items:
+            self[key] = value
+
+    def items(self):
+        for chunk_id in sorted(self._chunks):
+            chunk = self._chunks[chunk_id]
+            for serial in sorted(chunk):
+                yield chunk[serial]
+
+    def __iter__(self):
+        for key, _ in self.items():
+            yield key
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def __len__(self):
+        return self._len
+
+    def __repr__(self):
+        return '%s({%s})' % (
+            self.__class__.__name__,
+            ', '.join('%r: %r' % item for item in self.items()))
+
+
 # @lazy_loading_attributes('movepath')
 class SampleSet(StorableObject):
     """
@@ -51,15 +209,20 @@ class SampleSet(StorableObject):
         from 1 to 4 use `sset[xrange(1,5)]`
 
 
+    All containers are :class:`PersistentDict` objects, so the copy made
+    by :meth:`apply_samples` shares everything that did not change with the
+    original set. Its cost is proportional to the number of changed
+    samples, not to the number of replicas.
+
     Attributes
     ----------
     samples : list of Sample
         The samples included in this set.
-    ensemble_dict : dict
-        A dictionary with Ensemble objects as keys and lists of Samples as
+    ensemble_dict : :class:`PersistentDict`
+        A mapping with Ensemble objects as keys and tuples of Samples as
         values.
-    replica_dict : dict
-        A dictionary with replica IDs as keys and lists of Samples as values
+    replica_dict : :class:`PersistentDict`
+        A mapping with replica IDs as keys and tuples of Samples as values
     """
 
     movepath = DelayedLoader()
@@ -69,12 +232,16 @@ class SampleSet(StorableObject):
 
         self._lazy = {}
 
-        self.samples = []
-        self.ensemble_dict = {}
-        self.replica_dict = {}
+        self._samples = PersistentDict()
+        self.ensemble_dict = PersistentDict()
+        self.replica_dict = PersistentDict()
         self.extend(samples)
         self.movepath = movepath
 
+    @property
+    def samples(self):
+        return list(self._samples)
+
     @property
     def ensembles(self):
         return self.ensemble_dict.keys()
@@ -110,7 +277,7 @@ class SampleSet(StorableObject):
             if key != value.replica:
                 raise SampleKeyError(key, value, value.replica)
 
-        if value in self.samples:
+        if value in self._samples:
             # if value is already in this, we don't need to do anything
             return
         # Setting works by replacing one with the same key. We pick one with
@@ -132,26 +299,31 @@ class SampleSet(StorableObject):
         return not self == other
 
     def __delitem__(self, sample):
-        self.ensemble_dict[sample.ensemble].remove(sample)
-        self.replica_dict[sample.replica].remove(sample)
-        if len(self.ensemble_dict[sample.ensemble]) == 0:
-            del self.ensemble_dict[sample.ensemble]
-        if len(self.replica_dict[sample.replica]) == 0:
-            del self.replica_dict[sample.replica]
-        self.samples.remove(sample)
+        self._remove_from(self.ensemble_dict, sample.ensemble, sample)
+        self._remove_from(self.replica_dict, sample.replica, sample)
+        del self._samples[sample]
+
+    @staticmethod
+    def _remove_from(sample_dict, key, sample):
+        samples = sample_dict[key]
+        idx = samples.index(sample)
+        if len(samples) == 1:
+            del sample_dict[key]
+        else:
+            sample_dict[key] = samples[:idx] + samples[idx + 1:]
 
     # TODO: add support for remove and pop
 
     def __iter__(self):
-        for sample in self.samples:
+        for sample in self._samples:
             yield sample
 
     def __len__(self):
-        return len(self.samples)
+        return len(self._samples)
 
     def __contains__(self, item):
         # check for Sample, replica (int) and Ensemble, too
-        if item in self.samples:
+        if item in self._samples:
             return True
         elif item in self.ensemble_dict:
             return True
@@ -162,32 +334,28 @@ class SampleSet(StorableObject):
 
     def all_from_ensemble(self, ensemble):
         try:
-            return self.ensemble_dict[ensemble]
+            return list(self.ensemble_dict[ensemble])
         except KeyError:
             return []
 
     def all_from_replica(self, replica):
         try:
-            return self.replica_dict[replica]
+            return list(self.replica_dict[replica])
         except KeyError:
             return []
 
     def append(self, sample):
-        if sample in self.samples:
+        if sample in self._samples:
             # question: would it make sense to raise an error here? can't
             # have more than one copy of the same sample, but should we
             # ignore it silently or complain?
             return
 
-        self.samples.append(sample)
-        try:
-            self.ensemble_dict[sample.ensemble].append(sample)
-        except KeyError:
-            self.ensemble_dict[sample.ensemble] = [sample]
-        try:
-            self.replica_dict[sample.replica].append(sample)
-        except KeyError:
-            self.replica_dict[sample.replica] = [sample]
+        self._samples[sample] = None
+        self.ensemble_dict[sample.ensemble] = \
+            self.ensemble_dict.get(sample.ensemble, ()) + (sample,)
+        self.replica_dict[sample.replica] = \
+            self.replica_dict.get(sample.replica, ()) + (sample,)
 
     def extend(self, samples):
         # note that this works whether the parameter samples is a list of
@@ -208,7 +376,7 @@ class SampleSet(StorableObject):
         elif isinstance(samples, paths.MoveChange):
             samples = samples.results
         if copy:
-            newset = SampleSet(self)
+            newset = self.copy()
         else:
             newset = self
         for sample in samples:
@@ -219,6 +387,18 @@ class SampleSet(StorableObject):
             newset[sample.replica] = sample
         return newset
 
+    def copy(self):
+        """Return a new SampleSet with the same samples
+
+        The new set shares its content with this one until either is
+        changed, so copying is cheap even for many replicas.
+        """
+        newset = SampleSet([])
+        newset._samples = self._samples.copy()
+        newset.ensemble_dict = self.ensemble_dict.copy()
+        newset.replica_dict = self.replica_dict.copy()
+        return newset
+
     def replica_list(self):
         """Returns the list of replicas IDs in this SampleSet
 
@@ -231,16 +411,26 @@ class SampleSet(StorableObject):
         """
         return self.ensemble_dict.keys()
 
-    def sanity_check(self):
+    def sanity_check(self, checked=None):
         """Checks that the sample trajectories satisfy their ensembles
 
+        Parameters
+        ----------
+        checked : :class:`SampleSet` or None
+            a sample set that passed the sanity check before. Samples that
+            are also in `checked` are not checked again. If `None` (default)
+            all samples are checked.
         """
         logger.info("Starting sanity check")
-        for sample in self:
+        samples = self
+        if checked is not None:
+            samples = [sample for sample in self if sample not in checked]
+
+        for sample in samples:
             logger.info("Checking sanity of " + repr(sample.ensemble) +
                         " with " + str(sample.trajectory))
             try:
-                assert(sample.ensemble(sample.trajectory))
+                assert(sample.ensemble.check(sample.trajectory))
             except AssertionError as e:
                 failmsg = ("Trajectory does not match ensemble for replica "
                            + str(sample.replica))
@@ -297,7 +487,7 @@ class SampleSet(StorableObject):
         if len(self) == 0:
             max_replica = -1
         else:
-            max_replica = max([s.replica for s in self.samples])
+            max_replica = max(self.replica_dict.keys())
         self.append(Sample(
             replica=max_replica + 1,
             trajectory=sample.trajectory,
@@ -866,7 +1056,7 @@ class Sample(StorableObject):
                 self._valid = True
             else:
                 if self.ensemble is not None:
-                    self._valid = self.ensemble(self.trajectory)
+                    self._valid = self.ensemble.check(self.trajectory)
                 else:
                     # no ensemble means ALL ???
                     self._valid = True
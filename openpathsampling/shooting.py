@@ -3,15 +3,19 @@ import logging
 
 import numpy as np
 
-from openpathsampling.netcdfplus import StorableNamedObject
+from openpathsampling.netcdfplus import StorableNamedObject, LRUCache
 
 logger = logging.getLogger(__name__)
 init_log = logging.getLogger('openpathsampling.initialization')
 
 
 class ShootingPointSelector(StorableNamedObject):
+    # number of trajectories for which cumulative biases are remembered
+    bias_cache_size = 100
+
     def __init__(self):
         super(ShootingPointSelector, self).__init__()
+        self._bias_cache = LRUCache(self.bias_cache_size)
 
     @property
     def identifier(self):
@@ -45,10 +49,36 @@ class ShootingPointSelector(StorableNamedObject):
 
     def _biases(self, trajectory):
         '''
-        Returns a list of unnormalized proposal probabilities for all
+        Returns an array of unnormalized proposal probabilities for all
         snapshots in trajectory
+
+        Notes
+        -----
+        Subclasses should override this if the biases for a full trajectory
+        can be computed faster than by calling `f` for each snapshot.
         '''
-        return [self.f(s, trajectory) for s in trajectory]
+        return np.array([self.f(s, trajectory) for s in trajectory],
+                        dtype=float)
+
+    def _cumulative_biases(self, trajectory):
+        '''
+        Returns the cumulative sum of `_biases` for a trajectory
+
+        Trajectories are immutable, so the result is cached by the uuid of
+        the trajectory. The length is stored as well to be safe in case a
+        trajectory object was extended in place.
+        '''
+        key = trajectory.__uuid__
+        try:
+            length, cumulative = self._bias_cache[key]
+            if length == len(trajectory):
+                return cumulative
+        except KeyError:
+            pass
+
+        cumulative = np.cumsum(self._biases(trajectory))
+        self._bias_cache[key] = (len(trajectory), cumulative)
+        return cumulative
 
     def sum_bias(self, trajectory):
         '''
@@ -66,7 +96,11 @@ class ShootingPointSelector(StorableNamedObject):
         by `probability(old_trajectory) / probability(new_trajectory)`
         '''
 
-        return sum(self._biases(trajectory))
+        cumulative = self._cumulative_biases(trajectory)
+        if len(cumulative) == 0:
+            return 0.0
+
+        return float(cumulative[-1])
 
     def pick(self, trajectory):
         '''
@@ -74,21 +108,17 @@ class ShootingPointSelector(StorableNamedObject):
         
         Notes
         -----
-        The native implementation is very slow. Simple picking algorithm
-        should override this function.
+        The native implementation draws from the cumulative biases of the
+        full trajectory. Simple picking algorithm should override this
+        function.
         '''
 
-        prob_list = self._biases(trajectory)
-        sum_bias = sum(prob_list)
+        cumulative = self._cumulative_biases(trajectory)
 
-        rand = np.random.random() * sum_bias
-        idx = 0
-        prob = prob_list[0]
-        while prob <= rand and idx < len(prob_list):
-            idx += 1
-            prob += prob_list[idx]
+        rand = np.random.random() * cumulative[-1]
+        idx = np.searchsorted(cumulative, rand, side='right')
 
-        return idx
+        return int(idx)
 
 
 class GaussianBiasSelector(ShootingPointSelector):
@@ -106,6 +136,10 @@ class GaussianBiasSelector(ShootingPointSelector):
         l_s = self.collectivevariable(snapshot)
         return math.exp(-self.alpha * (l_s - self.l_0) ** 2)
 
+    def _biases(self, trajectory):
+        l_s = np.array(self.collectivevariable(trajectory), dtype=float)
+        return np.exp(-self.alpha * (l_s - self.l_0) ** 2)
+
 
 class UniformSelector(ShootingPointSelector):
     """
@@ -1,6 +1,5 @@
 import random
 import logging
-import copy
 import abc
 
 import numpy as np
@@ -86,6 +85,84 @@ class SnapshotModifier(StorableNamedObject):
             full_array[i] = val
         return full_array
 
+    def subset_indices(self, n_atoms):
+        """Indices of the atoms selected by self.subset_mask
+
+        Parameters
+        ----------
+        n_atoms : int
+            number of atoms in the full array
+
+        Returns
+        -------
+        numpy.ndarray of int
+            the atom indices in the subset, all atoms if self.subset_mask
+            is None
+        """
+        if self.subset_mask is None:
+            return np.arange(n_atoms)
+        else:
+            return np.asarray(self.subset_mask, dtype=int)
+
+    @staticmethod
+    def _strip_unit(quantity):
+        """Split a (possibly unitted) array into a float array and its unit
+
+        Returns
+        -------
+        numpy.ndarray
+            a copy of the values as floats
+        unit or None
+            the unit of the input or None if it had no units
+        """
+        try:
+            unit = quantity.unit
+        except AttributeError:
+            unit = None
+        else:
+            quantity = quantity.value_in_unit(unit)
+
+        return np.array(quantity, dtype=float), unit
+
+    @staticmethod
+    def _attach_unit(values, unit, template):
+        """Inverse of :meth:`._strip_unit` using the type of `template`"""
+        if unit is None:
+            return values
+        else:
+            return type(template)(values, unit)
+
+    @staticmethod
+    def _value_in(quantity, unit):
+        """The float value of a (possibly unitted) scalar in `unit`"""
+        try:
+            if unit is None:
+                unit = quantity.unit
+            return quantity.value_in_unit(unit)
+        except AttributeError:
+            return float(quantity)
+
+    def modify_batch(self, snapshot, n_snapshots):
+        """Create several independently modified copies of a snapshot
+
+        Subclasses override this to draw all random numbers at once, which
+        is much faster than calling the modifier `n_snapshots` times, e.g.,
+        when preparing the shots of a committor simulation.
+
+        Parameters
+        ----------
+        snapshot : :class:`.Snapshot`
+            initial snapshot
+        n_snapshots : int
+            number of modified snapshots to create
+
+        Returns
+        -------
+        list of :class:`.Snapshot`
+            the modified snapshots
+        """
+        return [self(snapshot) for _ in range(n_snapshots)]
+
     @abc.abstractmethod
     def __call__(self, snapshot):
         raise NotImplementedError
@@ -124,41 +201,54 @@ class RandomVelocities(SnapshotModifier):
         self.engine = engine
 
     def __call__(self, snapshot):
+        return self.modify_batch(snapshot, 1)[0]
+
+    def modify_batch(self, snapshot, n_snapshots):
         # raises AttributeError is snapshot doesn't support velocities
-        velocities = copy.copy(snapshot.velocities)  # copy.copy for units
-        vel_subset = self.extract_subset(velocities)
+        velocities = snapshot.velocities
+        vel_values, vel_unit = self._strip_unit(velocities)
+        atoms = self.subset_indices(len(vel_values))
+        n_spatial = vel_values.shape[1]
 
         # raises AttributeError if snapshot doesn't support masses feature
         all_masses = snapshot.masses
-        masses = self.extract_subset(all_masses)
+        masses, masses_unit = self._strip_unit(all_masses)
+        masses = masses[atoms].reshape((len(atoms), -1))
 
-        n_spatial = len(vel_subset[0])
-        n_atoms = len(vel_subset)
-        for atom_i in range(n_atoms):
-            radicand = 1.0 / (self.beta * masses[atom_i])
-            try:  # preference that masses is quantity or np.array
-                sigma = radicand.sqrt()
-            except AttributeError:  # if masses regular list
-                sigma = np.sqrt(radicand)
-            vel_subset[atom_i] = sigma * np.random.normal(size=n_spatial)
+        # kB T per unit mass; the velocity variance is this over the masses
+        if masses_unit is None:
+            radicand = 1.0 / self.beta
+        else:
+            radicand = 1.0 / (self.beta * masses_unit)
+
+        vel_sq_unit = None if vel_unit is None else vel_unit ** 2
+        sigma = np.sqrt(self._value_in(radicand, vel_sq_unit) / masses)
 
-        self.apply_to_subset(velocities, vel_subset)
-        new_snap = snapshot.copy_with_replacement(velocities=velocities)
+        new_velocities = np.repeat(vel_values[np.newaxis], n_snapshots,
+                                   axis=0)
+        new_velocities[:, atoms] = sigma * np.random.normal(
+            size=(n_snapshots, len(atoms), n_spatial))
 
         # applying constraints, if they exist
-        if self.engine is None:
-            engine = new_snap.engine
-        else:
-            engine = self.engine
+        engine = self.engine
+        if engine is None:
+            engine = snapshot.engine
 
         try:
             apply_constraints = engine.apply_constraints
         except AttributeError:
-            pass  # fine if there isn't one
-        else:
-            new_snap = apply_constraints(new_snap)
+            apply_constraints = None  # fine if there isn't one
 
-        return new_snap
+        new_snaps = []
+        for vel in new_velocities:
+            new_snap = snapshot.copy_with_replacement(
+                velocities=self._attach_unit(vel, vel_unit, velocities))
+            if apply_constraints is not None:
+                new_snap = apply_constraints(new_snap)
+
+            new_snaps.append(new_snap)
+
+        return new_snaps
 
 class GeneralizedDirectionModifier(SnapshotModifier):
     """
@@ -252,9 +342,9 @@ class GeneralizedDirectionModifier(SnapshotModifier):
     def _select_atoms_to_modify(self, n_subset_atoms):
         raise NotImplementedError
 
-    def _dv_widths(self, n_atoms, n_subset_atoms):
+    def _dv_widths(self, n_atoms, n_subset_atoms, unit):
         """
-        Generate the list of velocity delta widths.
+        Generate the array of velocity delta widths.
 
         Parameters
         ----------
@@ -262,22 +352,31 @@ class GeneralizedDirectionModifier(SnapshotModifier):
             number of total atoms
         n_subset_atoms : int
             number of atoms in the subset to be (possibly) changed
+        unit : unit or None
+            the velocity unit the widths are converted to
 
         Returns
         -------
-        list, length n_subset_atoms
-            list of velocity deltas associated with each atom from the
-            subset
+        numpy.ndarray, shape (n_subset_atoms,)
+            velocity deltas associated with each atom from the subset,
+            without units
         """
         try:
-            dv_widths = list(self.delta_v)
-        except TypeError:
-            dv_widths = [self.delta_v] * n_subset_atoms
+            dv_widths, dv_unit = self._strip_unit(self.delta_v)
+        except (TypeError, ValueError):
+            # a list of quantities; convert one by one
+            dv_widths = np.array([self._value_in(dv, unit)
+                                  for dv in self.delta_v])
+        else:
+            if dv_unit is not None and unit is not None:
+                dv_widths *= dv_unit.conversion_factor_to(unit)
+
+        if dv_widths.ndim == 0:
+            return np.repeat(dv_widths, n_subset_atoms)
 
         if len(dv_widths) == n_atoms:
-            dv_widths = self.extract_subset(dv_widths)
+            dv_widths = dv_widths[self.subset_indices(n_atoms)]
 
-        # assert len(dv_widths) == n_subset_atoms
         return dv_widths
 
     @staticmethod
@@ -287,26 +386,22 @@ class GeneralizedDirectionModifier(SnapshotModifier):
 
         Parameters
         ----------
-        velocities : array-like, shape (n_atoms, n_spatial)
-            input velocities (after snapshot change)
-        masses : array-like, shape (n_atoms,)
-            masses of each atom
+        velocities : numpy.ndarray, shape (..., n_atoms, n_spatial)
+            input velocities (after snapshot change), without units; any
+            leading axes enumerate independent copies
+        masses : numpy.ndarray, shape (n_atoms,)
+            masses of each atom, without units
 
         Returns
         -------
-        array-like
-            velocities adjusted to have 0 linear momentum
+        numpy.ndarray
+            velocities adjusted to have 0 linear momentum (changed in
+            place)
         """
-        # TODO: initially, maybe see if there's an internal motion remover
-        # to do most of this? and get KE from a snapshot feature?
+        masses = np.reshape(masses, (-1, 1))
         n_atoms = len(masses)
-        inv_masses = 1.0 / masses
-        momenta = velocities * masses[:, np.newaxis] 
-        total_momenta = sum(momenta, 0*momenta[0])
-        remove_momenta = total_momenta / n_atoms
-        remove_velocities = inv_masses[:, np.newaxis] * remove_momenta
-
-        velocities -= remove_velocities
+        total_momenta = np.sum(masses * velocities, axis=-2, keepdims=True)
+        velocities -= total_momenta / n_atoms / masses
         return velocities
 
     @staticmethod
@@ -316,29 +411,25 @@ class GeneralizedDirectionModifier(SnapshotModifier):
 
         Parameters
         ----------
-        velocities : array-like, shape (n_atoms, n_spatial)
-            input velocities (after snapshot change)
-        masses : array-like, shape (n_atoms,)
-            masses of each atom
-        double_KE : float or unitted Quantity
+        velocities : numpy.ndarray, shape (..., n_atoms, n_spatial)
+            input velocities (after snapshot change), without units; any
+            leading axes enumerate independent copies
+        masses : numpy.ndarray, shape (n_atoms,)
+            masses of each atom, without units
+        double_KE : float or numpy.ndarray
             the desired kinetic energy multiplied by 2.0 (because to avoid
-            needing to multiple by 1/2 internally)
+            needing to multiple by 1/2 internally), one value per copy
 
         Returns
         -------
-        array-like
-            velocities adjusted to have the desired kinetic energy
+        numpy.ndarray
+            velocities adjusted to have the desired kinetic energy (changed
+            in place)
         """
-        # from here, we're doing the KE rescaling
-        # can't just use the dot product because of simtk.units
-        momenta = velocities * masses[:, np.newaxis]
-        dof_ke = momenta * velocities
-        zero_energy = 0 * dof_ke[0][0]
-        new_ke = sum(sum(dof_ke, zero_energy), zero_energy)
-
-        rescale_factor = np.sqrt(double_KE / new_ke)
-        velocities *= rescale_factor
-
+        masses = np.reshape(masses, (-1, 1))
+        new_double_KE = np.sum(masses * velocities ** 2, axis=(-2, -1))
+        rescale_factor = np.sqrt(np.asarray(double_KE) / new_double_KE)
+        velocities *= rescale_factor[..., np.newaxis, np.newaxis]
         return velocities
 
     def __call__(self, snapshot):
@@ -359,45 +450,57 @@ class GeneralizedDirectionModifier(SnapshotModifier):
         :class:`.Snapshot`
             modified snapshot
         """
+        return self.modify_batch(snapshot, 1)[0]
+
+    def modify_batch(self, snapshot, n_snapshots):
         self._verify_snapshot(snapshot)
-        velocities = copy.copy(snapshot.velocities)
-        vel_subset = self.extract_subset(velocities)
-
-        atoms_to_change = self._select_atoms_to_modify(len(vel_subset))
-        dv_widths = self._dv_widths(n_atoms=len(velocities),
-                                    n_subset_atoms=len(vel_subset))
-
-        # zero_with_units is a hack for using units (or not) in `sum`
-        zero_with_units = (vel_subset[0][0] - vel_subset[0][0])**2
-        for atom_i in atoms_to_change:
-            initial_sum_sq_vel = sum([v**2 for v in vel_subset[atom_i]],
-                                     zero_with_units)
-            randoms = np.random.normal(size=len(vel_subset[atom_i]))
-            delta_v = dv_widths[atom_i] * randoms
-            vel_subset[atom_i] += delta_v
-            final_sum_sq_vel = sum([v**2 for v in vel_subset[atom_i]],
-                                   zero_with_units)
-            rescale_factor = np.sqrt(initial_sum_sq_vel / final_sum_sq_vel)
-            vel_subset[atom_i] *= rescale_factor
-
-        self.apply_to_subset(velocities, vel_subset)
+        velocities = snapshot.velocities
+        vel_values, vel_unit = self._strip_unit(velocities)
+        n_atoms = len(vel_values)
+        atoms = self.subset_indices(n_atoms)
+        dv_widths = self._dv_widths(n_atoms=n_atoms,
+                                          n_subset_atoms=len(atoms),
+                                          unit=vel_unit)
+
+        # width of the change for each copy and atom; zero if the atom is
+        # not selected to be changed in that copy
+        widths = np.zeros((n_snapshots, n_atoms))
+        for copy_i in range(n_snapshots):
+            to_change = self._select_atoms_to_modify(len(atoms))
+            widths[copy_i, atoms[to_change]] = dv_widths[to_change]
+
+        new_velocities = np.repeat(vel_values[np.newaxis], n_snapshots,
+                                   axis=0)
+        initial_sum_sq_vel = np.sum(new_velocities ** 2, axis=2)
+        new_velocities += widths[:, :, np.newaxis] * np.random.normal(
+            size=new_velocities.shape)
+        final_sum_sq_vel = np.sum(new_velocities ** 2, axis=2)
+
+        # keep the speed of each changed atom
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rescale_factor = np.where(
+                widths != 0.0,
+                np.sqrt(initial_sum_sq_vel / final_sum_sq_vel),
+                1.0
+            )
+        new_velocities *= rescale_factor[:, :, np.newaxis]
 
         # calculate the total KE so we can preserve it
-        masses = snapshot.masses
-        momenta = velocities * masses[:, np.newaxis]
-        dof_double_KE = momenta * velocities
-        zero_energy = 0 * dof_double_KE[0][0]
-        double_KE = sum(sum(dof_double_KE, zero_energy), zero_energy)
+        masses, _ = self._strip_unit(snapshot.masses)
+        double_KE = np.sum(masses.reshape((n_atoms, -1))
+                           * new_velocities ** 2, axis=(1, 2))
 
         if self.remove_linear_momentum:
-            velocities = self._remove_linear_momentum(velocities, masses)
-
-        self._rescale_kinetic_energy(velocities, masses, double_KE)
+            self._remove_linear_momentum(new_velocities, masses)
 
-        new_snap = snapshot.copy_with_replacement(velocities=velocities)
+        self._rescale_kinetic_energy(new_velocities, masses, double_KE)
 
         # NOTE: no constraint correction here! constraints are not allowed!
-        return new_snap
+        return [
+            snapshot.copy_with_replacement(
+                velocities=self._attach_unit(vel, vel_unit, velocities))
+            for vel in new_velocities
+        ]
 
 class VelocityDirectionModifier(GeneralizedDirectionModifier):
     """
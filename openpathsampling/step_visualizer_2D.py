@@ -1,6 +1,3 @@
-import matplotlib
-import matplotlib.pyplot as plt
-
 import openpathsampling as paths
 
 class StepVisualizer2D(object):
@@ -86,6 +83,7 @@ class StepVisualizer2D(object):
             self.ax = self.fig.axes[0].twinx()
             self.ax.cla()
         else:
+            import matplotlib.pyplot as plt
             self.fig, self.ax = plt.subplots()
 
         self.ax.set_xlim(self.xlim)
@@ -108,6 +106,7 @@ class StepVisualizer2D(object):
             IPython.display.clear_output(wait=True)
             fig = self.draw(mcstep)
             IPython.display.display(fig);
+            import matplotlib.pyplot as plt
             plt.close() # prevents crap in the output
 
     def draw_png(self, mcstep):
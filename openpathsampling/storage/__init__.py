@@ -3,8 +3,9 @@ from .distributed import DistributedUUIDStorage, TrajectoryStorage
 from .stores import (
     MCStepStore, MoveChangeStore, SampleSetStore,
     SampleStore, TrajectoryStore, CVStore, PathSimulatorStore,
-    SnapshotWrapperStore)
+    SnapshotWrapperStore, DetailsStore)
 
 from .storage import Storage, AnalysisStorage
 
-from .util import join_md_storage, split_md_storage
+from .util import join_md_storage, split_md_storage, merge_storages, \
+    rechunk_storage
@@ -8,7 +8,7 @@ import logging
 import time
 
 import openpathsampling as paths
-from openpathsampling.netcdfplus import NetCDFPlus, WeakLRUCache, ObjectStore, \
+from openpathsampling.netcdfplus import NetCDFPlus, WeakLRUCache, \
     ImmutableDictStore, NamedObjectStore, PseudoAttributeStore
 
 from .stores import SnapshotWrapperStore
@@ -41,7 +41,10 @@ class Storage(NetCDFPlus):
             filename,
             mode=None,
             template=None,
-            fallback=None):
+            fallback=None,
+            precision=None,
+            exact_shooting_points=False,
+            store_options=None):
         """
         Create a netCDF+ storage for OPS Objects
 
@@ -55,13 +58,34 @@ class Storage(NetCDFPlus):
         template : :class:`openpathsampling.Snapshot`
             a Snapshot instance that contains a reference to a Topology, the
             number of atoms and used units
+        precision : dict of str: int or None
+            only used when creating a file. The number of decimal digits
+            to keep per snapshot feature, e.g. `{'coordinates': 3,
+            'velocities': 3}`. These features are stored quantized and
+            compressed, which is lossy but makes files a lot smaller.
+            Default is `None` which stores snapshots exactly.
+        exact_shooting_points : bool
+            only used when creating a file. If `True` shooting snapshots
+            are also stored exactly when using `precision`.
+        store_options : str or dict or None
+            the chunking and compression of the stores, e.g. `'append'`
+            for a simulation or `{'snapshot*': 'append', 'cv*':
+            'analysis'}` for snapshots that are appended and CV values
+            that are read as a whole. The features of snapshots are stored
+            in the stores `snapshot0`, `snapshot1`, ... and the values of
+            CVs in the stores `cv0`, `cv1`, ... See
+            :class:`openpathsampling.netcdfplus.NetCDFPlus` for the
+            options.
         """
 
         self._template = template
+        self._precision = precision
+        self._exact_shooting_points = exact_shooting_points
         super(Storage, self).__init__(
             filename,
             mode,
-            fallback=fallback)
+            fallback=fallback,
+            store_options=store_options)
 
     def _create_simplifier(self):
         super(Storage, self)._create_simplifier()
@@ -79,7 +103,9 @@ class Storage(NetCDFPlus):
         # topologies might be needed fot CVs so put them here
         self.create_store('topologies', NamedObjectStore(peng.Topology))
 
-        snapshotstore = SnapshotWrapperStore()
+        snapshotstore = SnapshotWrapperStore(
+            precision=self._precision,
+            exact_shooting_points=self._exact_shooting_points)
         self.create_store('snapshots', snapshotstore)
 
         self.create_store('samples', paths.storage.SampleStore())
@@ -89,7 +115,7 @@ class Storage(NetCDFPlus):
         self.create_store('steps', paths.storage.MCStepStore())
 
         # normal objects
-        self.create_store('details', ObjectStore(paths.Details))
+        self.create_store('details', paths.storage.DetailsStore())
         self.create_store('pathmovers', NamedObjectStore(paths.PathMover))
         self.create_store('shootingpointselectors',
                           NamedObjectStore(paths.ShootingPointSelector))
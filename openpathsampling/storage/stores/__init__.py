@@ -1,4 +1,5 @@
 from .collectivevariable import CVStore
+from .details import DetailsStore
 from .mcstep import MCStepStore
 from .movechange import MoveChangeStore
 from .sample import SampleSetStore, SampleStore
@@ -0,0 +1,183 @@
+import numpy as np
+
+from openpathsampling.pathmover import Details
+from openpathsampling.netcdfplus import StorableObject, ObjectStore
+
+from six import string_types
+
+
+class DetailsStore(ObjectStore):
+    """
+    ObjectStore for :class:`openpathsampling.Details` using typed variables
+
+    The keys that (almost) every MC step writes, like the shooting snapshot,
+    the initial trajectory or the metropolis acceptance, are stored in
+    typed netCDF variables instead of being serialized into JSON. All other
+    keys are still saved as a JSON dict in the `json` variable. A bit mask in
+    `keys` remembers which typed keys were set for each object.
+
+    Parameters
+    ----------
+    typed_keys : list of tuple(str, str)
+        pairs of `(key, var_type)` that should get their own variable. The
+        order is stored with the store, so an existing file keeps using the
+        layout it was created with.
+
+    """
+
+    # the timing of steps is stored with the steps (`MCStep.timing`); files
+    # that had a typed `timing` key for details keep it in their layout
+    default_typed_keys = [
+        ('initial_trajectory', 'obj.trajectories'),
+        ('shooting_snapshot', 'obj.snapshots'),
+        ('modified_shooting_snapshot', 'obj.snapshots'),
+        ('stopping_reason', 'str'),
+        ('rejection_reason', 'str'),
+        ('metropolis_acceptance', 'numpy.float64'),
+        ('metropolis_random', 'numpy.float64'),
+        ('bias', 'numpy.float64'),
+        ('step', 'int'),
+        ('initial_ensemble', 'obj.ensembles'),
+        ('trial_ensemble', 'obj.ensembles'),
+        ('choice', 'int'),
+        ('chosen_mover', 'obj.pathmovers'),
+        ('probability', 'numpy.float64')
+    ]
+
+    def __init__(self, typed_keys=None):
+        super(DetailsStore, self).__init__(
+            Details,
+            json=False
+        )
+
+        if typed_keys is None:
+            typed_keys = self.default_typed_keys
+
+        self.typed_keys = [tuple(key) for key in typed_keys]
+        self._cached_all = False
+        self.class_list = StorableObject.objects()
+
+    def to_dict(self):
+        return {
+            'typed_keys': self.typed_keys
+        }
+
+    def _store_for(self, var_type):
+        return self.storage._stores[var_type.split('.')[1]]
+
+    def _is_typed(self, var_type, value):
+        """
+        Check if a value can be stored in a typed variable of `var_type`
+        """
+        if var_type.startswith('obj.'):
+            return isinstance(value, self._store_for(var_type).content_class)
+        elif var_type == 'str':
+            return isinstance(value, string_types)
+        elif var_type == 'int':
+            return isinstance(value, (int, np.integer)) and \
+                not isinstance(value, (bool, np.bool_)) and \
+                -2 ** 31 <= value < 2 ** 31
+        elif var_type == 'numpy.float64':
+            return isinstance(value, (float, np.floating))
+
+        return False
+
+    @staticmethod
+    def _empty_value(var_type):
+        if var_type == 'str':
+            return ''
+        elif var_type == 'int':
+            return 0
+        elif var_type == 'numpy.float64':
+            return np.nan
+        else:
+            return None
+
+    def _save(self, details, idx):
+        extra = dict(details.to_dict())
+        mask = 0
+
+        snapshots = self.storage._stores.get('snapshots')
+        exact = getattr(snapshots, 'exact_shooting_points', False)
+
+        for bit, (key, var_type) in enumerate(self.typed_keys):
+            value = extra.get(key)
+            if key in extra and self._is_typed(var_type, value):
+                del extra[key]
+                mask |= 1 << bit
+                if exact and var_type == 'obj.snapshots':
+                    # shooting snapshots are kept exactly
+                    snapshots.save_exact(value)
+            else:
+                value = self._empty_value(var_type)
+
+            self.vars[key][idx] = value
+
+        self.vars['keys'][idx] = mask
+        self.vars['cls'][idx] = details.__class__.__name__
+        self.vars['json'][idx] = extra
+
+    def _load(self, idx):
+        return self._build(
+            self.vars['cls'][idx],
+            int(self.vars['keys'][idx]),
+            [self.vars[key][idx] for key, _ in self.typed_keys],
+            self.vars['json'][idx]
+        )
+
+    def _build(self, cls_name, mask, values, extra):
+        cls = self.class_list[cls_name]
+        obj = cls.__new__(cls)
+        Details.__init__(obj)
+
+        for bit, ((key, var_type), value) in enumerate(
+                zip(self.typed_keys, values)):
+            if mask & (1 << bit):
+                if var_type == 'str':
+                    value = str(value)
+                setattr(obj, key, value)
+
+        for key, value in extra.items():
+            setattr(obj, key, value)
+
+        return obj
+
+    def initialize(self):
+        super(DetailsStore, self).initialize()
+
+        self.create_variable('cls', 'str')
+        self.create_variable(
+            'keys', 'long',
+            description='bit mask of the typed keys set for each object')
+
+        self.create_variable(
+            'json', 'json',
+            description='A json serialized dict of all untyped keys',
+            chunksizes=(65536,))
+
+        for key, var_type in self.typed_keys:
+            self.create_variable(key, var_type)
+
+    def cache_all(self):
+        """Load all details as fast as possible into the cache
+
+        """
+        if not self._cached_all:
+            n_objects = len(self)
+            cls_names = self.variables['cls'][:]
+            masks = self.variables['keys'][:]
+            jsons = self.variables['json'][:]
+            columns = [self.vars[key][:] for key, _ in self.typed_keys]
+
+            for pos in range(n_objects):
+                if pos not in self.cache:
+                    obj = self._build(
+                        cls_names[pos],
+                        int(masks[pos]),
+                        [column[pos] for column in columns],
+                        self.simplifier.from_json(jsons[pos])
+                    )
+                    self._get_id(pos, obj)
+                    self.cache[pos] = obj
+
+            self._cached_all = True
@@ -1,14 +1,63 @@
+import numpy as np
+
 from openpathsampling.netcdfplus import VariableStore
 from openpathsampling.pathsimulator import MCStep
+from openpathsampling.timing import StepTiming
 
 
 class MCStepStore(VariableStore):
     def __init__(self):
         super(MCStepStore, self).__init__(
             MCStep,
-            ['simulation', 'mccycle', 'previous', 'active', 'change']
+            ['simulation', 'mccycle', 'previous', 'active', 'change',
+             'timing']
         )
 
+    def restore(self):
+        super(MCStepStore, self).restore()
+
+        # files written before steps stored their timing have no such
+        # column. `timing` is the last argument of MCStep, so steps are
+        # loaded with `timing=None` without it
+        if 'timing' in self.var_names and \
+                self.prefix + '_timing' not in self.storage.variables:
+            self.var_names = [var for var in self.var_names
+                              if var != 'timing']
+
+    def update_timing(self, step):
+        """
+        Overwrite the stored timing of a step with `step.timing`
+
+        Parameters
+        ----------
+        step : :class:`openpathsampling.MCStep`
+            the (already stored) step
+        """
+        if 'timing' in self.var_names:
+            self.vars['timing'][self.idx(step)] = step.timing
+
+    def timing(self):
+        """
+        The timing of all stored steps as numeric columns
+
+        Returns
+        -------
+        dict of str: numpy.ndarray
+            the times in seconds per category (see
+            :class:`openpathsampling.timing.StepTiming`) for all steps in
+            order of storage. Steps that were not timed, or files written
+            before timing was stored, give `nan`.
+        """
+        if 'timing' in self.var_names and len(self) > 0:
+            values = np.ma.filled(
+                np.ma.asarray(self.variables['timing'][:], dtype=np.float64),
+                np.nan)
+        else:
+            values = np.full((len(self), len(StepTiming.categories)), np.nan)
+
+        return {category: values[:, column]
+                for column, category in enumerate(StepTiming.categories)}
+
     def initialize(self, units=None):
         super(MCStepStore, self).initialize()
 
@@ -18,3 +67,8 @@ class MCStepStore(VariableStore):
         self.create_variable('previous', 'obj.samplesets')
         self.create_variable('simulation', 'obj.pathsimulators')
         self.create_variable('mccycle', 'int')
+        self.create_variable(
+            'timing', 'numpy.float32',
+            dimensions=(len(StepTiming.categories),),
+            description="time in seconds spent in the parts of step "
+                        "'{ix[0]}', see `StepTiming.categories`")
@@ -3,7 +3,7 @@ import logging
 from uuid import UUID
 
 import openpathsampling.engines as peng
-from openpathsampling.netcdfplus import IndexedObjectStore
+from openpathsampling.netcdfplus import IndexedObjectStore, tracing
 
 logger = logging.getLogger(__name__)
 init_log = logging.getLogger('openpathsampling.initialization')
@@ -79,6 +79,7 @@ class BaseSnapshotStore(IndexedObjectStore):
             'descriptor': self.descriptor,
         }
 
+    @tracing.traced
     def load(self, idx):
         pos = idx // 2
 
@@ -121,6 +122,7 @@ class BaseSnapshotStore(IndexedObjectStore):
         self._get(st_idx, obj)
         return obj
 
+    @tracing.traced
     def save(self, obj, idx=None):
         pos = idx // 2
 
@@ -135,7 +137,8 @@ class BaseSnapshotStore(IndexedObjectStore):
 
         # make sure in nested saving that an IDX is not used twice!
 
-        logger.debug('Saving ' + str(type(obj)) + ' using IDX #' + str(n_idx))
+        if self._log_debug:
+            logger.debug('Saving %s using IDX #%d' % (type(obj), n_idx))
 
         try:
             self._save(obj, n_idx)
@@ -145,7 +148,7 @@ class BaseSnapshotStore(IndexedObjectStore):
             self.cache[n_idx] = obj
 
         except:
-            logger.debug('Problem saving %d !' % n_idx)
+            logger.debug('Problem saving %d !', n_idx)
             # in case we did not succeed remove the mark as being saved
             del self.index[pos]
             raise
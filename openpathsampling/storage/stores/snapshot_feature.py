@@ -9,10 +9,33 @@ init_log = logging.getLogger('openpathsampling.initialization')
 class FeatureSnapshotStore(BaseSnapshotStore):
     """
     An ObjectStore for Snapshots in netCDF files.
+
+    Parameters
+    ----------
+    descriptor : :class:`openpathsampling.engines.SnapshotDescriptor`
+        a descriptor knowing the snapshot class and a dictionary of
+        dimensions and their lengths.
+    precision : dict of str: int or None
+        the number of decimal digits to keep per feature variable, e.g.
+        `{'coordinates': 3, 'velocities': 3}`. These variables are stored
+        quantized and compressed, which is lossy. Variables that are not
+        listed are stored exactly. Default is `None` which stores all
+        variables exactly.
     """
 
-    def __init__(self, descriptor):
+    def __init__(self, descriptor, precision=None):
         super(FeatureSnapshotStore, self).__init__(descriptor)
+        self.precision = precision
+
+    def to_dict(self):
+        dct = super(FeatureSnapshotStore, self).to_dict()
+        dct['precision'] = self.precision
+        return dct
+
+    @property
+    def exact(self):
+        """bool : if all variables are stored without loss"""
+        return not self.precision
 
     @property
     def classes(self):
@@ -29,6 +52,14 @@ class FeatureSnapshotStore(BaseSnapshotStore):
         [setattr(snapshot, attr, self.vars[attr][idx])
          for attr in self.storables]
 
+    def create_variable(self, var_name, *args, **kwargs):
+        if self.precision and var_name in self.precision:
+            kwargs.setdefault('least_significant_digit',
+                              self.precision[var_name])
+
+        super(FeatureSnapshotStore, self).create_variable(
+            var_name, *args, **kwargs)
+
     def initialize(self):
         super(FeatureSnapshotStore, self).initialize()
 
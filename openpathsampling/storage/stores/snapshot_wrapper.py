@@ -3,7 +3,7 @@ from uuid import UUID
 
 import openpathsampling.engines as peng
 from openpathsampling.netcdfplus import ObjectStore, \
-    NetCDFPlus, LoaderProxy
+    NetCDFPlus, LoaderProxy, tracing
 
 from .snapshot_feature import FeatureSnapshotStore
 from .snapshot_value import SnapshotValueStore
@@ -81,14 +81,32 @@ class ReversalHashedList(dict):
 class SnapshotWrapperStore(ObjectStore):
     """
     A Store to store arbitrary snapshots
+
+    Parameters
+    ----------
+    precision : dict of str: int or None
+        the number of decimal digits to keep per feature variable (e.g.
+        `coordinates`) in the stores of new snapshot types. See
+        :class:`FeatureSnapshotStore`. Default is `None` which stores
+        snapshots exactly.
+    exact_shooting_points : bool
+        if `True` and snapshots are stored with a reduced precision, the
+        shooting snapshots in the details of stored moves are stored again
+        exactly (see :meth:`save_exact`), so shooting from them can be
+        reproduced.
     """
-    def __init__(self):
+    def __init__(self, precision=None, exact_shooting_points=False):
         super(SnapshotWrapperStore, self).__init__(
             peng.BaseSnapshot,
             json=False
         )
 
+        self.precision = precision
+        self.exact_shooting_points = exact_shooting_points
+
         self.type_list = {}
+        # exact stores for snapshot types stored with reduced precision
+        self.exact_type_list = {}
         self.store_snapshot_list = []
         self._store = {}
 
@@ -102,6 +120,12 @@ class SnapshotWrapperStore(ObjectStore):
         # so CVs will be storable
         self.only_mention = False
 
+    def to_dict(self):
+        return {
+            'precision': self.precision,
+            'exact_shooting_points': self.exact_shooting_points
+        }
+
     @property
     def treat_missing_snapshot_type(self):
         return self._treat_missing_snapshot_type
@@ -114,6 +138,7 @@ class SnapshotWrapperStore(ObjectStore):
 
         self._treat_missing_snapshot_type = value
 
+    @tracing.traced
     def load(self, idx):
         """
         Returns an object from the storage.
@@ -158,21 +183,25 @@ class SnapshotWrapperStore(ObjectStore):
         # if it is in the cache, return it
         try:
             obj = self.cache[n_idx]
-            logger.debug('Found IDX #' + str(idx) + ' in cache. Not loading!')
+            if self._log_debug:
+                logger.debug(
+                    'Found IDX #%s in cache. Not loading!' % idx)
             return obj
 
         except KeyError:
             try:
                 obj = self.cache[n_idx ^ 1].reversed
-                logger.debug('Found IDX #' + str(idx) +
-                             ' reversed in cache. Not loading!')
+                if self._log_debug:
+                    logger.debug(
+                        'Found IDX #%s reversed in cache. Not loading!' % idx)
                 return obj
             except KeyError:
                 pass
 
-        logger.debug(
-            'Calling load object of type ' + self.content_class.__name__ +
-            ' and IDX #' + str(idx))
+        if self._log_debug:
+            logger.debug(
+                'Calling load object of type %s and IDX #%s' %
+                (self.content_class.__name__, idx))
 
         if n_idx >= len(self):
             logger.warning(
@@ -189,23 +218,26 @@ class SnapshotWrapperStore(ObjectStore):
         else:
             obj = self._load(n_idx)
 
-        logger.debug(
-            'Calling load object of type %s and IDX # %d ... DONE' %
-            (self.content_class.__name__, n_idx))
+        if self._log_debug:
+            logger.debug(
+                'Calling load object of type %s and IDX # %d ... DONE' %
+                (self.content_class.__name__, n_idx))
 
         if obj is not None:
             self._get_id(n_idx, obj)
             # self.index[obj.__uuid__] = n_idx
             self.cache[n_idx] = obj
 
+            if self._log_debug:
+                logger.debug(
+                    'Try loading UUID object of type %s and IDX # %d ... DONE'
+                    % (self.content_class.__name__, n_idx))
+
+        if self._log_debug:
             logger.debug(
-                'Try loading UUID object of type %s and IDX # %d ... DONE' %
+                'Finished load object of type %s and IDX # %d ... DONE' %
                 (self.content_class.__name__, n_idx))
 
-        logger.debug(
-            'Finished load object of type %s and IDX # %d ... DONE' %
-            (self.content_class.__name__, n_idx))
-
         return obj
 
     def _load(self, idx):
@@ -246,17 +278,43 @@ class SnapshotWrapperStore(ObjectStore):
 
         return idx
 
-    def add_type(self, descriptor):
+    def add_type(self, descriptor, exact=False):
+        """
+        Add a store for a type of snapshots
+
+        Parameters
+        ----------
+        descriptor : :class:`openpathsampling.engines.SnapshotDescriptor`
+            the descriptor of the snapshot type or a template snapshot
+            which is also saved
+        exact : bool
+            if `True` add the store for exact copies of a type that is
+            stored with reduced precision (see :meth:`save_exact`)
+
+        Returns
+        -------
+        :class:`FeatureSnapshotStore`
+            the store for the snapshot type
+        int
+            the index of the store
+        """
         if isinstance(descriptor, peng.BaseSnapshot):
             template = descriptor
             descriptor = descriptor.engine.descriptor
         else:
             template = None
 
-        if descriptor in self.type_list:
-            return self.type_list[descriptor]
+        if exact:
+            type_list = self.exact_type_list
+            precision = None
+        else:
+            type_list = self.type_list
+            precision = self.precision
+
+        if descriptor in type_list:
+            return type_list[descriptor]
 
-        store = FeatureSnapshotStore(descriptor)
+        store = FeatureSnapshotStore(descriptor, precision=precision)
 
         store_idx = int(len(self.storage.dimensions['snapshottype']))
         store_name = 'snapshot' + str(store_idx)
@@ -268,7 +326,7 @@ class SnapshotWrapperStore(ObjectStore):
         store.name = store_name
         self.storage.stores.save(store)
 
-        self.type_list[descriptor] = (store, store_idx)
+        type_list[descriptor] = (store, store_idx)
         self.store_snapshot_list.append(store)
         self.storage.vars['snapshottype'][store_idx] = store
 
@@ -296,7 +354,10 @@ class SnapshotWrapperStore(ObjectStore):
         super(SnapshotWrapperStore, self).restore()
 
         for idx, store in enumerate(self.storage.vars['snapshottype']):
-            self.type_list[store.descriptor] = (store, idx)
+            if store.descriptor in self.type_list and store.exact:
+                self.exact_type_list[store.descriptor] = (store, idx)
+            else:
+                self.type_list[store.descriptor] = (store, idx)
             self.store_snapshot_list.append(store)
 
     def mention(self, snapshot):
@@ -320,6 +381,7 @@ class SnapshotWrapperStore(ObjectStore):
         self.only_mention = current_mention
         return ref
 
+    @tracing.traced
     def save(self, obj, idx=None):
         n_idx = self.index.get(obj.__uuid__)
 
@@ -379,6 +441,62 @@ class SnapshotWrapperStore(ObjectStore):
 
         return self.reference(obj)
 
+    def save_exact(self, obj):
+        """
+        Store a snapshot without loss of precision
+
+        If the type of the snapshot is stored with reduced precision, the
+        snapshot is saved to a separate exact store and loaded from there.
+        A snapshot that has already been stored with reduced precision is
+        stored again. Otherwise this is the same as :meth:`save`.
+
+        Parameters
+        ----------
+        obj : :class:`openpathsampling.engines.BaseSnapshot`
+            the snapshot to be stored exactly
+
+        Returns
+        -------
+        int or `UUID`
+            the reference to the stored snapshot
+        """
+        if isinstance(obj, LoaderProxy):
+            obj = obj.__subject__
+
+        descriptor = obj.engine.descriptor
+        if descriptor not in self.type_list:
+            self.save(obj)
+            if descriptor not in self.type_list:
+                # the type is ignored
+                return self.reference(obj)
+
+        store, store_idx = self.type_list[descriptor]
+        if store.exact:
+            return self.save(obj)
+
+        n_idx = self.index.get(obj.__uuid__)
+        if n_idx is not None and n_idx & 1:
+            # the reversed snapshot is the stored one
+            obj = obj.reversed
+            n_idx ^= 1
+
+        exact_store, exact_idx = self.add_type(descriptor, exact=True)
+
+        if n_idx is None:
+            n_idx = len(self.index)
+            self.index.append(obj.__uuid__)
+            self.vars['store'][n_idx // 2] = exact_idx
+            exact_store[n_idx] = obj
+            self._auto_complete_single_snapshot(obj, n_idx)
+            self._set_id(n_idx, obj)
+        elif int(self.variables['store'][n_idx // 2]) != exact_idx:
+            exact_store[n_idx] = obj
+            self.vars['store'][n_idx // 2] = exact_idx
+
+        self.cache[n_idx] = obj
+
+        return self.reference(obj)
+
     def _save(self, obj, n_idx):
         try:
             store, store_idx = self.type_list[obj.engine.descriptor]
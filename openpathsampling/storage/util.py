@@ -1,4 +1,13 @@
+import netCDF4
+import numpy as np
+
 import openpathsampling as paths
+from openpathsampling.netcdfplus import (
+    NetCDFPlus, IndexedObjectStore, ValueStore, DictStore,
+    PseudoAttributeStore)
+
+from .stores import SnapshotWrapperStore
+from .stores.snapshot_feature import FeatureSnapshotStore
 
 
 def split_md_storage(filename):
@@ -93,3 +102,360 @@ def join_md_storage(filename_main, filename_data=None):
     st_traj.close()
     st_main.close()
     st_to.close()
+
+
+def _store_layout(store):
+    """
+    The variables of a store in a storage file
+
+    Returns
+    -------
+    dict of str: tuple
+        the var_type and the shape (without the object dimension) per
+        variable name (without the store prefix)
+    """
+    storage = store.storage
+    prefix = store.prefix + '_'
+    layout = {}
+    for name, variable in storage.variables.items():
+        dimensions = variable.dimensions
+        if dimensions and dimensions[0] == store.prefix and \
+                name.startswith(prefix):
+            layout[name[len(prefix):]] = (
+                getattr(variable, 'var_type', None),
+                tuple(len(storage.dimensions[dim])
+                      for dim in dimensions[1:]))
+
+    return layout
+
+
+def _copy_rows(source_store, target_store, rows, chunksize):
+    """
+    Copy rows of all variables of a store to the end of another store
+
+    All references in OPS storages are saved as UUIDs, so rows can be
+    copied without changing them.
+    """
+    source = source_store.storage
+    target = target_store.storage
+    names = [source_store.prefix + '_' + name
+             for name in _store_layout(source_store)]
+    uuids = source_store.index.list
+
+    for start in range(0, len(rows), chunksize):
+        chunk = rows[start:start + chunksize]
+        n_idx = len(target_store.index)
+        for name in names:
+            target_name = target_store.prefix + name[len(source_store.prefix):]
+            target.variables[target_name][n_idx:n_idx + len(chunk)] = \
+                source.variables[name][chunk]
+
+        target_store.index.extend([uuids[row] for row in chunk])
+
+        if hasattr(target_store, '_update_name_in_cache'):
+            names_in_chunk = source.variables[
+                source_store.prefix + '_name'][chunk]
+            for idx, name in enumerate(names_in_chunk):
+                target_store._update_name_in_cache(name, n_idx + idx)
+
+
+def _can_copy_rows(source_store, target_store):
+    # stores that only hold UUID references and no attached value stores
+    # can be copied row by row if both files use the same layout
+    if type(source_store) is not type(target_store):
+        return False
+
+    if isinstance(source_store, (
+            IndexedObjectStore, ValueStore, DictStore, PseudoAttributeStore,
+            SnapshotWrapperStore)):
+        return False
+
+    if type(source_store.index) is not type(target_store.index):
+        return False
+
+    if source_store.attribute_list or target_store.attribute_list:
+        return False
+
+    return source_store.to_dict() == target_store.to_dict() and \
+        _store_layout(source_store) == _store_layout(target_store)
+
+
+def _copy_cv_values(source, target, cvs, snapshots):
+    # copy the stored values of CVs for snapshots from source to target
+    target_snapshots = target.snapshots
+    for cv in cvs:
+        source_values = source.snapshots.attribute_list.get(cv)
+        target_values = target_snapshots.attribute_list.get(cv)
+        if source_values is None or target_values is None:
+            continue
+
+        for snapshot in snapshots:
+            value = source_values.get(snapshot)
+            if value is None:
+                continue
+
+            if target_values.allow_incomplete:
+                target_values[snapshot] = value
+            else:
+                pos = target_snapshots.pos(snapshot)
+                if target_values.time_reversible:
+                    pos //= 2
+
+                target_values.vars['value'][pos] = value
+                target_values.cache[pos] = value
+
+
+def merge_storages(target, sources, chunksize=4096):
+    """
+    Copy all objects from several storages into one storage
+
+    Objects are identified by their UUIDs, so objects that exist in more
+    than one file (like the network, the ensembles and the initial
+    conditions of independent runs) are only stored once. A snapshot and
+    its reversed copy count as the same object.
+
+    Stores with the same layout in both files (like trajectories, samples
+    or steps) are copied in chunks of rows without creating the objects.
+    Snapshots, CVs and all other objects are loaded and saved. Stored values
+    of CVs are copied without evaluating the CVs. Tags are not merged.
+
+    Parameters
+    ----------
+    target : :class:`openpathsampling.Storage`
+        the storage to copy to. Needs to be open for writing
+    sources : list of :class:`openpathsampling.Storage`
+        the storages to copy from
+    chunksize : int
+        the number of objects to copy at once
+
+    Returns
+    -------
+    dict of str: int
+        the number of copied objects per store name
+    """
+    if isinstance(sources, NetCDFPlus):
+        sources = [sources]
+
+    special = ['stores', 'snapshots', 'attributes', 'tag']
+    copied = {}
+
+    for source in sources:
+        for source_store in source.stores:
+            name = source_store.name
+            target_store = target._stores.get(name)
+            if name in special or target_store is None:
+                continue
+
+            if target_store.index is None or isinstance(
+                    source_store, (ValueStore, FeatureSnapshotStore)):
+                continue
+
+            missing = [row for row, uuid in enumerate(source_store.index.list)
+                       if uuid not in target_store.index]
+
+            if _can_copy_rows(source_store, target_store):
+                _copy_rows(source_store, target_store, missing, chunksize)
+            else:
+                for row in missing:
+                    uuid = source_store.index.list[row]
+                    if uuid not in target_store.index:
+                        target_store.save(source_store.load(uuid))
+
+            copied[name] = copied.get(name, 0) + len(missing)
+
+        # CVs can only get a disk cache in a storage that has snapshots or
+        # if they have a template, otherwise they are saved after the first
+        # snapshots are copied
+        target_snapshots = target.snapshots
+        deferred = []
+        for cv in source.cvs:
+            if cv.__uuid__ in target.cvs.index:
+                continue
+
+            if not cv.diskcache_enabled or len(target_snapshots) > 0 or \
+                    cv.diskcache_template is not None:
+                target.cvs.save(cv)
+            else:
+                deferred.append(cv)
+
+            copied['attributes'] = copied.get('attributes', 0) + 1
+
+        # snapshots; mentioned ones are not stored in the source itself
+        source_snapshots = source.snapshots
+        stored = source_snapshots.variables['store'][:]
+        missing = [
+            uuid for uuid, store_idx in zip(
+                source_snapshots.index.list, stored)
+            if store_idx >= 0 and uuid not in target_snapshots.index]
+
+        treat_missing = target_snapshots.treat_missing_snapshot_type
+        target_snapshots.treat_missing_snapshot_type = 'create'
+        try:
+            for start in range(0, len(missing), chunksize):
+                snapshots = [source_snapshots.load(uuid)
+                             for uuid in missing[start:start + chunksize]]
+
+                # the stored values are put into the memory caches of the
+                # CVs, so they are not computed again when saving
+                target_cvs = dict(
+                    (cv.__uuid__, cv) for cv in
+                    list(target_snapshots.attribute_list) + deferred)
+                for cv, source_values in \
+                        source_snapshots.attribute_list.items():
+                    target_cv = target_cvs.get(cv.__uuid__)
+                    if target_cv is None:
+                        continue
+
+                    for snapshot in snapshots:
+                        value = source_values.get(snapshot)
+                        if value is not None:
+                            target_cv._cache_dict.cache[snapshot] = value
+
+                for snapshot in snapshots:
+                    target_snapshots.save(snapshot)
+
+                for cv in deferred:
+                    target.cvs.save(cv)
+
+                deferred = []
+
+                # incomplete value stores are not filled when saving
+                _copy_cv_values(
+                    source, target, source_snapshots.attribute_list,
+                    snapshots)
+        finally:
+            target_snapshots.treat_missing_snapshot_type = treat_missing
+
+        for cv in deferred:
+            # no snapshots to determine the value type
+            cv.diskcache_enabled = False
+            target.cvs.save(cv)
+            cv.diskcache_enabled = True
+
+        copied['snapshots'] = copied.get('snapshots', 0) + len(missing)
+
+    return copied
+
+
+def rechunk_storage(filename, target_filename, store_options=None,
+                    buffer_bytes=2 ** 26):
+    """
+    Copy a storage file using different chunking and compression
+
+    The chunking and compression of a file are fixed when the variables
+    are created. This copies all dimensions, attributes and variables of
+    the file and creates the variables in the new file with the chunking
+    and compression given by `store_options`. Variables that no option
+    applies to keep their chunking and compression. The data is copied
+    as it is, without loading any objects.
+
+    A typical use is to store a simulation with `store_options='append'`
+    and to export the finished file for analysis with
+    `store_options='analysis'`.
+
+    Parameters
+    ----------
+    filename : str
+        the storage file to copy. Should not be open for writing
+    target_filename : str
+        the file to create; an existing file is replaced
+    store_options : str or dict or None
+        the chunking and compression of the stores in the new file, see
+        :class:`openpathsampling.netcdfplus.NetCDFPlus`
+    buffer_bytes : int
+        the approximate number of bytes to copy at once
+    """
+    store_options = NetCDFPlus._check_store_options(store_options)
+
+    source = netCDF4.Dataset(filename, 'r')
+    target = netCDF4.Dataset(target_filename, 'w',
+                             format=source.data_model)
+    try:
+        source.set_auto_maskandscale(False)
+        target.setncatts(
+            dict((name, source.getncattr(name))
+                 for name in source.ncattrs()))
+
+        for name, dimension in source.dimensions.items():
+            target.createDimension(
+                name, None if dimension.isunlimited() else len(dimension))
+
+        vltypes = {}
+        for name, vltype in source.vltypes.items():
+            vltypes[name] = target.createVLType(vltype.dtype, name)
+
+        for name, variable in source.variables.items():
+            datatype = variable.datatype
+            vlen = isinstance(datatype, netCDF4.VLType)
+            if vlen:
+                # strings are variable length types without a name
+                if datatype.dtype is str:
+                    datatype = str
+                else:
+                    datatype = vltypes[datatype.name]
+
+            chunking = variable.chunking()
+            chunksizes = None if chunking == 'contiguous' else chunking
+            filters = variable.filters() or {}
+            zlib = filters.get('zlib', False)
+            complevel = filters.get('complevel', 4)
+            shuffle = filters.get('shuffle', True)
+
+            options = NetCDFPlus.resolve_store_options(store_options, name)
+            dimensions = variable.dimensions
+            if dimensions and \
+                    source.dimensions[dimensions[0]].isunlimited():
+                if vlen:
+                    itemsize = NetCDFPlus._vlen_item_bytes
+                else:
+                    itemsize = variable.dtype.itemsize
+
+                chunksizes = NetCDFPlus.record_chunksizes(
+                    options, variable.shape, chunksizes, itemsize)
+
+            if not vlen:
+                # quantized variables stay compressed
+                zlib = options.get('zlib', zlib) or hasattr(
+                    variable, 'least_significant_digit')
+                complevel = options.get('complevel', complevel)
+                shuffle = options.get('shuffle', shuffle)
+
+            attributes = dict((attr, variable.getncattr(attr))
+                              for attr in variable.ncattrs())
+            fill_value = attributes.pop('_FillValue', None)
+
+            if chunksizes is None:
+                contiguous = chunking == 'contiguous' and not zlib
+            else:
+                contiguous = False
+
+            new_variable = target.createVariable(
+                name, datatype, dimensions,
+                zlib=zlib, complevel=complevel, shuffle=shuffle,
+                chunksizes=chunksizes, contiguous=contiguous,
+                fill_value=fill_value)
+            new_variable.set_auto_maskandscale(False)
+            new_variable.setncatts(attributes)
+
+            if 'cache_size' in options:
+                new_variable.set_var_chunk_cache(size=options['cache_size'])
+
+            if not dimensions:
+                new_variable.assignValue(variable.getValue())
+                continue
+
+            length = variable.shape[0]
+            if vlen:
+                itemsize = NetCDFPlus._vlen_item_bytes
+            else:
+                itemsize = variable.dtype.itemsize
+
+            object_bytes = itemsize * int(np.prod(variable.shape[1:]))
+            step = max(1, buffer_bytes // max(1, object_bytes))
+            for start in range(0, length, step):
+                stop = min(start + step, length)
+                new_variable[start:stop] = variable[start:stop]
+
+    finally:
+        target.close()
+        source.close()
@@ -0,0 +1,124 @@
+from __future__ import absolute_import
+from builtins import range
+from builtins import object
+
+from nose.tools import (assert_equal, assert_true, assert_false,
+                        assert_raises)
+
+import numpy as np
+
+from openpathsampling.netcdfplus import (CacheManager, ManagedCache,
+                                         LRUChunkLoadingCache,
+                                         estimate_nbytes)
+
+
+class Holder(object):
+    """Simple weak-referenceable object holding an array"""
+    def __init__(self, n_values):
+        self.values = np.zeros(n_values)
+
+
+class testEstimateNbytes(object):
+    def test_arrays_are_counted(self):
+        small = estimate_nbytes(Holder(10))
+        large = estimate_nbytes(Holder(1000))
+        # the size of the attribute dict of the holders can differ a little
+        assert_true(large - small >= 990 * 8 - 256)
+
+    def test_list_values(self):
+        assert_true(estimate_nbytes([np.zeros(100)]) >= 800)
+
+
+class testManagedCache(object):
+    def setup(self):
+        self.manager = CacheManager(10000)
+        self.cache = ManagedCache(self.manager)
+
+    def test_budget(self):
+        objs = [Holder(100) for _ in range(20)]
+        for idx, obj in enumerate(objs):
+            self.cache[idx] = obj
+
+        assert_true(self.manager.nbytes <= self.manager.max_bytes)
+        assert_equal(self.manager.nbytes, self.cache.nbytes)
+        # the estimated size of equal objects can differ a little
+        sizes = [estimate_nbytes(obj) for obj in objs]
+        max_bytes = self.manager.max_bytes
+        assert_true(self.cache.count[0] <= max_bytes // min(sizes))
+        assert_true(self.cache.count[0] >= max_bytes // max(sizes) - 1)
+        assert_true(self.cache.evictions > 0)
+        # evicted objects are still referenced, so they can still be found
+        assert_equal(len(self.cache), 20)
+        assert_true(self.cache[0] is objs[0])
+
+    def test_weak_references(self):
+        for idx in range(20):
+            self.cache[idx] = Holder(100)
+
+        assert_equal(len(self.cache), self.cache.count[0])
+        assert_raises(KeyError, self.cache.__getitem__, 0)
+
+    def test_stats(self):
+        self.cache[0] = Holder(100)
+        self.cache[0]
+        self.cache[0]
+        self.cache.get(1)
+        assert_equal(self.cache.stats['hits'], 2)
+        assert_equal(self.cache.stats['misses'], 1)
+        assert_equal(self.cache.stats['evictions'], 0)
+        assert_equal(self.manager.stats['hits'], 2)
+        assert_equal(self.manager.stats['count'], 1)
+
+    def test_used_objects_stay(self):
+        objs = [Holder(100) for _ in range(20)]
+        for idx, obj in enumerate(objs):
+            self.cache[idx] = obj
+            # keep using the first object
+            self.cache[0]
+
+        assert_true(0 in self.cache._cache)
+
+    def test_shared_budget(self):
+        other = ManagedCache(self.manager, cost=10.0)
+        other[0] = Holder(100)
+        for idx in range(20):
+            self.cache[idx] = Holder(100)
+
+        # the expensive object survives
+        assert_true(0 in other._cache)
+        assert_true(self.manager.nbytes <= self.manager.max_bytes)
+        assert_equal(self.manager.nbytes, self.cache.nbytes + other.nbytes)
+
+    def test_clear(self):
+        for idx in range(5):
+            self.cache[idx] = Holder(100)
+
+        self.cache.clear()
+        assert_equal(self.manager.nbytes, 0)
+        assert_equal(len(self.cache), 0)
+
+    def test_discard_collected_cache(self):
+        other = ManagedCache(self.manager)
+        other[0] = Holder(100)
+        assert_true(self.manager.nbytes > 0)
+        del other
+        assert_equal(self.manager.nbytes, 0)
+        assert_equal(self.manager.stats['caches'], 1)
+
+
+class testManagedChunkLoadingCache(object):
+    def test_chunks_in_budget(self):
+        manager = CacheManager(10000)
+        variable = [np.zeros(10) for _ in range(100)]
+        cache = LRUChunkLoadingCache(
+            chunksize=10, variable=variable, manager=manager)
+
+        for idx in range(100):
+            assert_true(cache[idx] is variable[idx])
+
+        assert_true(manager.nbytes <= manager.max_bytes)
+        assert_true(cache.evictions > 0)
+        assert_equal(cache.stats['misses'], 10)
+        assert_equal(cache.stats['hits'], 90)
+        assert_false(0 in cache._chunkdict)
+        assert_true(cache[0] is variable[0])
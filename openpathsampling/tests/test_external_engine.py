@@ -0,0 +1,153 @@
+from __future__ import absolute_import
+
+from builtins import range
+from builtins import object
+import os
+import sys
+import tempfile
+
+from nose.tools import (assert_equal, assert_not_equal, assert_true)
+
+import numpy as np
+
+import openpathsampling as paths
+import openpathsampling.engines.external as ext
+
+# a 1D harmonic oscillator (x'' = -x) speaking the external engine protocol
+# with a velocity Verlet integrator. An x below -10 reports an error.
+worker_code = """
+import sys
+import numpy as np
+
+stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+dt = 0.1
+x = v = None
+while True:
+    line = stdin.readline()
+    if not line:
+        break
+    command, _, argument = line.decode('ascii').strip().partition(' ')
+    if command == 'state':
+        data = np.frombuffer(stdin.read(int(argument)), dtype='<f8')
+        x, v = data[:2].copy(), data[2:].copy()
+    elif command == 'frames':
+        for _ in range(int(argument)):
+            v += -0.5 * dt * x
+            x += dt * v
+            v += -0.5 * dt * x
+            if x[0] < -10.0:
+                stdout.write(b'error out of range\\n')
+            else:
+                data = np.concatenate([x, v]).astype('<f8').tobytes()
+                stdout.write(('frame %d\\n' % len(data)).encode('ascii'))
+                stdout.write(data)
+            stdout.flush()
+    elif command == 'quit':
+        break
+"""
+
+
+def reference_frames(x, v, n_frames, dt=0.1):
+    frames = []
+    for _ in range(n_frames):
+        v = v - 0.5 * dt * x
+        x = x + dt * v
+        v = v - 0.5 * dt * x
+        frames.append((x, v))
+    return frames
+
+
+class testExternalEngine(object):
+    def setUp(self):
+        fd, self.worker = tempfile.mkstemp(suffix='.py')
+        with os.fdopen(fd, 'w') as f:
+            f.write(worker_code)
+
+        self.engine = ext.Engine(
+            [sys.executable, self.worker],
+            n_atoms=1,
+            n_spatial=2,
+            options={'n_frames_max': 100, 'n_frames_ahead': 3}
+        )
+        self.template = ext.Snapshot(
+            coordinates=np.array([[1.0, 0.0]]),
+            velocities=np.array([[0.0, 1.0]]),
+            engine=self.engine
+        )
+
+    def teardown(self):
+        self.engine.close()
+        os.remove(self.worker)
+
+    def test_generate(self):
+        ens = paths.LengthEnsemble(6)
+        traj = self.engine.generate(self.template, [ens.can_append])
+        assert_equal(len(traj), 6)
+
+        expected = reference_frames(
+            np.array([1.0, 0.0]), np.array([0.0, 1.0]), 5)
+        for snap, (x, v) in zip(traj[1:], expected):
+            np.testing.assert_allclose(snap.coordinates[0], x)
+            np.testing.assert_allclose(snap.velocities[0], v)
+            assert_true(snap.engine is self.engine)
+
+    def test_persistent_process(self):
+        ens = paths.LengthEnsemble(3)
+        self.engine.generate(self.template, [ens.can_append])
+        pid = self.engine.process.pid
+        traj = self.engine.generate(self.template.reversed, [ens.can_append])
+        assert_equal(self.engine.process.pid, pid)
+
+        # frames generated ahead of the first trajectory were dropped
+        expected = reference_frames(
+            np.array([1.0, 0.0]), np.array([0.0, -1.0]), 2)
+        for snap, (x, v) in zip(traj[1:], expected):
+            np.testing.assert_allclose(snap.coordinates[0], x)
+
+    def test_continue_after_stop(self):
+        ens = paths.LengthEnsemble(4)
+        traj = self.engine.generate(self.template, [ens.can_append])
+        last = traj[-1]
+        assert_true(self.engine.current_snapshot is last)
+
+        more = self.engine.generate_n_frames(2)
+        expected = reference_frames(
+            last.coordinates[0], last.velocities[0], 2)
+        for snap, (x, v) in zip(more, expected):
+            np.testing.assert_allclose(snap.coordinates[0], x)
+
+    def test_error(self):
+        far_away = ext.Snapshot(
+            coordinates=np.array([[-20.0, 0.0]]),
+            velocities=np.array([[0.0, 0.0]]),
+            engine=self.engine
+        )
+        ens = paths.LengthEnsemble(4)
+        try:
+            self.engine.generate(far_away, [ens.can_append])
+        except RuntimeError as e:
+            assert_equal(str(e), 'out of range')
+        else:
+            raise AssertionError('Did not raise the error of the process')
+
+        # the engine recovers and the process keeps running
+        traj = self.engine.generate(self.template, [ens.can_append])
+        assert_equal(len(traj), 4)
+
+    def test_restart_after_kill(self):
+        ens = paths.LengthEnsemble(3)
+        self.engine.generate(self.template, [ens.can_append])
+        pid = self.engine.process.pid
+        self.engine.kill()
+        traj = self.engine.generate(self.template, [ens.can_append])
+        assert_equal(len(traj), 3)
+        assert_not_equal(self.engine.process.pid, pid)
+
+    def test_to_dict(self):
+        dct = self.engine.to_dict()
+        engine = ext.Engine.from_dict(dct)
+        assert_equal(engine.command, self.engine.command)
+        assert_equal(engine.n_atoms, 1)
+        assert_equal(engine.n_spatial, 2)
+        assert_equal(engine.n_frames_ahead, 3)
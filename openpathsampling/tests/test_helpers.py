@@ -301,3 +301,28 @@ def assert_frame_equal(truth, beauty):
                 assert_true(np.isnan(beauty_val))
             else:
                 assert_equal(truth_val, beauty_val)
+
+def make_1d_tps_scheme():
+    """Path reversal TPS between x < -1 and x > 1 for 1D snapshots
+
+    Returns
+    -------
+    cv : :class:`.FunctionCV`
+        the CV "x"
+    network : :class:`.TPSNetwork`
+    scheme : :class:`.LockedMoveScheme`
+        path reversal in the only ensemble of the network
+    traj : :class:`.Trajectory`
+        a transition from -1.1 to 1.1
+    init_conds : :class:`.SampleSet`
+        initial conditions of the scheme from `traj`
+    """
+    cv = paths.FunctionCV("x", lambda snap: snap.xyz[0][0])
+    left = paths.CVDefinedVolume(cv, float("-inf"), -1.0)
+    right = paths.CVDefinedVolume(cv, 1.0, float("inf"))
+    network = paths.TPSNetwork(left, right)
+    mover = paths.PathReversalMover(network.all_ensembles[0])
+    scheme = paths.LockedMoveScheme(mover, network)
+    traj = make_1d_traj([-1.1, 0.0, 1.1])
+    init_conds = scheme.initial_conditions_from_trajectories([traj])
+    return cv, network, scheme, traj, init_conds
@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+from nose.tools import assert_equal
+
+# plotting, graph and MD file format libraries are only imported when they
+# are used, so that `import openpathsampling` stays fast
+check_code = """
+import sys
+import openpathsampling
+print(' '.join(m for m in ['matplotlib', 'networkx', 'mdtraj',
+                           'scipy.sparse', 'svgwrite']
+               if m in sys.modules))
+"""
+
+
+def test_heavy_modules_are_deferred():
+    output = subprocess.check_output(
+        [sys.executable, '-W', 'ignore', '-c', check_code])
+    loaded = output.decode().strip().split('\n')[-1].split()
+    assert_equal(loaded, [])
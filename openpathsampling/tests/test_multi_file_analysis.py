@@ -0,0 +1,118 @@
+from __future__ import absolute_import
+from builtins import range
+from builtins import object
+from nose.tools import assert_equal, assert_almost_equal
+from .test_helpers import make_1d_tps_scheme, data_filename
+from . import test_tis_analysis
+
+import collections
+import os
+
+import openpathsampling as paths
+from openpathsampling.analysis.tis import (MultiFileAnalysis,
+                                          PathLengthHistogrammer, DictFlux)
+from openpathsampling.analysis.tis.core import \
+    steps_to_weighted_trajectories
+
+import logging
+logging.getLogger('openpathsampling.initialization').setLevel(logging.CRITICAL)
+logging.getLogger('openpathsampling.ensemble').setLevel(logging.CRITICAL)
+logging.getLogger('openpathsampling.storage').setLevel(logging.CRITICAL)
+logging.getLogger('openpathsampling.netcdfplus').setLevel(logging.CRITICAL)
+
+
+class testMultiFileAnalysis(object):
+    def setup(self):
+        _, network, scheme, traj, init_conds = make_1d_tps_scheme()
+        self.ensembles = network.sampling_ensembles
+
+        self.filenames = [data_filename("multi_file_test_%d.nc" % idx)
+                          for idx in range(3)]
+        for (n_steps, filename) in zip([1, 2, 3], self.filenames):
+            storage = paths.Storage(filename, "w", template=traj[0])
+            sim = paths.PathSampling(storage=storage,
+                                     move_scheme=scheme,
+                                     sample_set=init_conds)
+            sim.output_stream = open(os.devnull, 'w')
+            sim.run(n_steps)
+            sim.output_stream.close()
+            storage.close()
+
+        self.steps = []
+        for filename in self.filenames:
+            storage = paths.Storage(filename, "r")
+            self.steps.extend(list(storage.steps))
+            storage.close()
+
+    def teardown(self):
+        for filename in self.filenames:
+            if os.path.isfile(filename):
+                os.remove(filename)
+
+    def test_weighted_trajectories(self):
+        analysis = MultiFileAnalysis(self.filenames, n_processes=2)
+        assert_equal(analysis.n_processes, 2)
+        results = analysis.weighted_trajectories(self.ensembles)
+
+        expected = steps_to_weighted_trajectories(self.steps, self.ensembles)
+        for ens in self.ensembles:
+            assert_equal(
+                results[ens],
+                collections.Counter({traj.__uuid__: weight for traj, weight
+                                     in expected[ens].items()})
+            )
+        # the initial step of each file and the 6 MC steps
+        assert_equal(sum(results[self.ensembles[0]].values()), 9)
+
+    def test_histograms(self):
+        histogrammer = PathLengthHistogrammer(
+            ensembles=self.ensembles,
+            hist_parameters={'bin_width': 1, 'bin_range': (0, 10)}
+        )
+        expected = {ens: dict(hist._histogram) for ens, hist
+                    in histogrammer.calculate(self.steps).items()}
+
+        for n_processes in [1, 2]:
+            analysis = MultiFileAnalysis(self.filenames,
+                                         n_processes=n_processes)
+            hists = analysis.calculate(histogrammer)
+            for ens in self.ensembles:
+                assert_equal(dict(hists[ens]._histogram), expected[ens])
+                assert_equal(hists[ens].count, 9)
+
+
+class testMultiFileFlux(object):
+    def setup(self):
+        # reuse the fake minus move steps of the flux tests
+        fixture = test_tis_analysis.TestMinusMoveFlux()
+        fixture.setup()
+        self.state_A = fixture.state_A
+        self.mistis_minus_steps = fixture.mistis_minus_steps
+        self.mistis_minus_flux = fixture.mistis_minus_flux
+        self.filenames = [data_filename("multi_file_flux_%d.nc" % idx)
+                          for idx in range(2)]
+        steps = self.mistis_minus_steps
+        for (idx, filename) in enumerate(self.filenames):
+            storage = paths.Storage(filename, "w",
+                                    template=fixture.trajs_AB[0][0])
+            for step in steps[2 * idx:2 * idx + 2]:
+                storage.steps.save(step)
+            storage.close()
+
+    def teardown(self):
+        for filename in self.filenames:
+            if os.path.isfile(filename):
+                os.remove(filename)
+
+    def test_flux(self):
+        expected = self.mistis_minus_flux.calculate(self.mistis_minus_steps)
+        analysis = MultiFileAnalysis(self.filenames, n_processes=2)
+        fluxes = analysis.flux(self.mistis_minus_flux)
+        assert_equal(set(fluxes.keys()), set(expected.keys()))
+        for pair in expected:
+            assert_almost_equal(fluxes[pair], expected[pair])
+
+    def test_dict_flux(self):
+        flux_dict = {(self.state_A, self.state_A): 0.5}
+        analysis = MultiFileAnalysis(self.filenames)
+        assert_equal(analysis.flux(DictFlux(flux_dict)), flux_dict)
@@ -183,6 +183,22 @@ class testRandomizeVelocities(object):
         for val in new_2x3D.velocities[0]:
             assert_not_equal(val, 0.0)
 
+    def test_modify_batch(self):
+        randomizer = RandomVelocities(beta=old_div(1.0,5.0), subset_mask=[0])
+        new_snaps = randomizer.modify_batch(self.snap_2x3D, 3)
+        assert_equal(len(new_snaps), 3)
+        for new_2x3D in new_snaps:
+            assert_equal(new_2x3D.velocities.shape,
+                         self.snap_2x3D.velocities.shape)
+            assert_array_almost_equal(new_2x3D.velocities[1],
+                                      self.snap_2x3D.velocities[1])
+            for val in new_2x3D.velocities[0]:
+                assert_not_equal(val, 0.0)
+        # all copies are drawn independently
+        assert_equal(np.isclose(new_snaps[0].velocities,
+                                new_snaps[1].velocities).all(),
+                     False)
+
     def test_with_openmm_snapshot(self):
         # note: this is only a smoke test; correctness depends on OpenMM's
         # tests of its constraint approaches.
@@ -315,23 +331,28 @@ class testGeneralizedDirectionModifier(object):
     def test_dv_widths_toy(self):
         selected = np.array([1.0, 2.0])
         n_atoms = len(self.toy_snapshot.coordinates)
-        assert_array_almost_equal(self.toy_modifier._dv_widths(n_atoms, 2),
-                                  selected)
         assert_array_almost_equal(
-            self.toy_modifier_long_dv._dv_widths(n_atoms, 2),
+            self.toy_modifier._dv_widths(n_atoms, 2, None),
+            selected
+        )
+        assert_array_almost_equal(
+            self.toy_modifier_long_dv._dv_widths(n_atoms, 2, None),
             selected
         )
         assert_array_almost_equal(
-            self.toy_modifier_all._dv_widths(n_atoms, n_atoms),
+            self.toy_modifier_all._dv_widths(n_atoms, n_atoms, None),
             np.array([1.5]*3)
         )
 
     def test_dv_widths_openmm(self):
         n_atoms = len(self.openmm_snap.coordinates)
-        results = self.openmm_modifier._dv_widths(n_atoms, n_atoms)
-        expected = np.array([1.2] * n_atoms) * u.nanometer / u.picosecond
-        for truth, beauty in zip(expected, results):
-            assert_almost_equal(truth, beauty)
+        u_vel = old_div(u.nanometer, u.picosecond)
+        results = self.openmm_modifier._dv_widths(n_atoms, n_atoms, u_vel)
+        assert_array_almost_equal(results, np.array([1.2] * n_atoms))
+        # widths are converted to the unit of the velocities
+        results = self.openmm_modifier._dv_widths(
+            n_atoms, n_atoms, old_div(u.nanometer, u.femtosecond))
+        assert_array_almost_equal(results, np.array([1.2e-3] * n_atoms))
 
     def test_rescale_linear_momenta_constant_energy_toy(self):
         velocities = np.array([[1.5, -1.0], [-1.0, 2.0], [0.25, -1.0]])
@@ -355,39 +376,39 @@ class testGeneralizedDirectionModifier(object):
         assert_array_almost_equal(total_momenta, np.array([0.0]*2))
         assert_almost_equal(new_ke, 20.0)
 
+    def test_rescale_linear_momenta_constant_energy_batch(self):
+        velocities = np.array([[[1.5, -1.0], [-1.0, 2.0], [0.25, -1.0]],
+                               [[0.5, 1.0], [1.0, 0.0], [-2.0, 3.0]]])
+        masses = np.array([1.0, 1.5, 4.0])
+        self.toy_modifier._remove_linear_momentum(velocities, masses)
+        self.toy_modifier._rescale_kinetic_energy(velocities, masses,
+                                                  np.array([20.0, 10.0]))
+        for vel, double_KE in zip(velocities, [20.0, 10.0]):
+            new_momenta = vel * masses[:, np.newaxis]
+            assert_array_almost_equal(sum(new_momenta), np.array([0.0]*2))
+            assert_almost_equal(sum(sum(new_momenta * vel)), double_KE)
+
     def test_remove_momentum_rescale_energy_openmm(self):
-        # don't actually need to do everything with OpenMM, but do need to
-        # add units
         u_vel = old_div(u.nanometer, u.picosecond)
-        u_mass = old_div(u.dalton, u.AVOGADRO_CONSTANT_NA)
-        u_energy = old_div(u.kilojoule_per_mole, u.AVOGADRO_CONSTANT_NA)
-
-        velocities = \
-                np.array([[1.5, -1.0], [-1.0, 2.0], [0.25, -1.0]]) * u_vel
-        masses = np.array([1.0, 1.5, 4.0]) * u_mass
-        new_vel = self.openmm_modifier._remove_linear_momentum(
-            velocities=velocities,
-            masses=masses
-        )
-        new_momenta = new_vel * masses[:, np.newaxis]
-        total_momenta = sum(new_momenta, new_momenta[0])
-        assert_array_almost_equal(total_momenta,
-                                  np.array([0.0]*2) * u_vel * u_mass)
-
-        new_vel = self.openmm_modifier._rescale_kinetic_energy(
-            velocities=velocities,
-            masses=masses,
-            double_KE=20.0 * u_energy
-        )
-        new_momenta = new_vel * masses[:, np.newaxis]
-        total_momenta = sum(new_momenta, new_momenta[0])
-        zero_energy = 0.0 * u_energy
-        new_ke = sum(sum(new_momenta * new_vel, zero_energy), zero_energy)
-        # tests require that the linear momentum be 0, and KE be correct
-        assert_array_almost_equal(total_momenta,
-                                  np.array([0.0]*2) * u_vel * u_mass)
-        assert_equal(new_ke.unit, (20.0 * u_energy).unit)
-        assert_almost_equal(new_ke._value, (20.0 * u_energy)._value)
+        # the Reference platform is available with every OpenMM build
+        self.openmm_engine.initialize('Reference')
+        # the test system starts at rest, which has no KE to keep
+        snap = self.openmm_snap.copy_with_replacement(
+            velocities=np.ones(self.openmm_snap.velocities.shape) * u_vel
+        )
+        masses = np.array(snap.masses._value)
+        velocities = snap.velocities
+        old_vel = velocities.value_in_unit(u_vel)
+        old_double_ke = np.sum(masses[:, np.newaxis] * old_vel ** 2)
+        modifier = VelocityDirectionModifier(1.2 * u_vel)
+        for new_snap in modifier.modify_batch(snap, 3):
+            assert_equal(new_snap.velocities.unit, velocities.unit)
+            new_vel = new_snap.velocities.value_in_unit(u_vel)
+            new_momenta = masses[:, np.newaxis] * new_vel
+            # tests require that the linear momentum be 0, and KE be kept
+            assert_array_almost_equal(sum(new_momenta), np.array([0.0]*3))
+            assert_almost_equal(np.sum(new_momenta * new_vel),
+                                old_double_ke)
 
 
 class testVelocityDirectionModifier(object):
@@ -464,6 +485,37 @@ class testVelocityDirectionModifier(object):
                 sum([(v**2).value_in_unit(u_vel_sq) for v in old_v])
             )
 
+    def test_modify_batch(self):
+        new_toy_snaps = self.toy_modifier.modify_batch(self.toy_snapshot, 4)
+        assert_equal(len(new_toy_snaps), 4)
+        old_vel = self.toy_snapshot.velocities
+        for new_toy_snap in new_toy_snaps:
+            new_vel = new_toy_snap.velocities
+            same_vel = [np.allclose(new_vel[i], old_vel[i])
+                        for i in range(len(new_vel))]
+            assert_equal(Counter(same_vel), Counter({True: 1, False: 2}))
+            for new_v, old_v in zip(new_vel, old_vel):
+                assert_almost_equal(sum([v**2 for v in new_v]),
+                                    sum([v**2 for v in old_v]))
+
+    def test_modify_batch_matches_call(self):
+        modifier = VelocityDirectionModifier(
+            delta_v=[1.0, 2.0],
+            subset_mask=[1, 2],
+            remove_linear_momentum=True
+        )
+        state = np.random.get_state()
+        try:
+            np.random.seed(42)
+            batch = modifier.modify_batch(self.toy_snapshot, 3)
+            np.random.seed(42)
+            single = [modifier(self.toy_snapshot) for _ in range(3)]
+        finally:
+            np.random.set_state(state)
+        for batch_snap, single_snap in zip(batch, single):
+            assert_array_almost_equal(batch_snap.velocities,
+                                      single_snap.velocities)
+
     def test_call_with_linear_momentum_fix(self):
         toy_modifier = VelocityDirectionModifier(
             delta_v=[1.0, 2.0],
@@ -0,0 +1,123 @@
+from __future__ import absolute_import
+from builtins import range
+from builtins import object
+from nose.tools import assert_equal, assert_true, assert_false
+from .test_helpers import make_1d_traj, data_filename
+
+import os
+
+import numpy as np
+
+import openpathsampling as paths
+
+
+class testSnapshotPrecision(object):
+    def setup(self):
+        self.filename = data_filename("snapshot_precision_test.nc")
+        coordinates = [1.23456789 * idx for idx in range(5)]
+        velocities = [0.98765432 * idx for idx in range(5)]
+        self.traj = make_1d_traj(coordinates, velocities)
+        self.coordinates = np.array([s.coordinates for s in self.traj])
+        self.velocities = np.array([s.velocities for s in self.traj])
+
+    def teardown(self):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def _stored(self, storage, idx):
+        snapshot = storage.snapshots[
+            storage.snapshots.index[self.traj[idx].__uuid__]]
+        return snapshot.coordinates, snapshot.velocities
+
+    def test_exact(self):
+        storage = paths.Storage(self.filename, "w")
+        storage.save(self.traj)
+        variable = storage.variables['snapshot0_coordinates']
+        assert_false(variable.filters()['zlib'])
+        storage.close()
+
+        storage = paths.Storage(self.filename, "r")
+        for idx in range(len(self.traj)):
+            coordinates, velocities = self._stored(storage, idx)
+            np.testing.assert_allclose(coordinates, self.coordinates[idx],
+                                       rtol=1e-6)
+        storage.close()
+
+    def test_precision(self):
+        storage = paths.Storage(self.filename, "w",
+                                precision={'coordinates': 2})
+        storage.save(self.traj)
+        variable = storage.variables['snapshot0_coordinates']
+        assert_true(variable.filters()['zlib'])
+        assert_equal(variable.least_significant_digit, 2)
+        assert_false(storage.variables['snapshot0_velocities']
+                     .filters()['zlib'])
+        storage.close()
+
+        storage = paths.Storage(self.filename, "r")
+        assert_equal(storage.snapshots.precision, {'coordinates': 2})
+        for idx in range(len(self.traj)):
+            coordinates, velocities = self._stored(storage, idx)
+            np.testing.assert_allclose(coordinates, self.coordinates[idx],
+                                       atol=0.005)
+            np.testing.assert_allclose(velocities, self.velocities[idx],
+                                       rtol=1e-6)
+
+        stored = np.array([self._stored(storage, idx)[0]
+                           for idx in range(len(self.traj))])
+        assert_false(np.allclose(stored, self.coordinates, atol=1e-4))
+        storage.close()
+
+    def test_save_exact(self):
+        storage = paths.Storage(self.filename, "w",
+                                precision={'coordinates': 2})
+        storage.save(self.traj[:3])
+        # stored again exactly
+        storage.snapshots.save_exact(self.traj[1])
+        # and stored exactly for the first time
+        storage.snapshots.save_exact(self.traj[4])
+        storage.save(self.traj)
+        assert_equal(len(storage.snapshots.store_snapshot_list), 2)
+        storage.close()
+
+        storage = paths.Storage(self.filename, "r")
+        assert_equal(len(storage.snapshots.exact_type_list), 1)
+        for idx in range(len(self.traj)):
+            coordinates, velocities = self._stored(storage, idx)
+            if idx in [1, 4]:
+                tolerance = 1e-6
+            else:
+                tolerance = 0.005
+            np.testing.assert_allclose(coordinates, self.coordinates[idx],
+                                       atol=tolerance)
+        storage.close()
+
+        # appending keeps using the exact store
+        storage = paths.Storage(self.filename, "a")
+        storage.snapshots.save_exact(self.traj[2])
+        assert_equal(len(storage.snapshots.store_snapshot_list), 2)
+        storage.close()
+
+        storage = paths.Storage(self.filename, "r")
+        coordinates, velocities = self._stored(storage, 2)
+        np.testing.assert_allclose(coordinates, self.coordinates[2],
+                                   atol=1e-6)
+        storage.close()
+
+    def test_exact_shooting_points(self):
+        storage = paths.Storage(self.filename, "w",
+                                precision={'coordinates': 2},
+                                exact_shooting_points=True)
+        storage.save(self.traj)
+        storage.save(paths.Details(shooting_snapshot=self.traj[3]))
+        storage.close()
+
+        storage = paths.Storage(self.filename, "r")
+        assert_true(storage.snapshots.exact_shooting_points)
+        coordinates, velocities = self._stored(storage, 3)
+        np.testing.assert_allclose(coordinates, self.coordinates[3],
+                                   atol=1e-6)
+        coordinates, velocities = self._stored(storage, 1)
+        assert_false(np.allclose(coordinates, self.coordinates[1],
+                                 atol=1e-4))
+        storage.close()
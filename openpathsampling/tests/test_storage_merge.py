@@ -0,0 +1,89 @@
+from __future__ import absolute_import
+from builtins import range
+from builtins import object
+from nose.tools import assert_equal
+from .test_helpers import make_1d_tps_scheme, data_filename
+
+import os
+
+import numpy as np
+
+import openpathsampling as paths
+from openpathsampling.storage import merge_storages
+
+
+class testMergeStorages(object):
+    def setup(self):
+        cv, _, scheme, self.traj, self.init_conds = make_1d_tps_scheme()
+        cv.with_diskcache()
+        self.scheme = scheme.named('scheme')
+
+        self.filenames = [data_filename("merge_test_%d.nc" % idx)
+                          for idx in range(2)]
+        self.filename = data_filename("merge_test.nc")
+        for filename in self.filenames:
+            storage = paths.Storage(filename, "w", template=self.traj[0])
+            sim = paths.PathSampling(storage=storage,
+                                     move_scheme=self.scheme,
+                                     sample_set=self.init_conds)
+            sim.output_stream = open(os.devnull, 'w')
+            sim.run(3)
+            sim.output_stream.close()
+            storage.cvs.sync(cv)
+            storage.close()
+
+        self.sources = [paths.Storage(filename, "r")
+                        for filename in self.filenames]
+
+    def teardown(self):
+        for source in self.sources:
+            source.close()
+
+        for filename in self.filenames + [self.filename]:
+            if os.path.isfile(filename):
+                os.remove(filename)
+
+    def test_merge(self):
+        target = paths.Storage(self.filename, "w")
+        copied = merge_storages(target, self.sources)
+        assert_equal(target.schemes['scheme'], self.scheme)
+        target.close()
+
+        # the initial trajectory and the snapshots are shared by both runs
+        assert_equal(copied['trajectories'], 7)
+        assert_equal(copied['snapshots'], 3)
+        assert_equal(copied['steps'], 8)
+
+        merged = paths.Storage(self.filename, "r")
+        assert_equal(len(merged.steps), 8)
+        assert_equal(len(merged.snapshots), 6)
+        assert_equal(len(merged.ensembles), len(self.sources[0].ensembles))
+        for source in self.sources:
+            for step in source.steps:
+                loaded = merged.steps[step.__uuid__]
+                assert_equal(loaded.mccycle, step.mccycle)
+                assert_equal(loaded.active[0].trajectory,
+                             step.active[0].trajectory)
+
+        assert_equal(merged.schemes['scheme'], self.scheme)
+
+        cv = merged.cvs['x']
+        values = merged.cvs.cache_store(cv).vars['value'][:]
+        np.testing.assert_allclose(values, [-1.1, 0.0, 1.1])
+        merged.close()
+
+    def test_merge_again(self):
+        target = paths.Storage(self.filename, "w")
+        merge_storages(target, self.sources[0])
+        target.close()
+
+        target = paths.Storage(self.filename, "a")
+        copied = merge_storages(target, self.sources)
+        # only the objects created by the second run are new
+        for name in ['snapshots', 'ensembles', 'volumes', 'networks',
+                     'schemes', 'engines', 'topologies']:
+            assert_equal(copied[name], 0)
+        assert_equal(copied['steps'], 4)
+        assert_equal(copied['trajectories'], 3)
+        assert_equal(len(target.steps), 8)
+        target.close()
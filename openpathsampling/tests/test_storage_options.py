@@ -0,0 +1,159 @@
+from __future__ import absolute_import
+from builtins import range
+from builtins import object
+from nose.tools import assert_equal, assert_true, assert_false, raises
+from .test_helpers import make_1d_traj, data_filename
+
+import os
+
+import numpy as np
+
+import openpathsampling as paths
+from openpathsampling.netcdfplus import NetCDFPlus
+
+
+class testStoreOptions(object):
+    def setup(self):
+        self.filename = data_filename("storage_options_test.nc")
+        self.target_filename = data_filename("storage_options_copy.nc")
+        self.traj = make_1d_traj([0.1 * idx for idx in range(10)],
+                                 [0.2 * idx for idx in range(10)])
+        self.cv = paths.FunctionCV("x", lambda snap: snap.xyz[0][0])
+
+    def teardown(self):
+        for filename in [self.filename, self.target_filename]:
+            if os.path.isfile(filename):
+                os.remove(filename)
+
+    def test_resolve(self):
+        options = {
+            '*': 'append',
+            'snapshots': {'chunksize': 10},
+            'snapshots_*_value': 'analysis'
+        }
+        resolve = NetCDFPlus.resolve_store_options
+        append = NetCDFPlus.store_option_presets['append']
+        analysis = NetCDFPlus.store_option_presets['analysis']
+        assert_equal(resolve(options, 'trajectories_uuid'), append)
+        snapshot_options = dict(append)
+        snapshot_options['chunksize'] = 10
+        assert_equal(resolve(options, 'snapshots_uuid'), snapshot_options)
+        # `snapshots` is the name of the store, not a prefix
+        assert_equal(resolve(options, 'snapshotsx_uuid'), append)
+        value_options = dict(snapshot_options)
+        value_options.update(analysis)
+        assert_equal(resolve(options, 'snapshots_x_value'), value_options)
+        assert_equal(resolve(None, 'snapshots_uuid'), {})
+        assert_equal(resolve({'zlib': True}, 'samples_json'),
+                     {'zlib': True})
+
+    @raises(ValueError)
+    def test_unknown_preset(self):
+        NetCDFPlus.resolve_store_options({'snapshots': 'fast'}, 'snapshots')
+
+    @raises(ValueError)
+    def test_unknown_option(self):
+        NetCDFPlus.resolve_store_options({'snapshots': {'level': 3}},
+                                         'snapshots')
+
+    def test_record_chunksizes(self):
+        chunks = NetCDFPlus.record_chunksizes
+        assert_equal(chunks({}, (0, 5, 3), (256, 5, 3), 4), (256, 5, 3))
+        assert_equal(chunks({'chunksize': 1}, (0, 5, 3), None, 4),
+                     (1, 5, 3))
+        assert_equal(chunks({'chunk_bytes': 600}, (0, 5, 3), (256, 5, 3), 4),
+                     (10, 5, 3))
+        assert_equal(chunks({'chunk_bytes': 1}, (0, 5, 3), (256, 5, 3), 4),
+                     (1, 5, 3))
+
+    def test_default(self):
+        storage = paths.Storage(self.filename, "w")
+        storage.save(self.traj)
+        coordinates = storage.variables['snapshot0_coordinates']
+        assert_equal(coordinates.chunking(), [256, 1, 3])
+        assert_false(coordinates.filters()['zlib'])
+        assert_equal(storage.variables['snapshots_uuid'].chunking(),
+                     [65536])
+        storage.close()
+
+    def test_store_options(self):
+        storage = paths.Storage(
+            self.filename, "w",
+            store_options={'snapshot*': {'chunksize': 4,
+                                         'cache_size': 2 ** 16},
+                           'trajectories': 'analysis'})
+        storage.save(self.traj)
+        coordinates = storage.variables['snapshot0_coordinates']
+        assert_equal(coordinates.chunking(), [4, 1, 3])
+        assert_false(coordinates.filters()['zlib'])
+        assert_equal(coordinates.get_var_chunk_cache()[0], 2 ** 16)
+        assert_equal(storage.variables['snapshots_uuid'].chunking(), [4])
+
+        # strings and variable length data are not compressed
+        assert_false(
+            storage.variables['trajectories_snapshots'].filters()['zlib'])
+        assert_false(storage.variables['trajectories_uuid'].filters()['zlib'])
+        storage.close()
+
+        # chunk caches are set when the file is opened
+        storage = paths.Storage(
+            self.filename, "r",
+            store_options={'snapshot*': {'cache_size': 2 ** 17}})
+        coordinates = storage.variables['snapshot0_coordinates']
+        assert_equal(coordinates.chunking(), [4, 1, 3])
+        assert_equal(coordinates.get_var_chunk_cache()[0], 2 ** 17)
+        storage.close()
+
+    def test_compression(self):
+        storage = paths.Storage(self.filename, "w", store_options='analysis')
+        storage.save(self.traj)
+        coordinates = storage.variables['snapshot0_coordinates']
+        assert_true(coordinates.filters()['zlib'])
+        assert_true(coordinates.filters()['shuffle'])
+        # 4 MB chunks of 3 floats with 4 bytes each
+        assert_equal(coordinates.chunking(), [2 ** 22 // 12, 1, 3])
+        storage.close()
+
+        storage = paths.Storage(self.filename, "r")
+        loaded = storage.trajectories[0]
+        np.testing.assert_allclose(loaded.xyz, self.traj.xyz)
+        storage.close()
+
+    def test_rechunk_storage(self):
+        storage = paths.Storage(self.filename, "w", store_options='append')
+        storage.save(self.traj)
+        self.cv.with_diskcache()
+        storage.save(self.cv)
+        self.cv(self.traj)
+        storage.close()
+
+        paths.storage.rechunk_storage(
+            self.filename, self.target_filename,
+            store_options={'snapshot0': 'analysis',
+                           'cv0': {'chunksize': 5}})
+
+        storage = paths.Storage(self.filename, "r")
+        copy = paths.Storage(self.target_filename, "r")
+        coordinates = copy.variables['snapshot0_coordinates']
+        assert_true(coordinates.filters()['zlib'])
+        assert_equal(coordinates.chunking(), [2 ** 22 // 12, 1, 3])
+        assert_equal(copy.variables['cv0_value'].chunking(), [5])
+        # other variables keep their chunking
+        assert_equal(copy.variables['trajectories_uuid'].chunking(),
+                     storage.variables['trajectories_uuid'].chunking())
+
+        assert_equal(set(copy.variables), set(storage.variables))
+        for name in storage.variables:
+            assert_equal(copy.variables[name].dimensions,
+                         storage.variables[name].dimensions)
+
+        assert_equal(len(copy.snapshots), len(storage.snapshots))
+        traj = copy.trajectories[0]
+        assert_equal(traj.__uuid__, self.traj.__uuid__)
+        np.testing.assert_allclose(traj.xyz, self.traj.xyz)
+        np.testing.assert_allclose(copy.variables['cv0_value'][:],
+                                   storage.variables['cv0_value'][:])
+        copy_cv = copy.cvs[0]
+        np.testing.assert_allclose(copy_cv(traj), self.cv(self.traj))
+        copy.close()
+        storage.close()
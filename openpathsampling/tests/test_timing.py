@@ -0,0 +1,184 @@
+from __future__ import absolute_import
+from builtins import object
+from nose.tools import (assert_equal, assert_almost_equal, assert_true,
+                        raises)
+from .test_helpers import make_1d_tps_scheme
+
+import os
+from six import StringIO
+
+import numpy as np
+
+import openpathsampling as paths
+import openpathsampling.timing as timing
+from openpathsampling.storage.stores import MCStepStore
+from openpathsampling.timing import (StepTimer, StepTiming, TimingSummary,
+                                     timed)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStepTimer(object):
+    def setup(self):
+        self.clock = FakeClock()
+        self._default_timer = timing.default_timer
+        timing.default_timer = self.clock
+
+    def teardown(self):
+        timing.default_timer = self._default_timer
+
+    def test_exclusive_times(self):
+        timer = StepTimer()
+        with timer:
+            self.clock.now += 1.0
+            with timed('ensemble'):
+                self.clock.now += 2.0
+                with timed('cv'):
+                    self.clock.now += 4.0
+                self.clock.now += 8.0
+            with timed('engine'):
+                self.clock.now += 16.0
+
+        result = timer.timing()
+        assert_equal(result.ensemble, 10.0)
+        assert_equal(result.cv, 4.0)
+        assert_equal(result.engine, 16.0)
+        assert_equal(result.storage, 0.0)
+        assert_equal(result.total, 31.0)
+        assert_equal(result.other, 1.0)
+
+    def test_reenter(self):
+        timer = StepTimer()
+        with timer:
+            self.clock.now += 1.0
+        self.clock.now += 100.0
+        with timer, timed('storage'):
+            self.clock.now += 2.0
+
+        assert_equal(timer.timing().total, 3.0)
+        assert_equal(timer.timing().storage, 2.0)
+
+    def test_inactive(self):
+        assert_true(StepTimer.current() is None)
+        with timed('cv'):
+            self.clock.now += 1.0
+        timer = StepTimer()
+        with timer:
+            assert_true(StepTimer.current() is timer)
+        assert_true(StepTimer.current() is None)
+        assert_equal(timer.timing().cv, 0.0)
+
+
+class TestStepTiming(object):
+    def test_array(self):
+        step_timing = StepTiming(engine=1.0, cv=0.5, total=2.0)
+        values = np.asarray(step_timing)
+        assert_equal(len(values), len(StepTiming.categories))
+        loaded = StepTiming.from_array(values)
+        assert_equal(loaded.engine, 1.0)
+        assert_equal(loaded.cv, 0.5)
+        assert_true(np.isnan(loaded.storage))
+
+    @raises(TypeError)
+    def test_unknown_category(self):
+        StepTiming(mover=1.0)
+
+    def test_summary(self):
+        summary = TimingSummary()
+        summary.add(StepTiming(engine=1.0, ensemble=0.0, cv=0.0,
+                               acceptance=0.0, storage=0.5, total=2.0),
+                    'shooting')
+        summary.add(StepTiming(engine=3.0, ensemble=0.0, cv=0.0,
+                               acceptance=0.0, storage=0.5, total=4.0),
+                    'shooting')
+        assert_equal(summary.n_steps, {'shooting': 2})
+        assert_equal(summary.times['shooting']['engine'], 4.0)
+        assert_equal(summary.total()['other'], 1.0)
+        assert_true('shooting' in str(summary))
+
+
+class TestPathSamplingTiming(object):
+    def setup(self):
+        self.filename = "test_timing.nc"
+        _, _, self.scheme, self.traj, self.init_conds = \
+            make_1d_tps_scheme()
+
+    def teardown(self):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def test_run(self):
+        storage = paths.Storage(self.filename, "w", template=self.traj[0])
+        sim = paths.PathSampling(storage=storage, move_scheme=self.scheme,
+                                 sample_set=self.init_conds)
+        sim.output_stream = open(os.devnull, 'w')
+        sim.run(3)
+        sim.output_stream.close()
+
+        step_timing = sim.current_step.timing
+        assert_true(step_timing.total > 0.0)
+        assert_true(step_timing.storage > 0.0)
+        assert_equal(sum(sim.timing_summary.n_steps.values()), 3)
+        storage.close()
+
+        storage = paths.Storage(self.filename, "r")
+        columns = storage.steps.timing()
+        assert_equal(len(columns['total']), 4)
+        # the initial step is not timed
+        assert_true(np.isnan(columns['total'][0]))
+        assert_true(np.all(columns['total'][1:] > 0.0))
+        assert_almost_equal(storage.steps[3].timing.storage,
+                            step_timing.storage, places=5)
+        storage.close()
+
+    def test_output(self):
+        sim = paths.PathSampling(storage=None, move_scheme=self.scheme,
+                                 sample_set=self.init_conds)
+        sim.output_stream = StringIO()
+        sim.run(2)
+        output = sim.output_stream.getvalue()
+        # shown with the progress of the second step and at the end
+        assert_equal(output.count("Timing (in seconds):"), 2)
+        assert_true(output.endswith(str(sim.timing_summary) + "\n"))
+
+    def test_file_without_timing(self):
+        # write a file like before steps stored their timing
+        initialize = MCStepStore.initialize
+
+        def initialize_without_timing(store, units=None):
+            create_variable = store.create_variable
+            store.create_variable = lambda var_name, *args, **kwargs: \
+                None if var_name == 'timing' else \
+                create_variable(var_name, *args, **kwargs)
+            initialize(store, units)
+            del store.create_variable
+            store.var_names.remove('timing')
+
+        MCStepStore.initialize = initialize_without_timing
+        try:
+            storage = paths.Storage(self.filename, "w",
+                                    template=self.traj[0])
+            sim = paths.PathSampling(storage=storage,
+                                     move_scheme=self.scheme,
+                                     sample_set=self.init_conds)
+            sim.output_stream = open(os.devnull, 'w')
+            sim.run(2)
+            sim.output_stream.close()
+            storage.close()
+        finally:
+            MCStepStore.initialize = initialize
+
+        storage = paths.Storage(self.filename, "r")
+        assert_true('steps_timing' not in storage.variables)
+        assert_true(np.isnan(storage.steps[1].timing.total))
+        assert_equal(storage.steps[2].mccycle, 2)
+        columns = storage.steps.timing()
+        assert_equal(len(columns['total']), 3)
+        assert_true(np.all(np.isnan(columns['total'])))
+        storage.close()
@@ -233,6 +233,30 @@ class testToyEngine(object):
             assert_items_equal(s1.coordinates[0], s2.coordinates[0])
             assert_items_equal(s1.velocities[0], s2.velocities[0])
 
+    def test_generate_speculative(self):
+        self.sim.initialized = True
+        self.sim.options['n_frames_max'] = 50
+        cv = paths.FunctionCV("x_spec", lambda snap: snap.xyz[0][0])
+        ens = paths.AllInXEnsemble(paths.CVDefinedVolume(cv, -10.0, 0.8))
+        orig = self.sim.current_snapshot.copy()
+        traj1 = self.sim.generate(orig, [ens.can_append])
+
+        cv.with_async()
+        self.sim.options['n_frames_speculative'] = 3
+        try:
+            traj2 = self.sim.generate(orig, [ens.can_append])
+        finally:
+            cv.disable_async()
+
+        assert_equal(len(traj1), len(traj2))
+        for (s1, s2) in zip(traj1, traj2):
+            assert_items_equal(s1.coordinates[0], s2.coordinates[0])
+            assert_items_equal(s1.velocities[0], s2.velocities[0])
+
+        # frames generated beyond the stopping point are rolled back
+        assert_items_equal(self.sim.current_snapshot.coordinates[0],
+                           traj2[-1].coordinates[0])
+
     def test_start_with_snapshot(self):
         snap = toy.Snapshot(coordinates=np.array([1,2]),
                         velocities=np.array([3,4]))
@@ -0,0 +1,186 @@
+from __future__ import absolute_import
+from builtins import range
+from builtins import object
+
+from nose.tools import (assert_equal, assert_true, assert_false,
+                        assert_almost_equal)
+from .test_helpers import make_1d_traj, CalvinistDynamics
+
+import json
+import os
+
+import numpy as np
+
+import openpathsampling as paths
+from openpathsampling.netcdfplus import (Tracer, WeakLRUCache,
+                                         LRUChunkLoadingCache, tracing)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+class testTracer(object):
+    def setup(self):
+        self._default_timer = tracing.default_timer
+        tracing.default_timer = FakeClock()
+
+    def teardown(self):
+        tracing.default_timer = self._default_timer
+        tracing.active = None
+
+    def test_inactive(self):
+        assert_true(tracing.active is None)
+        cache = WeakLRUCache(10)
+        cache[1] = 'a'
+        assert_equal(cache[1], 'a')
+        tracer = Tracer()
+        assert_equal(tracer.caches, {})
+
+    def test_activation(self):
+        outer = Tracer()
+        inner = Tracer()
+        with outer:
+            assert_true(tracing.active is outer)
+            with inner:
+                assert_true(tracing.active is inner)
+            assert_true(tracing.active is outer)
+        assert_true(tracing.active is None)
+
+    def test_sampling(self):
+        tracer = Tracer(sample_interval=3)
+        for _ in range(7):
+            start = tracer.begin('func')
+            tracer.end('func', start)
+
+        assert_equal(tracer.counts['func'], 7)
+        # calls 0, 3 and 6 are sampled and each takes one clock tick
+        assert_equal(tracer.durations['func'], [3, 3.0, 1.0, 1.0])
+        assert_equal(len(tracer.events), 3)
+
+    def test_count_only(self):
+        tracer = Tracer(sample_interval=0)
+        assert_true(tracer.begin('func') is None)
+        tracer.end('func', None)
+        assert_equal(tracer.counts, {'func': 1})
+        assert_equal(tracer.durations, {})
+
+    def test_caches(self):
+        cache = WeakLRUCache(10)
+        cache.trace_name = 'test'
+        cache[1] = 'a'
+        with Tracer() as tracer:
+            cache[1]
+            cache.get(2)
+            cache.get(3)
+
+        assert_equal(tracer.caches, {'test': [1, 2]})
+        assert_almost_equal(tracer.hit_rate('test'), 1.0 / 3)
+        assert_true(np.isnan(tracer.hit_rate('unknown')))
+
+    def test_chunk_loading_cache(self):
+        cache = LRUChunkLoadingCache(chunksize=4, variable=list(range(10)))
+        with Tracer() as tracer:
+            for idx in range(8):
+                cache[idx]
+
+        # the first access of each chunk loads the chunk
+        assert_equal(tracer.caches['LRUChunkLoadingCache'], [6, 2])
+
+    def test_cv_cache(self):
+        cv = paths.FunctionCV('x', lambda snap: snap.xyz[0][0])
+        traj = make_1d_traj([0.0, 1.0])
+        with Tracer() as tracer:
+            cv(traj)
+            cv(traj)
+
+        assert_equal(tracer.caches['x'], [2, 2])
+
+    def test_failed_frame(self):
+        class FailingDynamics(CalvinistDynamics):
+            def generate_next_frame(self):
+                raise RuntimeError("no frame")
+
+        engine = FailingDynamics([-0.5, 0.0])
+        engine.name = 'failing'
+        tracer = Tracer()
+        try:
+            with tracer:
+                engine.generate(make_1d_traj([-0.5])[0],
+                                [lambda traj, trusted=False: True])
+        except RuntimeError:
+            pass
+
+        # the failed call is still measured
+        assert_equal(tracer.counts['failing.next_frame'], 1)
+        assert_equal(tracer.durations['failing.next_frame'][0], 1)
+
+    def test_export(self):
+        tracer = Tracer()
+        tracer.cache('cache', True)
+        tracer.end('func', tracer.begin('func'))
+        filename = 'test_tracing.json'
+        try:
+            tracer.export(filename)
+            with open(filename) as f:
+                trace = json.load(f)
+        finally:
+            if os.path.isfile(filename):
+                os.remove(filename)
+
+        assert_equal(trace['counts'], {'func': 1})
+        assert_equal(trace['caches']['cache']['hit_rate'], 1.0)
+        assert_equal(trace['durations']['func']['sampled'], 1)
+        event = trace['traceEvents'][0]
+        assert_equal(event['name'], 'func')
+        assert_equal(event['dur'], 1e6)
+        assert_true('func' in str(tracer))
+
+
+class testStorageTracing(object):
+    def setup(self):
+        self.filename = 'test_tracing.nc'
+        self.traj = make_1d_traj([-1.0, 0.0, 1.0])
+
+    def teardown(self):
+        tracing.active = None
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def test_save_load(self):
+        storage = paths.Storage(self.filename, 'w', template=self.traj[0])
+        with Tracer() as tracer:
+            storage.save(self.traj)
+
+        assert_equal(tracer.counts['trajectories.save'], 1)
+        assert_true(tracer.counts['snapshots.save'] >= 3)
+        storage.close()
+
+        storage = paths.Storage(self.filename, 'r')
+        with Tracer() as tracer:
+            traj = storage.trajectories[0]
+            for snapshot in traj:
+                snapshot.coordinates
+
+        assert_equal(tracer.counts['trajectories.load'], 1)
+        assert_false('trajectories.save' in tracer.counts)
+        storage.close()
+
+    def test_store_caches(self):
+        storage = paths.Storage(self.filename, 'w', template=self.traj[0])
+        storage.save(self.traj)
+        storage.close()
+
+        storage = paths.Storage(self.filename, 'r')
+        with Tracer() as tracer:
+            storage.trajectories[0]
+            storage.trajectories[0]
+
+        hits, misses = tracer.caches['trajectories']
+        assert_equal(hits, 1)
+        storage.close()
@@ -137,6 +137,39 @@ class testTrajectoryTransitionAnalysis(object):
         assert_almost_equal(resultA.times.mean(), 9.0/7.0*0.1)
         assert_almost_equal(resultB.times.mean(), 8.0/4.0*0.1)
 
+    def test_segments_match_ensemble_split(self):
+        traj = self._make_traj("xaaixbbaixxbbbaaxixbiaabxx")
+        continuous = self.analyzer.analyze_continuous_time(traj,
+                                                           self.stateA)
+        split = paths.AllInXEnsemble(self.stateA).split(traj, overlap=0)
+        assert_equal(list(continuous), split)
+
+        transitions = self.analyzer.analyze_transition_duration(
+            traj, self.stateA, self.stateB
+        )
+        ensemble = paths.SequentialEnsemble([
+            paths.AllInXEnsemble(self.stateA) & paths.LengthEnsemble(1),
+            paths.OptionalEnsemble(paths.AllOutXEnsemble(self.stateA) &
+                                   paths.AllOutXEnsemble(self.stateB)),
+            paths.AllInXEnsemble(self.stateB) & paths.LengthEnsemble(1)
+        ])
+        assert_equal(list(transitions),
+                     [seg[1:-1] for seg in ensemble.split(traj)])
+
+        analysis = paths.TrajectoryTransitionAnalysis
+        lifetimes = analysis.get_lifetime_segments(
+            traj, from_vol=~self.interfaceA0, to_vol=self.stateA,
+            padding=[None, None]
+        )
+        assert_equal([(traj.index(seg[0]), len(seg)) for seg in lifetimes],
+                     [(4, 4), (9, 6), (16, 6)])
+        # each of these passes through stateB
+        lifetimes = analysis.get_lifetime_segments(
+            traj, from_vol=~self.interfaceA0, to_vol=self.stateA,
+            forbidden=self.stateB, padding=[None, None]
+        )
+        assert_equal(lifetimes, [])
+
     def test_analyze_lifetime(self):
         resA = self.analyzer.analyze_lifetime(self.trajectory, self.stateA)
         resB = self.analyzer.analyze_lifetime(self.trajectory, self.stateB)
@@ -19,6 +19,7 @@ from msmbuilder.featurizer import AtomPairsFeaturizer
 import openpathsampling as paths
 from openpathsampling.tests.test_helpers import make_1d_traj
 import os
+import threading
 
 
 class test_FunctionCV(object):
@@ -73,6 +74,225 @@ class test_FunctionCV(object):
             md_dihed.reshape(md_dihed.shape[:-1]),
             my_dihed, rtol=10 ** -6, atol=10 ** -10)
 
+    def test_shared_mdtraj_conversion(self):
+        psi_atoms = [6, 8, 14, 16]
+        phi_atoms = [4, 6, 8, 14]
+        psi_op = op.MDTrajFunctionCV("psi", md.compute_dihedrals,
+                                     topology=self.topology,
+                                     indices=[psi_atoms])
+        phi_op = op.MDTrajFunctionCV("phi", md.compute_dihedrals,
+                                     topology=self.topology,
+                                     indices=[phi_atoms])
+        distance_op = op.MSMBFeaturizerCV("atom_pairs", AtomPairsFeaturizer,
+                                          topology=self.topology,
+                                          pair_indices=[[0, 1]])
+        cache = op.mdtraj_conversion_cache
+        cache.clear()
+        misses = cache.misses
+        hits = cache.hits
+
+        traj = paths.Trajectory(list(self.traj_topology))
+        psi, phi, dist = op.evaluate_in_dependency_order(
+            [psi_op, phi_op, distance_op], traj)
+        assert cache.misses == misses + 1
+        assert cache.hits == hits + 2
+
+        md_psi = md.compute_dihedrals(self.mdtraj, indices=[psi_atoms])
+        md_phi = md.compute_dihedrals(self.mdtraj, indices=[phi_atoms])
+        md_dist = md.compute_distances(self.mdtraj, [[0, 1]])
+        np.testing.assert_allclose(md_psi[:, 0], psi, rtol=10 ** -6)
+        np.testing.assert_allclose(md_phi[:, 0], phi, rtol=10 ** -6)
+        np.testing.assert_allclose(md_dist[:, 0], dist, rtol=10 ** -6)
+
+        cache.enabled = False
+        try:
+            other_op = op.MDTrajFunctionCV("psi2", md.compute_dihedrals,
+                                           topology=self.topology,
+                                           indices=[psi_atoms])
+            np.testing.assert_allclose(other_op(traj), psi)
+            assert cache.misses == misses + 1
+        finally:
+            cache.enabled = True
+
+    def test_shared_mdtraj_conversion_in_place(self):
+        def superposed_x(traj):
+            traj.superpose(traj, frame=0)
+            return traj.xyz[:, 0, 0]
+
+        def x(traj):
+            return traj.xyz[:, 0, 0]
+
+        superpose_op = op.MDTrajFunctionCV("superposed_x", superposed_x,
+                                           topology=self.topology)
+        x_op = op.MDTrajFunctionCV("x_md", x, topology=self.topology)
+        op.mdtraj_conversion_cache.clear()
+
+        traj = paths.Trajectory(list(self.traj_topology))
+        superpose_op(traj)
+        np.testing.assert_allclose(x_op(traj), self.mdtraj.xyz[:, 0, 0])
+
+    def test_derived_cv(self):
+        n_calls = [0]
+
+        def coordinates(snapshots):
+            n_calls[0] += 1
+            return [snap.coordinates[:, 0] for snap in snapshots]
+
+        x_cv = paths.FunctionCV("x_all", coordinates, cv_requires_lists=True,
+                                cv_wrap_numpy_array=True)
+        min_cv = paths.DerivedCV("x_min", lambda x: x.min(axis=-1),
+                                 inputs=[x_cv])
+        max_cv = paths.DerivedCV("x_max", lambda x: x.max(axis=-1),
+                                 inputs=[x_cv])
+        width_cv = paths.DerivedCV("x_width", lambda a, b: a - b,
+                                   inputs=[max_cv, min_cv])
+        assert not width_cv.cv_time_reversible
+
+        traj = paths.Trajectory(list(self.traj_simple))
+        width, x_min = op.evaluate_in_dependency_order([width_cv, min_cv],
+                                                       traj)
+        assert n_calls[0] == 1
+
+        x = np.array([snap.coordinates[:, 0] for snap in traj])
+        np.testing.assert_allclose(x_min, x.min(axis=-1))
+        np.testing.assert_allclose(width, x.max(axis=-1) - x.min(axis=-1))
+        np.testing.assert_allclose(max_cv(traj[3]), x[3].max())
+        assert n_calls[0] == 1
+
+    def test_storage_derived_cv(self):
+        x_cv = paths.FunctionCV("x0", lambda snap: snap.xyz[0, 0])
+        y_cv = paths.FunctionCV("y0", lambda snap: snap.xyz[0, 1])
+        sum_cv = paths.DerivedCV("sum", lambda x, y: x + y,
+                                 inputs=[x_cv, y_cv])
+        traj = paths.Trajectory(list(self.traj_simple))
+
+        storage = paths.Storage("myfile.nc", "w", traj[0])
+        storage.save(sum_cv)
+        storage.close()
+
+        storage = paths.Storage("myfile.nc", "r")
+        loaded = storage.cvs["sum"]
+        assert [inp.name for inp in loaded.inputs] == ["x0", "y0"]
+        np.testing.assert_allclose(loaded(traj), sum_cv(traj))
+        storage.close()
+
+    def test_trajectory_cv(self):
+        n_calls = [0]
+
+        def x(snap):
+            n_calls[0] += 1
+            return snap.xyz[0, 0]
+
+        x_cv = paths.FunctionCV("x", x)
+        traj1 = make_1d_traj([0.1, 0.5, 0.3])
+        traj2 = make_1d_traj([0.2, 0.9, 0.3, 0.0])
+
+        max_cv = paths.TrajectoryCV.of(x_cv, 'max')
+        assert max_cv is paths.TrajectoryCV.of(x_cv, 'max')
+        assert max_cv.name == 'max(x)'
+        np.testing.assert_allclose(max_cv([traj1, traj2]), [0.5, 0.9])
+        assert n_calls[0] == 7
+
+        # both the trajectory values and the snapshot values are cached
+        np.testing.assert_allclose(max_cv(traj2), 0.9)
+        np.testing.assert_allclose(
+            paths.TrajectoryCV.of(x_cv, 'min')(traj2), 0.0)
+        assert n_calls[0] == 7
+
+        assert paths.TrajectoryCV.of(x_cv, 'argmax')(traj2) == 1
+        assert paths.TrajectoryCV.of(x_cv, 'last')(traj1) == 0.3
+        assert paths.TrajectoryCV.of(x_cv, 'length')(traj2) == 4
+
+    def test_trajectory_cv_unknown_reduction(self):
+        x_cv = paths.FunctionCV("x", lambda snap: snap.xyz[0, 0])
+        try:
+            paths.TrajectoryCV.of(x_cv, 'median')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("ValueError not raised")
+
+    def test_storage_trajectory_cv(self):
+        x_cv = paths.FunctionCV("x", lambda snap: snap.xyz[0, 0])
+        max_cv = paths.TrajectoryCV.of(x_cv, 'max')
+        traj1 = make_1d_traj([0.1, 0.5, 0.3])
+        traj2 = make_1d_traj([0.2, 0.9, 0.3, 0.0])
+
+        storage = paths.Storage("myfile.nc", "w", traj1[0])
+        storage.save(traj1)
+        storage.save(max_cv.with_diskcache())
+        # values of trajectories saved later are computed on save
+        storage.save(traj2)
+        storage.cvs.sync(max_cv)
+        storage.close()
+
+        storage = paths.Storage("myfile.nc", "r")
+        loaded = storage.cvs["max(x)"]
+        assert loaded.reduction == 'max'
+        assert loaded.cv.name == 'x'
+        values = loaded._store_dict.value_store.vars['value'][:]
+        np.testing.assert_allclose(values, [0.5, 0.9])
+        np.testing.assert_allclose(loaded(list(storage.trajectories)),
+                                   [0.5, 0.9])
+        storage.close()
+
+    def test_async_cv(self):
+        from concurrent.futures import ThreadPoolExecutor
+        n_calls = [0]
+
+        def x0(snapshots):
+            n_calls[0] += 1
+            return [snap.xyz[0, 0] for snap in snapshots]
+
+        cv = paths.FunctionCV("x_async", x0, cv_requires_lists=True)
+        traj = paths.Trajectory(list(self.traj_simple))
+        assert cv.submit(traj) is None
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        cv.with_async(executor)
+        future = cv.submit(traj[:3])
+        assert future is not None
+        # already pending
+        assert cv.submit(traj[:3]) is None
+        future.result()
+
+        np.testing.assert_allclose(
+            cv(traj), [snap.xyz[0, 0] for snap in traj])
+        assert n_calls[0] == 2
+        # already cached
+        assert cv.submit(traj) is None
+
+        cv.disable_async()
+        assert cv.cv_executor is None
+        executor.shutdown()
+
+    def test_async_derived_cv(self):
+        from concurrent.futures import ThreadPoolExecutor
+        x0 = paths.FunctionCV("x_input", lambda snap: snap.xyz[0, 0])
+        doubled = paths.DerivedCV("x_doubled", lambda x: 2.0 * x,
+                                  inputs=[x0])
+        traj = paths.Trajectory(list(self.traj_simple))
+        executor = ThreadPoolExecutor(max_workers=1)
+        x0.with_async(executor)
+        doubled.with_async(executor)
+        try:
+            # the derived CV is queued before its input on a single worker;
+            # it evaluates the input itself instead of waiting for it
+            started = threading.Event()
+            executor.submit(started.wait)
+            future = doubled.submit(traj)
+            x0.submit(traj)
+            started.set()
+            np.testing.assert_allclose(
+                future.result(timeout=10),
+                [2.0 * snap.xyz[0, 0] for snap in traj])
+            np.testing.assert_allclose(
+                x0(traj), [snap.xyz[0, 0] for snap in traj])
+        finally:
+            x0.disable_async()
+            doubled.disable_async()
+            executor.shutdown()
+
     def test_atom_pair_featurizer(self):
         """ Create an atom pair collectivevariable using MSMSBuilder3 """
 
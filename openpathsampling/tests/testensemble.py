@@ -2771,3 +2771,71 @@ class TestEnsembleEquality(object):
 
     # TODO: may add tests for other ensembles, or may move this test
     # somewhere else
+
+
+class CountingLengthEnsemble(LengthEnsemble):
+    def __init__(self, length):
+        super(CountingLengthEnsemble, self).__init__(length)
+        self.n_calls = 0
+
+    def __call__(self, trajectory, trusted=None, candidate=False):
+        self.n_calls += 1
+        return super(CountingLengthEnsemble, self).__call__(
+            trajectory, trusted, candidate)
+
+
+class TestEnsembleVerdictCache(object):
+    def setup(self):
+        self.cache = EnsembleVerdictCache(size_limit=2)
+        self.ens = CountingLengthEnsemble(slice(0, 3))
+        self.short = make_1d_traj([0.1, 0.2])
+        self.long = make_1d_traj([0.1, 0.2, 0.3])
+
+    def test_cached_verdicts(self):
+        assert_true(self.cache(self.ens, self.short))
+        assert_false(self.cache(self.ens, self.long))
+        assert_true(self.cache(self.ens, self.short))
+        assert_false(self.cache(self.ens, self.long))
+        assert_equal(self.ens.n_calls, 2)
+        assert_equal((self.cache.hits, self.cache.misses), (2, 2))
+
+    def test_candidate(self):
+        self.cache(self.ens, self.short)
+        # a trajectory in the ensemble is also a valid candidate
+        assert_true(self.cache(self.ens, self.short, candidate=True))
+        assert_equal(self.ens.n_calls, 1)
+        assert_false(self.cache(self.ens, self.long, candidate=True))
+        assert_equal(self.ens.n_calls, 2)
+
+    def test_growing_trajectory(self):
+        assert_true(self.cache(self.ens, self.short))
+        self.short.append(self.long[-1])
+        assert_false(self.cache(self.ens, self.short))
+        assert_equal(self.ens.n_calls, 2)
+
+    def test_size_limit(self):
+        other = make_1d_traj([0.5])
+        self.cache(self.ens, self.short)
+        self.cache(self.ens, self.long)
+        self.cache(self.ens, other)
+        self.cache(self.ens, self.short)
+        assert_equal(self.ens.n_calls, 4)
+
+    def test_disabled(self):
+        self.cache.enabled = False
+        self.cache(self.ens, self.short)
+        self.cache(self.ens, self.short)
+        assert_equal(self.ens.n_calls, 2)
+        self.cache.enabled = True
+        self.cache(self.ens, self.short)
+        self.cache.clear()
+        self.cache(self.ens, self.short)
+        assert_equal(self.ens.n_calls, 4)
+
+    def test_ensemble_check(self):
+        ensemble_verdict_cache.clear()
+        assert_true(self.ens.check(self.short))
+        assert_true(self.ens.check(self.short))
+        assert_true(paths.Sample(replica=0, trajectory=self.short,
+                                 ensemble=self.ens).valid)
+        assert_equal(self.ens.n_calls, 1)
@@ -65,6 +65,11 @@ class testHistogram(object):
         assert_equal(self.hist_binwidth_range.count, 10)
         assert_items_equal(hist2, self.hist)
 
+        # building again replaces the previous histogram
+        hist3 = self.hist_binwidth_range.histogram(self.data)
+        assert_equal(self.hist_binwidth_range.count, 10)
+        assert_items_equal(hist3, self.hist)
+
     @raises(RuntimeError)
     def test_build_from_data_fail(self):
         histo = Histogram(n_bins=5)
@@ -101,6 +106,14 @@ class testHistogram(object):
         assert_equal(histo.compare_parameters(self.hist_nbins), False)
         assert_equal(self.hist_nbins.compare_parameters(histo), False)
 
+    def test_sum_histograms(self):
+        self.hist_binwidth_range.histogram(self.data[:4])
+        self.hist_nbins_range.histogram(self.data[4:])
+        summed = Histogram.sum_histograms([self.hist_binwidth_range,
+                                           self.hist_nbins_range])
+        assert_equal(summed.count, 10)
+        assert_items_equal(summed.histogram(), self.hist)
+
     def test_xvals(self):
         histo = Histogram(n_bins=5)
         hist = histo.histogram(self.data) # need this to set the bins
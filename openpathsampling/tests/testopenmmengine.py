@@ -7,9 +7,10 @@ from __future__ import absolute_import
 from builtins import range
 from builtins import object
 from past.utils import old_div
+import threading
 import numpy as np
 import simtk.openmm as mm
-from nose.tools import (assert_equal)
+from nose.tools import (assert_equal, assert_raises)
 from simtk import unit as u
 from simtk.openmm import app
 
@@ -159,6 +160,18 @@ class testOpenMMEngine(object):
         assert_not_equal_array_array(old_pos, new_pos)
         assert_not_equal_array_array(old_vel, new_vel)
 
+    def test_frames_do_not_share_arrays(self):
+        snap1 = self.engine.generate_next_frame()
+        pos1 = np.array(snap1.coordinates._value)
+        snap2 = self.engine.generate_next_frame()
+        assert(not np.shares_memory(snap1.coordinates._value,
+                                    snap2.coordinates._value))
+        assert(not np.shares_memory(snap1.velocities._value,
+                                    snap2.velocities._value))
+        np.testing.assert_array_equal(snap1.coordinates._value, pos1)
+        assert_equal(snap2.coordinates.unit, u.nanometers)
+        assert_equal(snap2.box_vectors.unit, u.nanometers)
+
     def test_generate(self):
         try:
             _ = self.engine.generate(self.engine.current_snapshot, [true_func])
@@ -258,3 +271,101 @@ class testOpenMMEngine(object):
 
         # make sure there is no change!
         assert_equal(init_samp[0].trajectory, init_traj)
+
+
+class testOpenMMEnginePool(object):
+    def setUp(self):
+        integrator = mm.LangevinIntegrator(
+            300*u.kelvin,
+            old_div(1.0,u.picoseconds),
+            2.0*u.femtoseconds
+        )
+        integrator.setConstraintTolerance(0.00001)
+
+        self.engine = peng.OpenMMEnginePool(
+            template.topology,
+            system,
+            integrator,
+            openmm_properties={'Threads': '1'},
+            options={
+                'n_steps_per_frame': 2,
+                'n_frames_max': 10
+            },
+            n_contexts=2
+        )
+        self.engine.initialize('CPU')
+
+    def teardown(self):
+        self.engine.unload_context()
+
+    def test_generate_concurrently(self):
+        ensembles = [paths.LengthEnsemble(n_frames) for n_frames in [3, 4, 5]]
+        trajs = self.engine.generate_concurrently(
+            [(template, [ens.can_append]) for ens in ensembles])
+
+        assert_equal([len(traj) for traj in trajs], [3, 4, 5])
+        assert(self.engine.n_active_contexts <= 2)
+        for traj in trajs:
+            # snapshots reference the pool, not the context that made them
+            assert(all(snap.engine is self.engine for snap in traj[1:]))
+
+    def test_main_context_created_once(self):
+        integrator = mm.VerletIntegrator(2.0*u.femtoseconds)
+        engine = peng.OpenMMEnginePool(
+            template.topology, system, integrator,
+            options={'n_steps_per_frame': 2, 'n_frames_max': 10},
+            n_contexts=3)
+        n_initialized = [0]
+        initialize = engine.initialize
+
+        def counting_initialize(platform=None):
+            n_initialized[0] += 1
+            initialize('CPU')
+
+        engine.initialize = counting_initialize
+        try:
+            ensembles = [paths.LengthEnsemble(3) for _ in range(3)]
+            engine.generate_concurrently(
+                [(template, [ens.can_append]) for ens in ensembles])
+            assert_equal(n_initialized[0], 1)
+        finally:
+            engine.unload_context()
+
+    def test_generate_backward(self):
+        ens = paths.LengthEnsemble(3)
+        traj = self.engine.generate(template.reversed, [ens.can_prepend],
+                                    direction=-1)
+        assert_equal(len(traj), 3)
+        assert_equal(self.engine.n_active_contexts, 1)
+
+    def test_unload_busy_context(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def wait_once(traj, trusted=False):
+            if not started.is_set():
+                started.set()
+                release.wait()
+
+            return len(traj) < 3
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(
+            self.engine.generate(template, [wait_once])))
+        thread.start()
+        started.wait()
+        try:
+            assert_raises(RuntimeError, self.engine.unload_context)
+        finally:
+            release.set()
+            thread.join()
+
+        assert_equal(len(results[0]), 3)
+        assert_equal(self.engine.n_active_contexts, 1)
+        self.engine.unload_context()
+        assert_equal(self.engine.n_active_contexts, 0)
+
+    def test_to_dict(self):
+        dct = self.engine.to_dict()
+        assert_equal(dct['n_contexts'], 2)
+        assert_equal(dct['options'], self.engine.options)
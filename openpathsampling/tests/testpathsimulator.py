@@ -6,7 +6,7 @@ from past.utils import old_div
 from builtins import object
 from .test_helpers import (raises_with_message_like, data_filename,
                            CalvinistDynamics, make_1d_traj,
-                           assert_items_equal)
+                           make_1d_tps_scheme, assert_items_equal)
 from nose.tools import (assert_equal, assert_not_equal, raises,
                         assert_almost_equal, assert_true)
 # from nose.plugins.skip import SkipTest
@@ -451,6 +451,18 @@ class testDirectSimulation(object):
         assert_true(len(self.sim.transition_count) > 1)
         assert_true(len(self.sim.flux_events[self.flux_pairs[0]]) > 1)
 
+    def test_run_chunk_size(self):
+        self.sim.run(200)
+        sim = DirectSimulation(storage=None,
+                               engine=self.engine,
+                               states=[self.center, self.outside],
+                               flux_pairs=self.flux_pairs,
+                               initial_snapshot=self.snap0,
+                               chunk_size=7)
+        sim.run(200)
+        assert_equal(sim.transition_count, self.sim.transition_count)
+        assert_equal(sim.flux_events, self.sim.flux_events)
+
     def test_results(self):
         self.sim.run(200)
         results = self.sim.results
@@ -623,3 +635,74 @@ class testDirectSimulation(object):
         assert_equal(len(traj), 201)
         read_store.close()
         os.remove(tmpfile)
+
+    def test_sim_with_streaming_storage(self):
+        tmpfile = data_filename("direct_sim_test.nc")
+        if os.path.isfile(tmpfile):
+            os.remove(tmpfile)
+
+        storage = paths.Storage(tmpfile, "w", self.snap0)
+        sim = DirectSimulation(storage=storage,
+                               engine=self.engine,
+                               states=[self.center, self.outside],
+                               initial_snapshot=self.snap0,
+                               chunk_size=80,
+                               streaming=True)
+
+        sim.run(200)
+        storage.close()
+        read_store = paths.AnalysisStorage(tmpfile)
+        assert_equal(len(read_store.trajectories), 3)
+        assert_equal([len(traj) for traj in read_store.trajectories],
+                     [81, 81, 41])
+        for traj1, traj2 in zip(read_store.trajectories[:-1],
+                                read_store.trajectories[1:]):
+            assert_equal(traj1[-1], traj2[0])
+        assert_equal(len(read_store.snapshots), 2 * 201)
+        read_store.close()
+        os.remove(tmpfile)
+
+
+class testPathSampling(object):
+    def setup(self):
+        _, network, scheme, _, init_conds = make_1d_tps_scheme()
+        self.ensemble = network.all_ensembles[0]
+        self.sim = PathSampling(storage=None, move_scheme=scheme,
+                                sample_set=init_conds)
+        self.sim.output_stream = open(os.devnull, 'w')
+        self.bad_set = paths.SampleSet([
+            paths.Sample(replica=0, trajectory=make_1d_traj([0.0, 0.0]),
+                         ensemble=self.ensemble)
+        ])
+
+    def teardown(self):
+        self.sim.output_stream.close()
+
+    def test_run_sanity_check(self):
+        self.sim.run(4)
+        assert_true(self.sim._checked_sample_set is not None)
+        self.sim.sanity_check(full=True)
+
+    def test_run_sanity_check_background(self):
+        self.sim.sanity_check_in_background = True
+        self.sim.run(4)
+        assert_true(self.sim._sanity_check_thread is None)
+        assert_true(self.sim._checked_sample_set is not None)
+
+    def test_sanity_check_only_changed(self):
+        # pretend the bad set was checked before
+        self.sim.sample_set = self.bad_set
+        self.sim._checked_sample_set = self.bad_set
+        self.sim.sanity_check()
+
+    @raises(AssertionError)
+    def test_sanity_check_full(self):
+        self.sim.sample_set = self.bad_set
+        self.sim._checked_sample_set = self.bad_set
+        self.sim.sanity_check(full=True)
+
+    @raises(AssertionError)
+    def test_sanity_check_background_error(self):
+        self.sim.sample_set = self.bad_set
+        self.sim.sanity_check(background=True)
+        self.sim.finish_sanity_check()
@@ -216,3 +216,88 @@ class testSampleSet(object):
         testset = SampleSet([bad_samp])
         testset.sanity_check()
 
+    def test_sanity_only_changed(self):
+        traj0A = self.s0A.trajectory
+        bad_samp = Sample(replica=3, trajectory=traj0A, ensemble=self.ensB)
+        # the bad sample was (wrongly) checked before, so it is skipped
+        checked = SampleSet([self.s0A, bad_samp])
+        testset = SampleSet([self.s0A, self.s1A, bad_samp])
+        testset.sanity_check(checked)
+
+    @raises(AssertionError)
+    def test_sanity_changed_insane(self):
+        traj0A = self.s0A.trajectory
+        bad_samp = Sample(replica=3, trajectory=traj0A, ensemble=self.ensB)
+        testset = self.testset.apply_samples([bad_samp])
+        testset.sanity_check(self.testset)
+
+    def test_apply_samples_shares_unchanged(self):
+        s0A_ = Sample(replica=0, trajectory=Trajectory([0.7]),
+                      ensemble=self.ensA)
+        newset = self.testset.apply_samples([s0A_])
+        newset.consistency_check()
+        self.testset.consistency_check()
+        assert_items_equal(newset, [self.s1A, self.s2B, s0A_])
+        assert_items_equal(self.testset, [self.s0A, self.s1A, self.s2B])
+        assert_equal(newset.all_from_replica(0), [s0A_])
+        assert_equal(self.testset.all_from_replica(0), [self.s0A])
+
+        # changing the copy again must not change the original
+        newset.append(self.s2B_)
+        assert_equal(len(newset), 4)
+        assert_equal(len(self.testset), 3)
+        assert_false(self.s2B_ in self.testset)
+
+
+class testPersistentDict(object):
+    def setup(self):
+        self.n = 100
+        self.original = PersistentDict((i, str(i)) for i in range(self.n))
+
+    def test_mapping(self):
+        assert_equal(len(self.original), self.n)
+        assert_equal(self.original.keys(), list(range(self.n)))
+        assert_equal(self.original[42], '42')
+        assert_true(42 in self.original)
+        assert_false(self.n in self.original)
+        assert_equal(self.original.get(self.n, 'none'), 'none')
+
+        self.original[42] = 'x'
+        del self.original[0]
+        self.original[0] = '0'
+        assert_equal(self.original.keys(),
+                     list(range(1, self.n)) + [0])
+        assert_equal(self.original[42], 'x')
+
+    @raises(KeyError)
+    def test_missing_key(self):
+        del self.original[self.n]
+
+    def test_copy_on_write(self):
+        copy = self.original.copy()
+        del copy[5]
+        copy[7] = 'seven'
+        copy[self.n] = str(self.n)
+        self.original[8] = 'eight'
+
+        assert_equal(self.original.keys(), list(range(self.n)))
+        assert_equal(self.original[5], '5')
+        assert_equal(self.original[7], '7')
+        assert_equal(copy[8], '8')
+        assert_equal(len(copy), self.n)
+        assert_false(5 in copy)
+        assert_equal(copy[7], 'seven')
+
+    def test_many_changes(self):
+        # replacing entries over and over keeps the content compact
+        mapping = self.original
+        history = [mapping]
+        for i in range(10 * self.n):
+            mapping = mapping.copy()
+            del mapping[i]
+            mapping[i + self.n] = str(i + self.n)
+            history.append(mapping)
+
+        assert_equal(mapping.keys(), list(range(10 * self.n, 11 * self.n)))
+        assert_equal(history[1].keys(), list(range(1, self.n + 1)))
+        assert_true(len(mapping._chunks) <= 2 * (self.n // 32 + 1))
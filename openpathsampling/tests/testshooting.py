@@ -69,3 +69,37 @@ class testFinalFrameSelector(SelectorTest):
         assert_items_equal([0.1, 0.2, 0.3, 0.4, 0.5],
                            [s.coordinates[0][0] for s in samples[0].trajectory]
                           )
+
+
+class testGaussianBiasSelector(SelectorTest):
+    def setup(self):
+        super(testGaussianBiasSelector, self).setup()
+        import openpathsampling as paths
+        cv = paths.FunctionCV("x", lambda s: s.coordinates[0][0])
+        self.sel = GaussianBiasSelector(cv, alpha=2.0, l_0=0.2)
+        self.f = [self.sel.f(s, self.mytraj) for s in self.mytraj]
+
+    def test_biases(self):
+        for b, f in zip(self.sel._biases(self.mytraj), self.f):
+            assert_almost_equal(b, f)
+
+    def test_sum_bias(self):
+        assert_almost_equal(self.sel.sum_bias(self.mytraj), sum(self.f))
+        # second call uses the cached cumulative biases
+        assert_equal(len(self.sel._bias_cache), 1)
+        assert_almost_equal(self.sel.sum_bias(self.mytraj), sum(self.f))
+        assert_equal(len(self.sel._bias_cache), 1)
+
+    def test_probability_ratio(self):
+        new_traj = self.mytraj[1:]
+        snap = self.mytraj[2]
+        expected = sum(self.f) / sum(self.f[1:])
+        assert_almost_equal(
+            self.sel.probability_ratio(snap, self.mytraj, new_traj),
+            expected
+        )
+
+    def test_pick(self):
+        for _ in range(20):
+            idx = self.sel.pick(self.mytraj)
+            assert(0 <= idx < len(self.mytraj))
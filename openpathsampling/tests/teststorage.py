@@ -395,6 +395,70 @@ class testStorage(object):
         assert(len(store.dimensions['snapshots']) == 1)
         store.close()
 
+    def test_load_save_details(self):
+        store = Storage(filename=self.filename, mode='w')
+        assert(os.path.isfile(self.filename))
+
+        traj = paths.Trajectory([self.toy_template,
+                                 self.toy_template.reversed])
+        details = paths.MoveDetails(
+            initial_trajectory=traj,
+            shooting_snapshot=traj[1],
+            metropolis_acceptance=0.25,
+            stopping_reason=None,
+            step=7,
+            weights=[1.0, 2.0]
+        )
+        store.save(details)
+        store.close()
+
+        store = Storage(filename=self.filename, mode='a')
+        loaded = store.details[0]
+
+        assert(type(loaded) is paths.MoveDetails)
+        assert_equal(loaded.__uuid__, details.__uuid__)
+        assert_equal(loaded.initial_trajectory, traj)
+        assert_equal(loaded.shooting_snapshot, traj[1])
+        assert_equal(loaded.metropolis_acceptance, 0.25)
+        assert_equal(loaded.step, 7)
+        assert_equal(loaded.weights, [1.0, 2.0])
+        # untyped values for typed keys are kept
+        assert(loaded.stopping_reason is None)
+        # keys that were not set are not created
+        assert(not hasattr(loaded, 'bias'))
+
+        store.details.clear_cache()
+        store.details.cache_all()
+        assert_equal(store.details[0].metropolis_acceptance, 0.25)
+
+        store.close()
+
+    def test_memory_budget(self):
+        store = Storage(filename=self.filename, mode='w')
+        traj = paths.Trajectory([
+            toys.Snapshot(
+                coordinates=np.array([[float(idx), 0.0]]),
+                velocities=np.array([[0.0, 0.0]]),
+                engine=self.engine
+            ) for idx in range(50)
+        ])
+        store.save(traj)
+        store.close()
+
+        store = Storage(filename=self.filename, mode='a')
+        budget = 20000
+        manager = store.set_memory_budget(budget)
+        for idx in range(len(store.snapshots)):
+            store.snapshots[idx]
+
+        image = store.cache_image()
+        assert(image['manager']['nbytes'] <= budget)
+        assert(image['manager']['evictions'] > 0)
+        assert_equal(image['manager'], manager.stats)
+        assert(image['snapshots']['misses'] > 0)
+        assert(image['snapshots']['nbytes'] <= budget)
+        store.close()
+
     def test_version(self):
         store = Storage(
             filename=self.filename, mode='w')
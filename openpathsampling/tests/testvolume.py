@@ -156,6 +156,15 @@ class testCVRangeVolume(object):
         assert_equal((volA2 - volA),
                      volume.RelativeComplementVolume(volA2, volA))
 
+    def test_evaluate_batch(self):
+        values = [-1.0, -0.5, -0.3, 0.0, 0.3, 0.5, 0.6, 1.0]
+        for vol in [volA, volB, ~volA, volA & volB, volA | volC,
+                    volA ^ volB, volD - volA, volume.EmptyVolume(),
+                    volume.FullVolume(), volA2 - volA]:
+            assert_equal(list(vol.evaluate_batch(values)),
+                         [vol(val) for val in values])
+        assert_equal(len(volA.evaluate_batch([])), 0)
+
     def test_str(self):
         assert_equal(volA.__str__(), "{x|Id(x) in [-0.5, 0.5]}")
         assert_equal((~volA).__str__(), "(not {x|Id(x) in [-0.5, 0.5]})")
@@ -271,6 +280,15 @@ class testCVRangeVolumePeriodic(object):
         assert_equal(vol.lambda_max, -150)
         # assuming that's true, so is everything else
 
+    def test_evaluate_batch(self):
+        values = [-400.0, -180.0, -150.0, -100.0, 0.0, 70.0, 75.0, 100.0,
+                  200.0, 430.0]
+        for vol in [self.pvolA, self.pvolA_, self.pvolB, self.pvolE,
+                    volume.PeriodicCVDefinedVolume(op_id, 70, -150,
+                                                   -180, 180)]:
+            assert_equal(list(vol.evaluate_batch(values)),
+                         [vol(val) for val in values])
+
     @raises(Exception)
     def test_volume_bigger_than_bounds(self):
         '''max-min > pbc_range raises Exception'''
@@ -360,6 +378,43 @@ class testCVRangeVolumePeriodic(object):
                      volume.PeriodicCVDefinedVolume(op_id, -100, 75))
 
 
+class testVoronoiVolume(object):
+    def setUp(self):
+        import numpy as np
+        import openpathsampling as paths
+        from .test_helpers import make_1d_traj
+        self.centers = np.array([-1.0, 0.0, 1.0])
+        self.n_calls = [0]
+
+        def distances(snapshots, centers):
+            self.n_calls[0] += 1
+            xs = np.array([snap.xyz[0][0] for snap in snapshots])
+            return np.abs(xs[:, None] - centers[None, :])
+
+        self.cv = paths.FunctionCV("voronoi_dist", distances,
+                                   cv_requires_lists=True,
+                                   centers=self.centers)
+        self.states = [volume.VoronoiVolume(self.cv, idx)
+                       for idx in range(len(self.centers))]
+        self.traj = make_1d_traj([-1.2, -0.4, 0.2, 0.6, 1.5, 0.1])
+
+    def test_cells(self):
+        cells = self.states[0].cells(self.traj)
+        assert_equal(list(cells), [0, 1, 1, 2, 2, 1])
+        assert_equal(self.states[1].cell(self.traj[3]), 2)
+        assert_true(self.states[2](self.traj[3]))
+        assert_false(self.states[2](self.traj[3], state=1))
+
+    def test_shared_cells(self):
+        traj = self.traj
+        for state in self.states:
+            batch = state.evaluate_batch(traj)
+            assert_equal(list(batch), [state(snap) for snap in traj])
+
+        # all states share the cells computed in a single CV call
+        assert_equal(self.n_calls[0], 1)
+
+
 class testVolumeFactory(object):
     def test_check_minmax(self):
         minmax1 = volume.VolumeFactory._check_minmax(0, [2, 2])
@@ -0,0 +1,254 @@
+"""
+Timing of the parts of Monte Carlo steps.
+
+While a :class:`StepTimer` is active, the hot paths of OPS report the time
+they spend to it using :class:`timed`: the dynamics engines (`engine`),
+ensemble evaluation as stopping condition or as acceptance check
+(`ensemble`), collective variables (`cv`), the acceptance of trial samples
+(`acceptance`) and writing to storage (`storage`). Times are exclusive:
+the time a CV takes while an ensemble is evaluated counts as `cv` and not
+as `ensemble`. When no timer is active, :class:`timed` does nothing.
+
+:class:`openpathsampling.PathSampling` times every step, stores the
+result with the step (see :attr:`openpathsampling.MCStep.timing`) and
+keeps a :class:`TimingSummary`.
+"""
+import threading
+import timeit
+
+import numpy as np
+
+default_timer = timeit.default_timer
+
+_local = threading.local()
+
+
+class StepTiming(object):
+    """
+    Wall-clock time spent in the parts of a single MC step
+
+    All times are in seconds. Steps that were not timed have `nan` for all
+    categories.
+
+    Attributes
+    ----------
+    engine : float
+        time spent in the dynamics engines to generate frames
+    ensemble : float
+        time spent evaluating ensembles, as stopping conditions and to
+        check trial samples
+    cv : float
+        time spent evaluating collective variables
+    acceptance : float
+        time spent in the acceptance (e.g. Metropolis) of trial samples
+        excluding the ensemble checks
+    storage : float
+        time spent writing the step to storage
+    total : float
+        the total time of the step
+    """
+
+    categories = ['engine', 'ensemble', 'cv', 'acceptance', 'storage',
+                  'total']
+
+    def __init__(self, **times):
+        for category in self.categories:
+            setattr(self, category, float(times.pop(category, np.nan)))
+
+        if times:
+            raise TypeError('Unknown timing categories %s' % sorted(times))
+
+    @classmethod
+    def from_array(cls, values):
+        """
+        Create from the values of all categories in the order of `categories`
+        """
+        values = np.ma.filled(np.ma.asarray(values, dtype=np.float64),
+                              np.nan)
+        return cls(**dict(zip(cls.categories, values.tolist())))
+
+    def __array__(self, dtype=None):
+        return np.array(
+            [getattr(self, category) for category in self.categories],
+            dtype=dtype)
+
+    @property
+    def other(self):
+        """float : time not spent in any of the categories, e.g. in movers"""
+        return self.total - sum(
+            getattr(self, category) for category in self.categories[:-1])
+
+    def to_dict(self):
+        return {category: getattr(self, category)
+                for category in self.categories}
+
+    def __repr__(self):
+        return '%s(%s)' % (
+            self.__class__.__name__,
+            ', '.join('%s=%g' % (category, getattr(self, category))
+                      for category in self.categories))
+
+
+class StepTimer(object):
+    """
+    Collect the timing of a MC step
+
+    The timer is active inside `with timer:` blocks of the thread that
+    entered it. A timer can be entered several times; all blocks count for
+    the total time.
+
+    Examples
+    --------
+    >>> timer = StepTimer()
+    >>> with timer:
+    ...     change = mover.move(sample_set)
+    >>> timer.timing()
+    """
+
+    def __init__(self):
+        self.times = dict.fromkeys(StepTiming.categories[:-1], 0.0)
+        self.total = 0.0
+        self._stack = []
+        self._previous = None
+        self._start = None
+
+    @staticmethod
+    def current():
+        """
+        Returns
+        -------
+        :class:`StepTimer` or None
+            the timer active in this thread
+        """
+        return getattr(_local, 'timer', None)
+
+    def __enter__(self):
+        self._previous = getattr(_local, 'timer', None)
+        _local.timer = self
+        self._start = default_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.total += default_timer() - self._start
+        _local.timer = self._previous
+        self._previous = None
+
+    def start(self, category):
+        """Start a section; the running section is paused"""
+        now = default_timer()
+        if self._stack:
+            running = self._stack[-1]
+            self.times[running[0]] += now - running[1]
+
+        self._stack.append([category, now])
+
+    def stop(self):
+        """Stop the last section; the paused section continues"""
+        now = default_timer()
+        category, since = self._stack.pop()
+        self.times[category] += now - since
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def timing(self):
+        """
+        Returns
+        -------
+        :class:`StepTiming`
+            the times collected so far
+        """
+        return StepTiming(total=self.total, **self.times)
+
+
+class timed(object):
+    """
+    Context manager adding the time of its block to the active timer
+
+    Parameters
+    ----------
+    category : str
+        the category to add the time to, one of `StepTiming.categories`
+        except `total`
+    """
+
+    __slots__ = ['category', 'timer']
+
+    def __init__(self, category):
+        self.category = category
+        self.timer = None
+
+    def __enter__(self):
+        self.timer = getattr(_local, 'timer', None)
+        if self.timer is not None:
+            self.timer.start(self.category)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.timer is not None:
+            self.timer.stop()
+            self.timer = None
+
+
+class TimingSummary(object):
+    """
+    Accumulated timing of MC steps, in total and per mover
+
+    Attributes
+    ----------
+    n_steps : dict of str: int
+        the number of steps per mover name
+    times : dict of str: dict of str: float
+        the summed times per mover name and category
+    """
+
+    def __init__(self):
+        self.n_steps = {}
+        self.times = {}
+
+    def add(self, timing, mover=None):
+        """
+        Add the timing of a step
+
+        Parameters
+        ----------
+        timing : :class:`StepTiming`
+        mover : str or None
+            the name of the mover responsible for the step
+        """
+        mover = str(mover)
+        self.n_steps[mover] = self.n_steps.get(mover, 0) + 1
+        times = self.times.setdefault(
+            mover, dict.fromkeys(StepTiming.categories + ['other'], 0.0))
+        for category in StepTiming.categories:
+            times[category] += getattr(timing, category)
+        times['other'] += timing.other
+
+    def total(self):
+        """
+        Returns
+        -------
+        dict of str: float
+            the summed times of all steps per category
+        """
+        total = dict.fromkeys(StepTiming.categories + ['other'], 0.0)
+        for times in self.times.values():
+            for category, value in times.items():
+                total[category] += value
+
+        return total
+
+    def __str__(self):
+        columns = StepTiming.categories[:-1] + ['other', 'total']
+        lines = ['%-30s %7s ' % ('mover', 'steps') +
+                 ' '.join('%10s' % column for column in columns)]
+        rows = sorted(self.times.items())
+        rows.append(('all movers', self.total()))
+        for mover, times in rows:
+            if mover == 'all movers':
+                n_steps = sum(self.n_steps.values())
+            else:
+                n_steps = self.n_steps[mover]
+
+            lines.append('%-30s %7d ' % (mover[:30], n_steps) + ' '.join(
+                '%10.3f' % times[column] for column in columns))
+
+        return '\n'.join(lines)
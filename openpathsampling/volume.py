@@ -6,7 +6,10 @@ Created on 03.09.2014
 
 from . import range_logic
 import abc
-from openpathsampling.netcdfplus import StorableNamedObject
+import weakref
+
+import numpy as np
+from openpathsampling.netcdfplus import StorableNamedObject, WeakKeyCache
 
 # TODO: Make Full and Empty be Singletons to avoid storing them several times!
 
@@ -49,6 +52,27 @@ class Volume(StorableNamedObject):
         '''
         return False # pragma: no cover
 
+    def evaluate_batch(self, snapshots):
+        '''
+        Test a whole list of snapshots at once
+
+        Subclasses that can test several snapshots faster than one at a
+        time (e.g., by evaluating a collective variable on all of them in
+        one call) should override this.
+
+        Parameters
+        ----------
+        snapshots : list of :class:`openpathsampling.engines.BaseSnapshot`
+            the snapshots to be tested
+
+        Returns
+        -------
+        numpy.ndarray of bool
+            `True` for each snapshot that is part of the volume
+        '''
+        return np.array([self(snapshot) for snapshot in snapshots],
+                        dtype=bool)
+
     def __str__(self):
         '''
         Returns a string representation of the volume
@@ -134,6 +158,24 @@ class VolumeCombination(Volume):
         #return self.fnc(self.volume1.__call__(snapshot),
                         #self.volume2.__call__(snapshot))
 
+    def evaluate_batch(self, snapshots):
+        # same short circuit as in __call__: volume2 is only evaluated for
+        # the snapshots where the result of volume1 does not decide
+        snapshots = list(snapshots)
+        a = self.volume1.evaluate_batch(snapshots)
+        res_true = np.array([self.fnc(a_i, True) for a_i in a], dtype=bool)
+        res_false = np.array([self.fnc(a_i, False) for a_i in a], dtype=bool)
+        result = res_true.copy()
+        undecided = np.flatnonzero(res_true != res_false)
+        if len(undecided) > 0:
+            b = self.volume2.evaluate_batch(
+                [snapshots[idx] for idx in undecided])
+            # only the value of volume2 is left to decide the result
+            result[undecided] = np.where(b, res_true[undecided],
+                                         res_false[undecided])
+
+        return result
+
     def __str__(self):
         return '(' + self.sfnc.format(str(self.volume1), str(self.volume2)) + ')'
 
@@ -174,6 +216,9 @@ class NegatedVolume(Volume):
     def __call__(self, snapshot):
         return not self.volume(snapshot)
 
+    def evaluate_batch(self, snapshots):
+        return ~ self.volume.evaluate_batch(snapshots)
+
     def __str__(self):
         return '(not ' + str(self.volume) + ')'
 
@@ -186,6 +231,9 @@ class EmptyVolume(Volume):
     def __call__(self, snapshot):
         return False
 
+    def evaluate_batch(self, snapshots):
+        return np.zeros(len(snapshots), dtype=bool)
+
     def __and__(self, other):
         return self
 
@@ -213,6 +261,9 @@ class FullVolume(Volume):
     def __call__(self, snapshot):
         return True
 
+    def evaluate_batch(self, snapshots):
+        return np.ones(len(snapshots), dtype=bool)
+
     def __invert__(self):
         return EmptyVolume()
 
@@ -383,6 +434,20 @@ class CVDefinedVolume(Volume):
 
         return True
 
+    def _cv_values(self, snapshots):
+        # evaluate the CV for all snapshots in a single call
+        return np.array([value.__float__() for value in
+                         self.collectivevariable(list(snapshots))],
+                        dtype=float)
+
+    def evaluate_batch(self, snapshots):
+        if len(snapshots) == 0:
+            return np.zeros(0, dtype=bool)
+
+        l = self._cv_values(snapshots)
+        # written with negations to behave as `__call__` does for NaN
+        return ~(self.lambda_min > l) & ~(self.lambda_max < l)
+
     def __str__(self):
         return '{{x|{2}(x) in [{0}, {1}]}}'.format(
             self.lambda_min, self.lambda_max, self.collectivevariable.name)
@@ -482,6 +547,18 @@ class PeriodicCVDefinedVolume(CVDefinedVolume):
         else:
             return self.lambda_min <= l <= self.lambda_max
 
+    def evaluate_batch(self, snapshots):
+        if len(snapshots) == 0:
+            return np.zeros(0, dtype=bool)
+
+        l = self._cv_values(snapshots)
+        if self.wrap:
+            l = np.array([self.do_wrap(value) for value in l])
+        if self.lambda_min > self.lambda_max:
+            return (l >= self.lambda_min) | (l <= self.lambda_max)
+        else:
+            return (self.lambda_min <= l) & (l <= self.lambda_max)
+
     def __str__(self):
         if self.wrap:
             fcn = 'x|({0}(x) - {2}) % {1} + {2}'.format(
@@ -505,6 +582,11 @@ class VoronoiVolume(Volume):
     '''
     Volume given by a Voronoi cell specified by a set of centers
 
+    The cell of a snapshot is the index of the smallest distance returned
+    by the collectivevariable. Cells are cached per snapshot and shared by
+    all VoronoiVolumes using the same collectivevariable, so a set of
+    states defined by many centers computes each assignment only once.
+
     Parameters
     ----------
     collectivevariable : MultiRMSDCV
@@ -521,11 +603,58 @@ class VoronoiVolume(Volume):
 
     '''
 
+    # cell assignments for each collectivevariable, keyed by snapshot
+    _cell_caches = weakref.WeakKeyDictionary()
+
     def __init__(self, collectivevariable, state):
         super(VoronoiVolume, self).__init__()
         self.collectivevariable = collectivevariable
         self.state = state
 
+    @property
+    def _cell_cache(self):
+        try:
+            return VoronoiVolume._cell_caches[self.collectivevariable]
+        except KeyError:
+            cache = WeakKeyCache()
+            VoronoiVolume._cell_caches[self.collectivevariable] = cache
+            return cache
+
+    def cells(self, snapshots):
+        '''
+        Returns the indices of the voronoi cells for a list of snapshots
+
+        The collectivevariable is called once for all snapshots with
+        unknown cells.
+
+        Parameters
+        ----------
+        snapshots : list of :class:`opensampling.engines.BaseSnapshot`
+            the snapshots to be tested, e.g. a trajectory
+
+        Returns
+        -------
+        numpy.ndarray of int
+            index of the voronoi cell for each snapshot
+        '''
+        cache = self._cell_cache
+        snapshots = list(snapshots)
+        cells = np.array([cache.get(snap, -1) for snap in snapshots],
+                         dtype=int)
+        missing = np.flatnonzero(cells < 0)
+        if len(missing) > 0:
+            missing_snapshots = [snapshots[idx] for idx in missing]
+            distances = np.asarray(
+                self.collectivevariable(missing_snapshots), dtype=float)
+            new_cells = np.argmin(
+                distances.reshape(len(missing_snapshots), -1), axis=1)
+            for snap, cell in zip(missing_snapshots, new_cells):
+                cache[snap] = int(cell)
+
+            cells[missing] = new_cells
+
+        return cells
+
     def cell(self, snapshot):
         '''
         Returns the index of the voronoicell snapshot is in
@@ -540,15 +669,7 @@ class VoronoiVolume(Volume):
         int
             index of the voronoi cell
         '''
-        distances = self.collectivevariable(snapshot)
-        min_val = 1000000000.0
-        min_idx = -1
-        for idx, d in enumerate(distances):
-            if d < min_val:
-                min_val = d
-                min_idx = idx
-
-        return min_idx
+        return int(self.cells([snapshot])[0])
 
     def __call__(self, snapshot, state=None):
         '''
@@ -573,6 +694,9 @@ class VoronoiVolume(Volume):
 
         return self.cell(snapshot) == state
 
+    def evaluate_batch(self, snapshots):
+        return self.cells(snapshots) == self.state
+
 
 class VolumeFactory(object):
     @staticmethod
@@ -215,6 +215,8 @@ Operating System :: MacOS
         'scipy',
         'pandas',
         'future',
+        # backport of concurrent.futures for asynchronous CVs
+        'futures; python_version < "3"',
         'jupyter',
         'netcdf4',
         'openmm',